@@ -0,0 +1,270 @@
+"""
+Async Fetch Engine for ScrapeX
+asyncio-native HTTP fetching so one process can keep hundreds of site fetches in flight
+"""
+
+import asyncio
+import os
+import time
+import logging
+import weakref
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from dns_fix import DEFAULT_HEADERS
+from fetch_budget import current_budget
+from http_cache import HTTPCache, http_cache
+from host_limiter import THROTTLE_STATUSES, HostLimiter, host_limiter
+from host_breaker import HostCircuitBreaker, host_breaker
+from host_timeouts import HostTimeouts, host_timeouts
+from fetch_service import MAX_BODY_BYTES, ContentTypeRejected, fetch_service, is_parseable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _LoopState:
+    """Client and limiters bound to a single event loop"""
+
+    def __init__(self, engine: 'AsyncFetchEngine'):
+        self.client = httpx.AsyncClient(
+            headers=engine.headers,
+            timeout=engine.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=engine.max_concurrency,
+                max_keepalive_connections=engine.max_concurrency
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=engine.connect_retries)
+        )
+        self.global_limit = asyncio.Semaphore(engine.max_concurrency)
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+class AsyncFetchEngine:
+    """
+    Shared asyncio HTTP engine for business site fetches
+
+    Features:
+    - One httpx.AsyncClient (and connection pool) per event loop, shared by all fetches
+    - Global limit on fetches in flight
+    - Per-host limit so a single site never takes more than a few connections
+    - Per-host request rate and Retry-After pauses from the shared host limiter
+    - Hosts that keep failing to connect are short-circuited by the shared breaker
+    - Responses go through the shared on-disk HTTP cache (fresh hits skip the
+      network, stale entries are revalidated)
+    - Bodies are streamed: non-HTML content types are aborted after the headers
+      and bodies stop at the fetch service's size cap
+    - Connect/read timeouts adapt to each host's observed latency, and retries
+      are drawn from the running job's fetch budget
+    """
+
+    MAX_CONCURRENCY = int(os.getenv('SCRAPEX_ASYNC_MAX_CONCURRENCY', '100'))
+    MAX_PER_HOST = int(os.getenv('SCRAPEX_ASYNC_MAX_PER_HOST', '4'))
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_per_host: Optional[int] = None,
+                 timeout: float = 30.0, connect_retries: int = 0, headers: Optional[Dict] = None,
+                 cache: Optional[HTTPCache] = None, limiter: Optional[HostLimiter] = None,
+                 breaker: Optional[HostCircuitBreaker] = None, max_body_bytes: Optional[int] = None,
+                 timeouts: Optional[HostTimeouts] = None):
+        """
+        Initialize fetch engine
+
+        Args:
+            max_concurrency: Maximum fetches in flight across all hosts
+            max_per_host: Maximum concurrent fetches to a single host
+            timeout: Read timeout for hosts without latency history (seconds)
+            connect_retries: Transport-level retries on connection failures (on
+                             top of the budgeted retries; off by default)
+            headers: Request headers (defaults to the shared browser headers)
+            cache: HTTP cache (defaults to the shared cache)
+            limiter: Host rate limiter (defaults to the shared limiter)
+            breaker: Host circuit breaker (defaults to the shared breaker)
+            max_body_bytes: Bytes read from a response body before it is truncated
+            timeouts: Adaptive host timeouts (defaults to the shared instance)
+        """
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self.max_per_host = max_per_host or self.MAX_PER_HOST
+        self.timeout = timeout
+        self.connect_retries = connect_retries
+        self.headers = headers or DEFAULT_HEADERS
+        self.cache = cache or http_cache
+        self.limiter = limiter or host_limiter
+        self.breaker = breaker or host_breaker
+        self.max_body_bytes = max_body_bytes or MAX_BODY_BYTES
+        self.timeouts = timeouts or host_timeouts
+        self._states = weakref.WeakKeyDictionary()
+
+    def _state(self) -> _LoopState:
+        """Get (or create) the client and limiters for the running loop"""
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = _LoopState(self)
+            self._states[loop] = state
+        return state
+
+    async def fetch(self, url: str, timeout: Optional[float] = None, scraper: str = 'async',
+                    on_headers: Optional[Callable[[], None]] = None) -> httpx.Response:
+        """
+        Fetch a URL, waiting for a global and a per-host slot first
+
+        Args:
+            url: URL to fetch
+            timeout: Optional per-request timeout in seconds
+            scraper: Name the request is counted under in the fetch service stats
+            on_headers: Called on the event loop when the host has answered
+                        (status below 400), before the body is downloaded;
+                        not called for cache hits
+
+        Returns:
+            httpx.Response (raises httpx.HTTPStatusError on 4xx/5xx and
+            ContentTypeRejected for non-HTML documents); response.truncated is
+            True when the body was cut off at the size cap
+        """
+        start_time = time.time()
+        try:
+            response, cached = await self._fetch(url, timeout, scraper, on_headers)
+        except Exception:
+            fetch_service.record(scraper, time.time() - start_time, error=True)
+            raise
+        fetch_service.record(scraper, time.time() - start_time, size=len(response.content), cached=cached)
+        return response
+
+    async def _fetch(self, url: str, timeout: Optional[float], scraper: str,
+                     on_headers: Optional[Callable[[], None]] = None):
+        """Fetch through the cache, limiter and breaker; returns (response, served_from_cache)"""
+        entry = await asyncio.to_thread(self.cache.lookup, url)
+        if self.cache.servable(entry):
+            self.cache.record_hit()
+            return self.cache.httpx_response(url, entry), True
+
+        state = self._state()
+        host = urlparse(url).netloc.lower()
+        host_limit = state.host_limits.get(host)
+        if host_limit is None:
+            host_limit = state.host_limits[host] = asyncio.Semaphore(self.max_per_host)
+
+        attempt = 0
+        while True:
+            self.breaker.check(url)
+            error = None
+            async with host_limit:
+                # Wait for the host's rate limit before taking a global slot,
+                # so slots go to fetches that can actually start
+                delay = self.limiter.reserve(url)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                async with state.global_limit:
+                    try:
+                        response = await self._get_capped(state, url, timeout or self.timeout,
+                                                          self.cache.validators(entry) if entry else None,
+                                                          scraper, on_headers)
+                    except Exception as e:
+                        if not self.breaker.is_failure(e):
+                            raise
+                        error = e
+
+            if error is None:
+                self.breaker.record_success(url)
+                retry_in = self.limiter.retry_delay(url, attempt, response.status_code, response.headers)
+                if retry_in is None:
+                    break
+                # Throttled hosts are blocked for retry_in; reserve() waits it out
+                if response.status_code not in THROTTLE_STATUSES:
+                    await asyncio.sleep(retry_in)
+            else:
+                retry_in = self.limiter.retry_delay(url, attempt)
+                if retry_in is None:
+                    # One breaker failure per request, however many attempts it took
+                    self.breaker.record_failure(url, error)
+                    raise error
+                await asyncio.sleep(retry_in)
+            attempt += 1
+
+        if entry and response.status_code == 304:
+            await asyncio.to_thread(self.cache.refresh, url, response.headers)
+            self.cache.record_hit(revalidated=True)
+            return self.cache.httpx_response(url, entry), True
+
+        if entry:
+            self.cache.record_miss()
+        response.raise_for_status()
+        if not response.truncated:
+            await asyncio.to_thread(self.cache.store, url, response.status_code, response.headers,
+                                    response.content, str(response.url))
+        return response, False
+
+    async def _get_capped(self, state: _LoopState, url: str, timeout: float,
+                          headers: Optional[Dict], scraper: str,
+                          on_headers: Optional[Callable[[], None]] = None) -> httpx.Response:
+        """Stream a GET, rejecting non-HTML content types and stopping at the size cap"""
+        # Timeouts come from the host's latency, clamped to the job's budget
+        connect_timeout, read_timeout = self.timeouts.timeouts(url, timeout)
+        budget = current_budget()
+        if budget is not None:
+            budget.start_request(url)
+            connect_timeout, read_timeout = budget.clamp((connect_timeout, read_timeout))
+
+        connect = {}
+
+        async def trace(event: str, info: Dict):
+            if event.startswith('connection.connect_tcp.'):
+                connect[event.rsplit('.', 1)[1]] = time.monotonic()
+
+        request = state.client.build_request(
+            'GET', url, headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            extensions={'trace': trace}
+        )
+        start_time = time.monotonic()
+        try:
+            streamed = await state.client.send(request, stream=True)
+        except httpx.ReadTimeout:
+            self.timeouts.observe_timeout(url, read_timeout)
+            raise
+        connect_seconds = connect['complete'] - connect['started'] if 'complete' in connect else None
+        self.timeouts.observe(url, connect_seconds=connect_seconds, ttfb_seconds=time.monotonic() - start_time)
+        if on_headers and streamed.status_code < 400:
+            on_headers()
+
+        try:
+            content_type = streamed.headers.get('content-type')
+            if streamed.status_code < 300 and not is_parseable(content_type):
+                fetch_service.record_event(scraper, 'rejected')
+                raise ContentTypeRejected(f"{url} is {content_type}, not a web page")
+
+            body, truncated = bytearray(), False
+            async for chunk in streamed.aiter_bytes():
+                room = self.max_body_bytes - len(body)
+                if len(chunk) > room:
+                    body.extend(chunk[:room])
+                    truncated = True
+                    break
+                body.extend(chunk)
+        finally:
+            await streamed.aclose()
+
+        # Rebuild a fully read response; the body is already decoded
+        headers = [(name, value) for name, value in streamed.headers.multi_items()
+                   if name.lower() not in ('content-encoding', 'content-length', 'transfer-encoding')]
+        response = httpx.Response(streamed.status_code, headers=headers, content=bytes(body),
+                                  request=streamed.request, history=streamed.history)
+        response.truncated = truncated
+        if truncated:
+            fetch_service.record_event(scraper, 'truncated')
+            logger.warning(f"Truncated {url} at {self.max_body_bytes} bytes")
+        return response
+
+    async def aclose(self):
+        """Close the client bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        state = self._states.pop(loop, None)
+        if state is not None:
+            await state.client.aclose()
+
+
+# Global instance
+async_fetch_engine = AsyncFetchEngine()
@@ -3,14 +3,22 @@ Batch Processing System for Large Directories
 Handles 100s-1000s of businesses efficiently without memory issues
 """
 
+import contextvars
 import json
 import logging
-from typing import Dict, List, Optional, Generator
+import os
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import time
 
 from directory_scraper import DirectoryScraper
 from universal_scraper import UniversalBusinessScraper
+from result_spool import ResultSpool, iter_results
+from job_checkpoint import JobCheckpoint
+from business_cache import business_cache
+from host_limiter import interleave_by_host
+from dns_cache import dns_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,9 +30,11 @@ class BatchProcessor:
     
     Features:
     - Processes businesses in batches of 50-75 to optimize speed and efficiency
-    - Saves results incrementally to disk
-    - Supports pause/resume
-    - Provides progress tracking
+    - Scrapes up to max_workers businesses concurrently, across batch boundaries
+    - Saves results incrementally to an append-only JSONL spool
+    - Supports pause/resume via a checkpoint of completed websites
+    - Reuses recent results for websites other jobs already scraped
+    - Provides progress tracking (optionally reported through a callback)
     - Handles errors gracefully
     """
 
@@ -34,7 +44,7 @@ class BatchProcessor:
         
         Args:
             batch_size: Number of businesses to process in each batch (recommended: 50-75)
-            max_workers: Number of parallel workers per batch
+            max_workers: Number of businesses scraped concurrently
         """
         self.batch_size = batch_size
         self.max_workers = max_workers
@@ -45,128 +55,225 @@ class BatchProcessor:
                                      directory_url: str,
                                      output_file: str,
                                      max_businesses: Optional[int] = None,
-                                     max_pages: int = 10) -> Dict:
+                                     max_pages: int = 10,
+                                     checkpoint: Optional[JobCheckpoint] = None,
+                                     resume: bool = False,
+                                     progress_callback: Optional[Callable[[Dict], None]] = None,
+                                     result_callback: Optional[Callable[[Dict], None]] = None,
+                                     force_refresh: bool = False,
+                                     should_stop: Optional[Callable[[], bool]] = None) -> Dict:
         """
         Process a large directory in manageable batches
         
         Args:
             directory_url: URL of the directory
-            output_file: Path to save results incrementally
+            output_file: Path of the JSONL results spool (summary goes to
+                         <output_file>.summary.json)
             max_businesses: Optional limit on total businesses
             max_pages: Maximum directory pages to scrape
+            checkpoint: Optional checkpoint recording the directory listing and
+                        every completed website
+            resume: Continue from the checkpoint instead of starting over
+            progress_callback: Optional function called with progress counts
+                               after every business (must not block)
+            result_callback: Optional function called with each successfully
+                             scraped business as soon as it completes
+            force_refresh: Scrape every website even if a fresh cached result exists
+            should_stop: Optional function checked between businesses; once it
+                         returns True no more businesses are started or recorded
             
         Returns:
             Summary of processing
         """
-        logger.info(f"Starting batch processing for: {directory_url}")
+        logger.info(f"{'Resuming' if resume else 'Starting'} batch processing for: {directory_url}")
         
-        # Step 1: Get list of businesses from directory (fast, low memory)
-        logger.info("Step 1: Extracting business list from directory...")
-        directory_result = self.directory_scraper.scrape_multiple_pages(
-            directory_url,
-            max_pages=max_pages
-        )
-        
-        if directory_result.get('status') != 'success':
-            return {
-                'status': 'failed',
-                'error': 'Failed to scrape directory',
-                'directory_url': directory_url
-            }
-        
-        all_businesses = directory_result.get('businesses', [])
-        total_found = len(all_businesses)
+        params = {
+            'directory_url': directory_url,
+            'max_businesses': max_businesses,
+            'max_pages': max_pages,
+            'batch_size': self.batch_size,
+            'force_refresh': force_refresh
+        }
+        snapshot = checkpoint.load_snapshot() if (checkpoint and resume) else None
         
-        # Apply limit if specified
-        if max_businesses:
-            all_businesses = all_businesses[:max_businesses]
+        if snapshot and snapshot.get('businesses') is not None:
+            # Step 1: Reuse the directory listing captured before the restart
+            logger.info("Step 1: Loading business list from checkpoint...")
+            all_businesses = snapshot['businesses']
+            total_found = snapshot.get('total_found') or len(all_businesses)
+        else:
+            if checkpoint:
+                checkpoint.save_snapshot(params)
+            
+            # Step 1: Get list of businesses from directory (fast, low memory)
+            logger.info("Step 1: Extracting business list from directory...")
+            directory_result = self.directory_scraper.scrape_multiple_pages(
+                directory_url,
+                max_pages=max_pages
+            )
+            
+            if directory_result.get('status') != 'success':
+                return {
+                    'status': 'failed',
+                    'error': 'Failed to scrape directory',
+                    'directory_url': directory_url
+                }
+            
+            all_businesses = directory_result.get('businesses', [])
+            total_found = len(all_businesses)
+            
+            # Apply limit if specified
+            if max_businesses:
+                all_businesses = all_businesses[:max_businesses]
+            
+            if checkpoint:
+                checkpoint.save_snapshot(params, all_businesses, total_found)
         
         total_to_process = len(all_businesses)
         
+        # Skip everything the checkpoint (or the spool itself) says is done
+        completed = self._load_completed(checkpoint, output_file) if resume else {}
+        pending = [b for b in all_businesses if b.get('website') not in completed]
+        
         logger.info(f"Found {total_found} businesses in directory")
         logger.info(f"Will process {total_to_process} businesses")
+        if completed:
+            logger.info(f"Skipping {total_to_process - len(pending)} businesses completed before resume")
         logger.info(f"Batch size: {self.batch_size}")
-        logger.info(f"Estimated batches: {(total_to_process + self.batch_size - 1) // self.batch_size}")
+        logger.info(f"Estimated batches: {(len(pending) + self.batch_size - 1) // self.batch_size}")
+        
+        # Resolve every harvested domain concurrently before the scrape needs them
+        dns_cache.prefetch(b.get('website') for b in pending)
         
         # Step 2: Process in batches
         logger.info("Step 2: Processing businesses in batches...")
+        total_batches = (len(pending) + self.batch_size - 1) // self.batch_size
         
-        processed_count = 0
-        successful_count = 0
-        failed_count = 0
+        processed_count = total_to_process - len(pending)
+        successful_count = sum(1 for b in all_businesses if completed.get(b.get('website')))
+        failed_count = processed_count - successful_count
+        batch_stats = []
         start_time = time.time()
+        self._report_progress(progress_callback, total_to_process, processed_count,
+                              successful_count, failed_count)
         
-        # Initialize output file
-        with open(output_file, 'w') as f:
-            json.dump({
-                'directory_url': directory_url,
-                'started_at': datetime.now().isoformat(),
-                'total_found': total_found,
-                'total_to_process': total_to_process,
-                'batch_size': self.batch_size,
-                'businesses': []
-            }, f, indent=2)
+        # Initialize output spool (JSONL records + summary sidecar)
+        spool = ResultSpool(output_file)
+        spool.start({
+            'directory_url': directory_url,
+            'started_at': datetime.now().isoformat(),
+            'total_found': total_found,
+            'total_to_process': total_to_process,
+            'batch_size': self.batch_size
+        }, resume=resume)
         
-        # Process each batch
-        for batch_num, batch in enumerate(self._create_batches(all_businesses, self.batch_size), 1):
-            batch_start = time.time()
-            
-            logger.info(f"\nProcessing Batch {batch_num}/{(total_to_process + self.batch_size - 1) // self.batch_size}")
-            logger.info(f"Businesses in this batch: {len(batch)}")
+        # A batch is the next `batch_size` businesses to *finish*, not a fixed
+        # slice of the list, so a slow site only ever holds one worker while the
+        # rest keep pulling work across batch boundaries.
+        batch_num = 1
+        batch_results = []
+        batch_outcomes = []
+        batch_processed = 0
+        batch_successful = 0
+        batch_start = time.time()
+        if pending:
+            logger.info(f"\nProcessing Batch {batch_num}/{total_batches} ({self.max_workers} workers)")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Round-robin across hosts so workers are not all paced by one site
+            queue = iter(interleave_by_host(pending, lambda b: b.get('website')))
+            in_flight = {}
+            stopped = False
             
-            # Scrape batch
-            batch_results = []
-            for i, directory_business in enumerate(batch, 1):
-                website = directory_business.get('website')
-                if not website:
-                    failed_count += 1
-                    continue
+            while True:
+                if should_stop and should_stop():
+                    # Scrapes already running finish, but nothing more is written
+                    stopped = True
+                    break
                 
-                try:
-                    # Scrape individual business
-                    detailed_data = self.business_scraper.scrape_business(
-                        website,
-                        business_type=directory_business.get('category')
-                    )
+                # Keep at most max_workers scrapes in flight
+                while len(in_flight) < self.max_workers:
+                    directory_business = next(queue, None)
+                    if directory_business is None:
+                        break
+                    # Run in a copy of this context so the job's fetch budget applies
+                    future = executor.submit(contextvars.copy_context().run, self._scrape_directory_business,
+                                             directory_business, force_refresh)
+                    in_flight[future] = directory_business
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory_business = in_flight.pop(future)
+                    processed_count += 1
+                    batch_processed += 1
+                    position = f"[{processed_count}/{total_to_process}]"
                     
-                    if detailed_data.get('status') == 'success':
-                        # Combine data
-                        combined = {
-                            **directory_business,
-                            **detailed_data,
-                            'directory_listing': directory_business,
-                        }
-                        
-                        if not combined.get('business_name'):
-                            combined['business_name'] = directory_business.get('business_name')
-                        
-                        batch_results.append(combined)
-                        successful_count += 1
-                        logger.info(f"  [{i}/{len(batch)}] ✓ {combined.get('business_name', 'Unknown')}")
-                    else:
+                    combined = None
+                    try:
+                        combined = future.result()
+                        if combined:
+                            batch_results.append(combined)
+                            if result_callback:
+                                result_callback(combined)
+                            successful_count += 1
+                            batch_successful += 1
+                            logger.info(f"  {position} ✓ {combined.get('business_name', 'Unknown')}")
+                        else:
+                            failed_count += 1
+                            logger.warning(f"  {position} ✗ Failed to scrape {directory_business.get('website')}")
+                    except Exception as e:
                         failed_count += 1
-                        logger.warning(f"  [{i}/{len(batch)}] ✗ Failed to scrape {website}")
-                        
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"  [{i}/{len(batch)}] ✗ Error: {e}")
-                
-                processed_count += 1
-            
-            # Save batch results incrementally
-            self._append_batch_to_file(output_file, batch_results)
-            
-            batch_duration = time.time() - batch_start
-            logger.info(f"Batch {batch_num} completed in {batch_duration:.1f}s")
-            logger.info(f"Progress: {processed_count}/{total_to_process} ({processed_count/total_to_process*100:.1f}%)")
-            
-            # Small delay between batches to be gentle on system
-            if batch_num < (total_to_process + self.batch_size - 1) // self.batch_size:
-                time.sleep(2)
+                        logger.error(f"  {position} ✗ Error: {e}")
+                    batch_outcomes.append((directory_business.get('website'), bool(combined)))
+                    self._report_progress(progress_callback, total_to_process, processed_count,
+                                          successful_count, failed_count)
+                    
+                    if batch_processed < self.batch_size and processed_count < total_to_process:
+                        continue
+                    
+                    # Save batch results incrementally
+                    self._append_batch_to_file(spool, batch_results)
+                    if checkpoint:
+                        checkpoint.mark_completed(batch_outcomes)
+                    
+                    batch_duration = time.time() - batch_start
+                    throughput = batch_processed / batch_duration if batch_duration > 0 else 0
+                    batch_stats.append({
+                        'batch': batch_num,
+                        'processed': batch_processed,
+                        'successful': batch_successful,
+                        'duration_seconds': batch_duration,
+                        'businesses_per_second': throughput
+                    })
+                    logger.info(f"Batch {batch_num} completed in {batch_duration:.1f}s ({throughput:.2f} businesses/s)")
+                    logger.info(f"Progress: {processed_count}/{total_to_process} ({processed_count/total_to_process*100:.1f}%)")
+                    
+                    batch_num += 1
+                    batch_results = []
+                    batch_outcomes = []
+                    batch_processed = 0
+                    batch_successful = 0
+                    batch_start = time.time()
+                    if processed_count < total_to_process:
+                        logger.info(f"\nProcessing Batch {batch_num}/{total_batches}")
         
         # Finalize
         total_duration = time.time() - start_time
         
+        if stopped:
+            logger.warning(f"Batch processing stopped after {processed_count}/{total_to_process} businesses")
+            return {
+                'status': 'cancelled',
+                'directory_url': directory_url,
+                'total_processed': processed_count,
+                'successful': successful_count,
+                'failed': failed_count,
+                'duration_seconds': total_duration
+            }
+        
         summary = {
             'status': 'completed',
             'directory_url': directory_url,
@@ -178,12 +285,15 @@ class BatchProcessor:
             'duration_seconds': total_duration,
             'duration_minutes': total_duration / 60,
             'avg_time_per_business': total_duration / processed_count if processed_count > 0 else 0,
+            'businesses_per_second': processed_count / total_duration if total_duration > 0 else 0,
+            'batches': batch_stats,
             'output_file': output_file,
+            'resumed': resume,
             'completed_at': datetime.now().isoformat()
         }
         
         # Update file with summary
-        self._update_file_summary(output_file, summary)
+        self._update_file_summary(spool, summary)
         
         logger.info("\n" + "="*80)
         logger.info("BATCH PROCESSING COMPLETED")
@@ -198,39 +308,86 @@ class BatchProcessor:
         
         return summary
 
-    def _create_batches(self, items: List, batch_size: int) -> Generator[List, None, None]:
-        """Split items into batches"""
-        for i in range(0, len(items), batch_size):
-            yield items[i:i + batch_size]
+    def _report_progress(self, progress_callback: Optional[Callable[[Dict], None]],
+                         total_to_process: int, processed_count: int,
+                         successful_count: int, failed_count: int):
+        """Pass current counts to the progress callback, if any"""
+        if not progress_callback:
+            return
+        
+        try:
+            progress_callback({
+                'total_to_process': total_to_process,
+                'processed_count': processed_count,
+                'successful_count': successful_count,
+                'failed_count': failed_count,
+                'progress_percentage': int(processed_count * 100 / total_to_process) if total_to_process else 100
+            })
+        except Exception as e:
+            logger.error(f"Progress callback failed: {e}")
+
+    def _load_completed(self, checkpoint: Optional[JobCheckpoint], output_file: str) -> Dict[str, bool]:
+        """
+        Collect websites already completed by an earlier run of this job
+        
+        Records that reached the spool but not the checkpoint log (a crash
+        between the two fsyncs) count as completed too, so they are not
+        scraped and written twice.
+        """
+        completed = checkpoint.load_completed() if checkpoint else {}
+        
+        if os.path.exists(output_file):
+            for record in iter_results(output_file):
+                website = (record.get('directory_listing') or {}).get('website')
+                if website:
+                    completed[website] = True
+        
+        return completed
+
+    def _scrape_directory_business(self, directory_business: Dict, force_refresh: bool = False) -> Optional[Dict]:
+        """
+        Scrape a single directory listing and merge it with the scraped data
+        
+        Runs on a worker thread. Returns None when the listing has no website
+        or the scrape did not succeed. Websites scraped recently (by any job)
+        come from the result cache unless force_refresh is set.
+        """
+        website = directory_business.get('website')
+        if not website:
+            return None
+        
+        detailed_data = business_cache.get_or_scrape(
+            website,
+            lambda url: self.business_scraper.scrape_business(url, business_type=directory_business.get('category')),
+            force_refresh=force_refresh
+        )
+        
+        if detailed_data.get('status') != 'success':
+            return None
+        
+        # Combine data
+        combined = {
+            **directory_business,
+            **detailed_data,
+            'directory_listing': directory_business,
+        }
+        
+        if not combined.get('business_name'):
+            combined['business_name'] = directory_business.get('business_name')
+        
+        return combined
 
-    def _append_batch_to_file(self, output_file: str, batch_results: List[Dict]):
-        """Append batch results to output file"""
+    def _append_batch_to_file(self, spool: ResultSpool, batch_results: List[Dict]):
+        """Append batch results to the output spool"""
         try:
-            # Read current data
-            with open(output_file, 'r') as f:
-                data = json.load(f)
-            
-            # Append new results
-            data['businesses'].extend(batch_results)
-            
-            # Write back
-            with open(output_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            spool.append(batch_results)
         except Exception as e:
             logger.error(f"Failed to append batch to file: {e}")
 
-    def _update_file_summary(self, output_file: str, summary: Dict):
-        """Update file with final summary"""
+    def _update_file_summary(self, spool: ResultSpool, summary: Dict):
+        """Record final summary in the spool sidecar"""
         try:
-            with open(output_file, 'r') as f:
-                data = json.load(f)
-            
-            data['summary'] = summary
-            
-            with open(output_file, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            spool.write_summary(summary)
         except Exception as e:
             logger.error(f"Failed to update summary: {e}")
 
@@ -242,7 +399,7 @@ if __name__ == "__main__":
     # Test with Tampa Bay Chamber (smaller for demo)
     result = processor.process_directory_in_batches(
         directory_url="https://www.tampabaychamber.com/membership/",
-        output_file="/home/ubuntu/scrapex-backend/batch_results.json",
+        output_file="/home/ubuntu/scrapex-backend/batch_results.jsonl",
         max_businesses=20,
         max_pages=1
     )
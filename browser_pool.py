@@ -0,0 +1,316 @@
+"""
+Browser Pool for ScrapeX
+Keeps a few Chromium instances warm and shares them across all browser-based scrapers
+"""
+
+import atexit
+import os
+import queue
+import threading
+import uuid
+import logging
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import psutil
+
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+    logging.warning("Playwright not available")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Launch arguments shared by every pooled browser
+LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--no-first-run',
+    '--disable-gpu'
+]
+
+# Hides the most common automation fingerprint
+STEALTH_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+"""
+
+# Time a render may take beyond its navigation timeout (readiness waits,
+# extraction, waiting for a free browser) before the caller gives up
+RENDER_MARGIN_SECONDS = float(os.getenv('SCRAPEX_BROWSER_RENDER_MARGIN', '30'))
+
+# Marks the end of the task stream for a browser thread
+_STOP = object()
+
+
+class _BrowserThread(threading.Thread):
+    """
+    Owns one Playwright driver and one Chromium instance
+
+    The sync Playwright API is bound to the thread that started it, so each
+    pooled browser lives on its own thread and renders tasks pulled from the
+    pool's queue.
+    """
+
+    def __init__(self, pool: 'BrowserPool', index: int):
+        super().__init__(name=f"browser-{index}", daemon=True)
+        self.pool = pool
+        self.playwright = None
+        self.browser = None
+        self.pages_served = 0
+        # Launch switch that identifies this thread's Chromium among the
+        # process's children (render_service and other pools have their own)
+        self._tag = None
+        self._process = None
+
+    def run(self):
+        try:
+            while True:
+                task = self.pool._tasks.get()
+                if task is _STOP:
+                    return
+                self._render(*task)
+        finally:
+            self._close_browser()
+            if self.playwright is not None:
+                self.playwright.stop()
+
+    def _render(self, fn: Callable, context_options: Dict, init_script: Optional[str], future: Future):
+        """Run one task in a fresh, isolated browser context"""
+        if not future.set_running_or_notify_cancel():
+            return
+
+        context = None
+        try:
+            browser = self._ensure_browser()
+            context = browser.new_context(**context_options)
+            page = context.new_page()
+            if init_script:
+                page.add_init_script(init_script)
+            future.set_result(fn(page))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close browser context: {e}")
+            self.pages_served += 1
+            self.pool._record_page()
+            self._recycle_if_needed()
+
+    def _ensure_browser(self):
+        """Launch Chromium if this thread has none (or it crashed)"""
+        if self.browser is not None and self.browser.is_connected():
+            return self.browser
+
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        self._tag = f"--scrapex-browser={uuid.uuid4().hex}"
+        self._process = None
+        self.browser = self.playwright.chromium.launch(headless=self.pool.headless, args=LAUNCH_ARGS + [self._tag])
+        self.pages_served = 0
+        self.pool._record_launch()
+        logger.info(f"{self.name}: launched Chromium")
+        return self.browser
+
+    def _recycle_if_needed(self):
+        """Restart Chromium after too many pages or when browsers use too much memory"""
+        if self.browser is None:
+            return
+
+        reason = None
+        if self.pages_served >= self.pool.max_pages_per_browser:
+            reason = f"served {self.pages_served} pages"
+        else:
+            rss_mb = self.rss_mb()
+            if rss_mb > self.pool.max_rss_mb:
+                reason = f"browser RSS {rss_mb:.0f}MB"
+
+        if reason:
+            logger.info(f"{self.name}: recycling Chromium ({reason})")
+            self._close_browser()
+            self.pool._record_recycle()
+
+    def rss_mb(self) -> float:
+        """Resident memory of this thread's Chromium and its renderer/helper processes"""
+        root = self._browser_process()
+        if root is None:
+            return 0.0
+        try:
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0.0
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1024 / 1024
+
+    def _browser_process(self) -> Optional[psutil.Process]:
+        """Find (once per launch) the Chromium process started with this thread's tag"""
+        if self._process is not None and self._process.is_running():
+            return self._process
+        if self._tag is None:
+            return None
+        try:
+            children = psutil.Process(os.getpid()).children(recursive=True)
+        except psutil.Error:
+            return None
+        for child in children:
+            try:
+                if self._tag in child.cmdline():
+                    self._process = child
+                    return child
+            except psutil.Error:
+                continue
+        return None
+
+    def _close_browser(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as e:
+                logger.warning(f"{self.name}: failed to close Chromium: {e}")
+            self.browser = None
+
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Chromium browsers
+
+    Features:
+    - Browsers are launched once and reused, instead of one launch per URL
+    - Every render gets its own browser context (cookies/storage isolated)
+    - Browsers are recycled after N pages or when their own Chromium process
+      tree (found by a launch tag) grows too large
+    - Callable from any thread; renders queue up when all browsers are busy
+    """
+
+    # Configuration
+    POOL_SIZE = int(os.getenv('SCRAPEX_BROWSER_POOL_SIZE', '2'))
+    MAX_PAGES_PER_BROWSER = int(os.getenv('SCRAPEX_BROWSER_MAX_PAGES', '100'))
+    MAX_RSS_MB = int(os.getenv('SCRAPEX_BROWSER_MAX_RSS_MB', '1024'))
+    HEADLESS = os.getenv('SCRAPEX_BROWSER_HEADLESS', 'true').lower() == 'true'
+
+    def __init__(self, size: Optional[int] = None, max_pages_per_browser: Optional[int] = None,
+                 max_rss_mb: Optional[int] = None, headless: Optional[bool] = None):
+        """
+        Initialize browser pool (browsers start on first use)
+
+        Args:
+            size: Number of Chromium instances
+            max_pages_per_browser: Pages a browser serves before it is restarted
+            max_rss_mb: RSS of one browser's process tree that triggers its restart
+            headless: Run Chromium without a window
+        """
+        self.size = size or self.POOL_SIZE
+        self.max_pages_per_browser = max_pages_per_browser or self.MAX_PAGES_PER_BROWSER
+        self.max_rss_mb = max_rss_mb or self.MAX_RSS_MB
+        self.headless = self.HEADLESS if headless is None else headless
+        self._tasks = queue.Queue()
+        self._threads: List[_BrowserThread] = []
+        self._lock = threading.Lock()
+        self._stats = {'pages': 0, 'launches': 0, 'recycles': 0}
+
+    def run(self, fn: Callable[..., T], context_options: Optional[Dict] = None,
+            init_script: Optional[str] = STEALTH_INIT_SCRIPT, timeout: Optional[float] = None) -> T:
+        """
+        Render with a pooled browser
+
+        Args:
+            fn: Function called with a fresh Playwright page; runs on the
+                browser's thread and should return plain data (HTML, text, dicts)
+            context_options: Options for browser.new_context (viewport, user_agent, ...)
+            init_script: Script added to the page before navigation
+            timeout: Seconds to wait for a browser and the render
+
+        Returns:
+            Whatever fn returns (exceptions raised by fn are re-raised here)
+
+        Raises:
+            TimeoutError: No result within the timeout (a render that has not
+                          started yet is cancelled and never runs)
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not available")
+
+        self._start()
+        future = Future()
+        self._tasks.put((fn, context_options or {}, init_script, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Nobody is waiting any more; don't let a queued render take a browser
+            future.cancel()
+            raise
+
+    def warm_up(self):
+        """Start the browser threads now instead of on first render"""
+        if PLAYWRIGHT_AVAILABLE:
+            self._start()
+
+    def browser_rss_mb(self) -> float:
+        """Resident memory of this pool's Chromium processes (not other pools' or render_service's)"""
+        with self._lock:
+            threads = list(self._threads)
+        return sum(thread.rss_mb() for thread in threads)
+
+    def stats(self) -> Dict:
+        """Get pool counters"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'threads': len(self._threads),
+                'waiting': self._tasks.qsize(),
+                **self._stats
+            }
+
+    def close(self):
+        """Stop all browser threads and close their browsers"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._tasks.put(_STOP)
+        for thread in threads:
+            thread.join(timeout=10)
+
+    def _start(self):
+        """Start browser threads up to the pool size"""
+        with self._lock:
+            while len(self._threads) < self.size:
+                thread = _BrowserThread(self, len(self._threads))
+                thread.start()
+                self._threads.append(thread)
+
+    def _record_page(self):
+        with self._lock:
+            self._stats['pages'] += 1
+
+    def _record_launch(self):
+        with self._lock:
+            self._stats['launches'] += 1
+
+    def _record_recycle(self):
+        with self._lock:
+            self._stats['recycles'] += 1
+
+
+# Global instance
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
+
+# Single visible browser shared by debugging scrapers (headless=False)
+debug_browser_pool = BrowserPool(size=1, headless=False)
+atexit.register(debug_browser_pool.close)
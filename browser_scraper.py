@@ -3,7 +3,7 @@ Browser-Based Healthcare Facility Scraper using Playwright
 Bypasses bot detection by using a real browser engine
 """
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 from bs4 import BeautifulSoup
 import json
 import re
@@ -11,6 +11,9 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
+from browser_pool import RENDER_MARGIN_SECONDS, browser_pool, debug_browser_pool
+from page_readiness import CONTACT_SIGNALS, wait_until_ready
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,9 @@ class BrowserScraper:
     def __init__(self, headless: bool = True):
         self.headless = headless
         self.timeout = 30000  # 30 seconds in milliseconds
+        # Headless scrapes share the warm process-wide pool; visible browsers
+        # (debugging) share one single-browser pool, closed at exit
+        self.pool = browser_pool if headless else debug_browser_pool
 
     def scrape_facility_website(self, url: str) -> Dict:
         """
@@ -32,75 +38,74 @@ class BrowserScraper:
         Returns:
             Dictionary with extracted facility data
         """
+        # Context with realistic settings and stealth mode
+        context_options = {
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'locale': 'en-US',
+            'timezone_id': 'America/New_York',
+            'permissions': ['geolocation'],
+            'extra_http_headers': {
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Sec-Fetch-Dest': 'document',
+                'Sec-Fetch-Mode': 'navigate',
+                'Sec-Fetch-Site': 'none',
+                'Sec-Fetch-User': '?1'
+            }
+        }
+        
+        def render(page):
+            # Navigate to URL
+            logger.info(f"Navigating to {url}")
+            page.goto(url, wait_until='load', timeout=self.timeout)
+            
+            # Wait until contact links appear or the page stops changing
+            ready = wait_until_ready(page, CONTACT_SIGNALS)
+            
+            # Scroll to trigger lazy loading
+            page.evaluate('window.scrollTo(0, document.body.scrollHeight / 2)')
+            scrolled = wait_until_ready(page)
+            logger.info(f"Page ready in {ready['elapsed_ms']}ms ({ready['reason']}), "
+                        f"after scroll {scrolled['elapsed_ms']}ms ({scrolled['reason']})")
+            
+            # Get page content
+            content = page.content()
+            
+            # Parse with BeautifulSoup
+            soup = BeautifulSoup(content, 'html.parser')
+            
+            # Extract data
+            facility_data = {
+                'url': url,
+                'scraped_at': datetime.now().isoformat(),
+                'scraping_method': 'browser_automation',
+                'facility_name': self._extract_facility_name(soup, page),
+                'phone': self._extract_phone(soup, page),
+                'email': self._extract_email(soup, page),
+                'address': self._extract_address(soup, page),
+                'hours': self._extract_hours(soup),
+                'services': self._extract_services(soup),
+                'website_quality': self._assess_website_quality(soup),
+                'contact_methods': self._extract_contact_methods(soup),
+                'status': 'success'
+            }
+            
+            return facility_data
+        
         try:
-            with sync_playwright() as p:
-                # Launch browser
-                browser = p.chromium.launch(headless=self.headless)
-                
-                # Create context with realistic settings and stealth mode
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    locale='en-US',
-                    timezone_id='America/New_York',
-                    permissions=['geolocation'],
-                    extra_http_headers={
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'none',
-                        'Sec-Fetch-User': '?1'
-                    }
-                )
-                
-                # Create page
-                page = context.new_page()
-                
-                # Navigate to URL
-                logger.info(f"Navigating to {url}")
-                page.goto(url, wait_until='networkidle', timeout=self.timeout)
-                
-                # Wait for page to fully load and render
-                page.wait_for_timeout(3000)
-                
-                # Scroll to trigger lazy loading
-                page.evaluate('window.scrollTo(0, document.body.scrollHeight / 2)')
-                page.wait_for_timeout(1000)
-                
-                # Get page content
-                content = page.content()
-                
-                # Parse with BeautifulSoup
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Extract data
-                facility_data = {
-                    'url': url,
-                    'scraped_at': datetime.now().isoformat(),
-                    'scraping_method': 'browser_automation',
-                    'facility_name': self._extract_facility_name(soup, page),
-                    'phone': self._extract_phone(soup, page),
-                    'email': self._extract_email(soup, page),
-                    'address': self._extract_address(soup, page),
-                    'hours': self._extract_hours(soup),
-                    'services': self._extract_services(soup),
-                    'website_quality': self._assess_website_quality(soup),
-                    'contact_methods': self._extract_contact_methods(soup),
-                    'status': 'success'
-                }
-                
-                # Close browser
-                browser.close()
-                
-                logger.info(f"Successfully scraped {url} using browser automation")
-                logger.info(f"Found {len(facility_data['phone'])} phone numbers")
-                
-                return facility_data
-                
+            # Runs on a warm pooled browser; the context is closed afterwards
+            facility_data = self.pool.run(render, context_options=context_options, init_script=None,
+                                          timeout=self.timeout / 1000 + RENDER_MARGIN_SECONDS)
+            
+            logger.info(f"Successfully scraped {url} using browser automation")
+            logger.info(f"Found {len(facility_data['phone'])} phone numbers")
+            
+            return facility_data
+            
         except PlaywrightTimeout as e:
             logger.error(f"Timeout while scraping {url}: {str(e)}")
             return self._create_error_response(url, f"Page load timeout: {str(e)}")
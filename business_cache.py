@@ -0,0 +1,203 @@
+"""
+Business Result Cache for ScrapeX
+Reuses recent website scrape results across jobs and users
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from domain_profile import domain_key
+from http_cache import revalidating
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Paths that are the same page as the site root
+_ROOT_PATHS = ('', '/', '/index.html', '/index.htm', '/index.php', '/home')
+
+
+def cache_key(url: str) -> str:
+    """
+    Canonical cache key for a business website
+
+    Member sites are keyed by canonical domain (lowercase, no www., scheme
+    ignored). Listings pointing below the root keep their path, so pages on
+    shared hosts (social profiles, franchise locators) stay distinct.
+    """
+    path = urlparse(url if '://' in url else f"http://{url}").path.rstrip('/').lower()
+    domain = domain_key(url)
+    return domain if path in _ROOT_PATHS else f"{domain}{path}"
+
+
+class BusinessResultCache:
+    """
+    Persistent cache of successful business website scrapes
+
+    Features:
+    - Keyed by canonical domain, shared by every job, user and worker process
+    - Results are reused while younger than the freshness TTL
+    - force_refresh skips the cache and replaces the stored result; pages the
+      re-scrape fetches are revalidated instead of served from the HTTP cache
+    - Survives restarts (SQLite); expired rows are pruned as new ones arrive
+    """
+
+    # Configuration
+    DB_PATH = os.getenv('SCRAPEX_RESULT_CACHE_PATH', '/tmp/scrapex_result_cache.db')
+    TTL_HOURS = float(os.getenv('SCRAPEX_RESULT_CACHE_TTL_HOURS', '24'))
+    PRUNE_EVERY = 500
+
+    def __init__(self, db_path: Optional[str] = None, ttl_hours: Optional[float] = None):
+        """
+        Initialize result cache
+
+        Args:
+            db_path: Path of the SQLite database file
+            ttl_hours: Age after which a cached result is scraped again (0 disables the cache)
+        """
+        self.db_path = db_path or self.DB_PATH
+        self.ttl = (ttl_hours if ttl_hours is not None else self.TTL_HOURS) * 3600
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'refreshes': 0, 'stored': 0}
+        self._puts_since_prune = 0
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the cache database"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the cache table"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS business_results (
+                    cache_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_business_results_stored ON business_results(stored_at)')
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Get a fresh cached result for a website
+
+        Args:
+            url: Business website
+
+        Returns:
+            Cached scrape result (with from_cache=True), or None
+        """
+        if self.ttl <= 0:
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT result, stored_at FROM business_results WHERE cache_key = ?',
+                               (cache_key(url),)).fetchone()
+
+        if row is None or time.time() - row[1] > self.ttl:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self._stats['hits'] += 1
+        result = json.loads(row[0])
+        result['from_cache'] = True
+        return result
+
+    def put(self, url: str, result: Dict):
+        """
+        Store a successful scrape result
+
+        Args:
+            url: Business website
+            result: Result of UniversalBusinessScraper.scrape_business
+        """
+        if self.ttl <= 0 or result.get('status') != 'success':
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO business_results (cache_key, url, result, stored_at) VALUES (?, ?, ?, ?)',
+                (cache_key(url), url, json.dumps(result, default=str), now)
+            )
+
+        with self._lock:
+            self._stats['stored'] += 1
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= self.PRUNE_EVERY
+            if prune:
+                self._puts_since_prune = 0
+        if prune:
+            self.prune()
+
+    def get_or_scrape(self, url: str, scrape_fn: Callable[[str], Dict], force_refresh: bool = False) -> Dict:
+        """
+        Return a fresh cached result, or scrape and cache one
+
+        Args:
+            url: Business website
+            scrape_fn: Function scraping the website (called with url)
+            force_refresh: Ignore any cached result and scrape again, revalidating
+                           every page the scrape fetches from the HTTP cache
+
+        Returns:
+            Scrape result
+        """
+        if force_refresh:
+            with self._lock:
+                self._stats['refreshes'] += 1
+        else:
+            cached = self.get(url)
+            if cached is not None:
+                logger.info(f"Using cached result for {url}")
+                return cached
+
+        if force_refresh:
+            with revalidating():
+                result = scrape_fn(url)
+        else:
+            result = scrape_fn(url)
+        self.put(url, result)
+        return result
+
+    def invalidate(self, url: str):
+        """Drop the cached result for a website"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM business_results WHERE cache_key = ?', (cache_key(url),))
+
+    def prune(self) -> int:
+        """Delete expired results, returning how many were removed"""
+        with self._connect() as conn:
+            removed = conn.execute('DELETE FROM business_results WHERE stored_at < ?',
+                                   (time.time() - self.ttl,)).rowcount
+        if removed:
+            logger.info(f"Pruned {removed} expired business results")
+        return removed
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        with self._connect() as conn:
+            entries = conn.execute('SELECT COUNT(*) FROM business_results').fetchone()[0]
+        with self._lock:
+            return {'entries': entries, 'ttl_hours': self.ttl / 3600, **self._stats}
+
+
+# Global instance
+business_cache = BusinessResultCache()
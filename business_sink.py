@@ -0,0 +1,174 @@
+"""
+Business Sink for ScrapeX
+Streams scraped businesses to the database while a job is still running
+"""
+
+import os
+import queue
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+from supabase_manager import db_manager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream
+_CLOSE = object()
+
+
+class BusinessSink:
+    """
+    Bounded, write-behind persistence for one job's businesses
+
+    Features:
+    - put() hands a business to a background writer as soon as it is scraped
+    - The queue is bounded: if the database falls behind, put() blocks and
+      scraping slows down instead of buffering without limit
+    - Businesses are saved in multi-row inserts of up to flush_size rows, or
+      whatever has arrived after flush_interval seconds
+    - Everything handed over before a failure or timeout is still saved by close()
+    - A failed save is logged and counted; the writer keeps running, so put()
+      and close() never wait on a dead thread
+    - Each website is saved once per job: a resumed job skips businesses the
+      interrupted run already saved (they may not have reached the checkpoint)
+    """
+
+    # Configuration
+    MAX_QUEUED = int(os.getenv('SCRAPEX_DB_SINK_QUEUE_SIZE', '500'))
+    FLUSH_SIZE = int(os.getenv('SCRAPEX_DB_SINK_FLUSH_SIZE', '50'))
+    FLUSH_INTERVAL_SECONDS = float(os.getenv('SCRAPEX_DB_SINK_FLUSH_SECONDS', '2'))
+
+    def __init__(self, job_id: str, user_id: str, max_queued: Optional[int] = None,
+                 flush_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 resume: bool = False):
+        """
+        Initialize sink and start its writer thread
+
+        Args:
+            job_id: Job the businesses belong to
+            user_id: User who owns the businesses
+            max_queued: Businesses allowed to wait for the writer
+            flush_size: Maximum rows per insert
+            flush_interval: Seconds to wait for a full chunk before saving a partial one
+            resume: The job is resuming; load the websites it already saved first
+        """
+        self.job_id = job_id
+        self.user_id = user_id
+        self.flush_size = flush_size or self.FLUSH_SIZE
+        self.flush_interval = flush_interval or self.FLUSH_INTERVAL_SECONDS
+        self.resume = resume
+        self._queue = queue.Queue(maxsize=max_queued or self.MAX_QUEUED)
+        self._saved_websites = set()
+        self._stats = {'received': 0, 'saved': 0, 'failed': 0, 'skipped': 0}
+        self._stats_lock = threading.Lock()  # put() and the writer both count
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"sink-{job_id}", daemon=True)
+        self._thread.start()
+
+    def put(self, business: Dict):
+        """Queue a scraped business for saving (blocks while the queue is full)"""
+        if self._closed:
+            raise RuntimeError(f"Sink for job {self.job_id} is closed")
+        self._count('received')
+        self._queue.put(business)
+
+    def close(self, discard: bool = False) -> Dict:
+        """
+        Save everything still queued and stop the writer
+
+        Args:
+            discard: Drop businesses still queued instead of saving them
+
+        Returns:
+            Dict with received, saved and failed counts
+        """
+        if not self._closed:
+            self._closed = True
+            if discard:
+                self._drain()
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            logger.info(f"Job {self.job_id}: saved {self._stats['saved']}/{self._stats['received']} businesses")
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, counter: str, amount: int = 1):
+        """Add to one of the sink's counters"""
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def _drain(self):
+        """Drop everything still queued"""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._count('skipped')
+
+    def _run(self):
+        """Writer loop: collect chunks and save them"""
+        if self.resume:
+            self._load_saved_websites()
+
+        chunk: List[Dict] = []
+        deadline = time.time() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                item = None
+
+            if item is not None and item is not _CLOSE:
+                chunk.append(item)
+
+            if chunk and (item is None or item is _CLOSE or len(chunk) >= self.flush_size):
+                self._save(chunk)
+                chunk = []
+            if item is None or not chunk:
+                deadline = time.time() + self.flush_interval
+
+            if item is _CLOSE:
+                return
+
+    def _save(self, chunk: List[Dict]):
+        """Insert a chunk of businesses (errors are logged and counted, never raised)"""
+        websites = {}
+        for business in chunk:
+            website = _website(business)
+            if website and (website in self._saved_websites or website in websites):
+                self._count('skipped')
+                continue
+            websites[website] = business
+        chunk = list(websites.values())
+        if not chunk:
+            return
+
+        try:
+            result = db_manager.save_businesses_bulk(self.job_id, self.user_id, chunk, chunk_size=len(chunk))
+        except Exception as e:
+            logger.error(f"Job {self.job_id}: failed to save {len(chunk)} businesses: {e}")
+            result = {'saved': 0, 'failed': len(chunk)}
+
+        saved = result.get('saved', 0)
+        self._count('saved', saved)
+        self._count('failed', result.get('failed', len(chunk) - saved))
+        if saved == len(chunk):
+            self._saved_websites.update(website for website in websites if website)
+
+    def _load_saved_websites(self):
+        """Remember the websites an interrupted run of this job already saved"""
+        try:
+            self._saved_websites.update(db_manager.get_job_business_websites(self.job_id))
+            logger.info(f"Job {self.job_id}: {len(self._saved_websites)} businesses already saved before resume")
+        except Exception as e:
+            logger.error(f"Job {self.job_id}: could not load saved businesses, duplicates possible: {e}")
+
+
+def _website(business: Dict) -> Optional[str]:
+    """Website a business is saved under (matches the scraped_businesses row)"""
+    return business.get('url') or business.get('website')
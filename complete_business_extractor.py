@@ -3,7 +3,6 @@ Complete Business Data Extractor - 100% Success Rate
 Extracts ALL business information using multiple data sources and AI analysis
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 import re
@@ -21,12 +20,9 @@ except ImportError:
     API_CLIENT_AVAILABLE = False
     logging.warning("API Client not available")
 
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    logging.warning("Playwright not available")
+from render_service import render_service, PLAYWRIGHT_AVAILABLE
+from page_readiness import CONTACT_SIGNALS
+from fetch_service import fetch_service
 
 try:
     from openai import OpenAI
@@ -54,11 +50,7 @@ class CompleteBusinessExtractor:
     """
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+        self.fetcher = fetch_service
         self.timeout = 15
         
         if API_CLIENT_AVAILABLE:
@@ -139,7 +131,7 @@ class CompleteBusinessExtractor:
         
         # Try HTTP first
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.fetcher.get(url, scraper='complete_extractor', timeout=self.timeout)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -184,31 +176,20 @@ class CompleteBusinessExtractor:
     
     def _browser_extract(self, url: str) -> Dict:
         """Extract using browser automation with JavaScript rendering"""
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=['--no-sandbox'])
-            page = browser.new_page()
-            
-            # Stealth mode
-            page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            """)
-            
-            page.goto(url, wait_until='networkidle', timeout=20000)
-            page.wait_for_timeout(3000)
-            
-            content = page.content()
-            page_text = page.inner_text('body')
-            
-            browser.close()
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            return {
-                'business_name': self._extract_business_name(soup),
-                'phone': self._extract_phones(soup, page_text),
-                'email': self._extract_emails(soup, page_text),
-                'page_content': page_text[:10000]
-            }
+        # Shared async browser, stealth init script included
+        # Ready once contact links appear or the DOM settles
+        rendered = render_service.render_sync(url, wait_until='load', timeout_ms=20000,
+                                              ready_signals=CONTACT_SIGNALS)
+        content, page_text = rendered['html'], rendered['text']
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        return {
+            'business_name': self._extract_business_name(soup),
+            'phone': self._extract_phones(soup, page_text),
+            'email': self._extract_emails(soup, page_text),
+            'page_content': page_text[:10000]
+        }
     
     def _enrich_from_linkedin(self, company_name: str) -> Optional[Dict]:
         """Enrich data from LinkedIn Company API"""
@@ -0,0 +1,36 @@
+"""
+Shared pytest fixtures for the offline ScrapeX tests
+"""
+
+import pytest
+import requests
+
+BUSINESS_PAGE = b'''<html><head><title>Joe's Plumbing</title>
+<meta name="description" content="Family plumbing since 1980"></head>
+<body><a href="tel:+12127365000">(212) 736-5000</a> joe@joesplumbing.com</body></html>'''
+
+
+class FakeFetcher:
+    """Stands in for the fetch service: serves BUSINESS_PAGE, or a status code per URL"""
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.requests = []
+
+    def get(self, url, scraper='default', timeout=None, use_cache=True, on_headers=None):
+        self.requests.append(url)
+        response = requests.Response()
+        response.status_code = self.statuses.get(url, 200)
+        if on_headers and response.status_code < 400:
+            on_headers()
+        response._content = BUSINESS_PAGE if response.status_code == 200 else b'error'
+        response.headers['content-type'] = 'text/html; charset=utf-8'
+        response.url = url
+        response.encoding = 'utf-8'
+        return response
+
+
+@pytest.fixture
+def fake_fetcher():
+    """Factory for fake fetchers: fake_fetcher({url: status})"""
+    return FakeFetcher
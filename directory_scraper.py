@@ -3,7 +3,6 @@ Directory Scraper for ScrapeX
 Extracts business listings from directories like Chamber of Commerce, tourism sites, etc.
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 import re
@@ -12,12 +11,10 @@ from datetime import datetime
 import logging
 from urllib.parse import urljoin, urlparse
 
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    logging.warning("Playwright not available")
+from render_service import render_service, PLAYWRIGHT_AVAILABLE
+from page_readiness import LISTING_SIGNALS
+from domain_profile import domain_profiles, detect_cms
+from fetch_service import fetch_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,11 +33,8 @@ class DirectoryScraper:
     """
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+        self.fetcher = fetch_service
+        # Read timeout until the host has latency history (see host_timeouts)
         self.timeout = 15
 
     def scrape_directory(self, directory_url: str, directory_type: Optional[str] = None) -> Dict:
@@ -56,17 +50,32 @@ class DirectoryScraper:
         """
         logger.info(f"Scraping directory: {directory_url}")
         
+        # Step 0: Directories known to render listings with JavaScript skip HTTP
+        browser_result = None
+        if PLAYWRIGHT_AVAILABLE and domain_profiles.prefers_browser(directory_url):
+            browser_result = self._try_browser_scrape_directory(directory_url, directory_type)
+            if self._has_listings(browser_result):
+                logger.info(f"Browser scrape successful - found {len(browser_result['businesses'])} businesses")
+                domain_profiles.record(directory_url, browser_ok=True)
+                return browser_result
+            logger.info("Browser-first scrape found no listings, trying HTTP")
+        
         # Step 1: Try HTTP (fast)
         http_result = self._try_http_scrape_directory(directory_url, directory_type)
-        if http_result.get('status') == 'success' and len(http_result.get('businesses', [])) > 0:
+        if self._has_listings(http_result):
             logger.info(f"HTTP scrape successful - found {len(http_result['businesses'])} businesses")
+            domain_profiles.record(directory_url, http_ok=True, cms=http_result.get('cms'))
             return http_result
         
         # Step 2: Try browser automation
         if PLAYWRIGHT_AVAILABLE:
-            logger.info("Trying browser automation for directory")
-            browser_result = self._try_browser_scrape_directory(directory_url, directory_type)
-            if browser_result.get('status') == 'success' and len(browser_result.get('businesses', [])) > 0:
+            if browser_result is None:
+                logger.info("Trying browser automation for directory")
+                browser_result = self._try_browser_scrape_directory(directory_url, directory_type)
+            browser_ok = self._has_listings(browser_result)
+            domain_profiles.record(directory_url, http_ok=False, browser_ok=browser_ok,
+                                   cms=http_result.get('cms'))
+            if browser_ok:
                 logger.info(f"Browser scrape successful - found {len(browser_result['businesses'])} businesses")
                 return browser_result
         
@@ -80,10 +89,14 @@ class DirectoryScraper:
             'scraped_at': datetime.now().isoformat()
         }
 
+    def _has_listings(self, result: Dict) -> bool:
+        """Whether a scrape result contains business listings"""
+        return result.get('status') == 'success' and len(result.get('businesses', [])) > 0
+
     def _try_http_scrape_directory(self, directory_url: str, directory_type: Optional[str] = None) -> Dict:
         """HTTP scraping for directory pages"""
         try:
-            response = self.session.get(directory_url, timeout=self.timeout)
+            response = self.fetcher.get(directory_url, scraper='directory', timeout=self.timeout)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -103,6 +116,7 @@ class DirectoryScraper:
                 'total_found': len(businesses),
                 'pagination_urls': pagination_urls,
                 'has_more_pages': len(pagination_urls) > 0,
+                'cms': detect_cms(response.text),
                 'status': 'success'
             }
             
@@ -113,51 +127,36 @@ class DirectoryScraper:
     def _try_browser_scrape_directory(self, directory_url: str, directory_type: Optional[str] = None) -> Dict:
         """Browser automation scraping for directory pages"""
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=['--disable-blink-features=AutomationControlled', '--no-sandbox']
-                )
-                
-                page = browser.new_page()
-                
-                # Add stealth scripts
-                page.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-                """)
-                
-                # Navigate
-                page.goto(directory_url, wait_until='load', timeout=20000)
-                page.wait_for_timeout(3000)  # Wait for dynamic content
-                
-                # Scroll to load lazy-loaded content
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(2000)
-                
-                # Get content
-                content = page.content()
-                
-                browser.close()
-                
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Extract businesses
-                businesses = self._extract_business_listings(soup, directory_url)
-                pagination_urls = self._extract_pagination_urls(soup, directory_url)
-                
-                return {
-                    'directory_url': directory_url,
-                    'directory_type': directory_type or self._detect_directory_type(soup),
-                    'scraped_at': datetime.now().isoformat(),
-                    'scraping_method': 'browser_automation',
-                    'businesses': businesses,
-                    'total_found': len(businesses),
-                    'pagination_urls': pagination_urls,
-                    'has_more_pages': len(pagination_urls) > 0,
-                    'status': 'success'
-                }
-                
+            # Render in the shared async browser; wait until listings appear
+            # (or the DOM settles), then scroll to load lazy-loaded content
+            rendered = render_service.render_sync(
+                directory_url,
+                wait_until='load',
+                timeout_ms=20000,
+                ready_signals=LISTING_SIGNALS,
+                scroll=True
+            )
+            content = rendered['html']
+            logger.info(f"Rendered {directory_url} in {rendered['elapsed_seconds']:.1f}s "
+                        f"(readiness: {rendered['readiness']})")
+            soup = BeautifulSoup(content, 'html.parser')
+            
+            # Extract businesses
+            businesses = self._extract_business_listings(soup, directory_url)
+            pagination_urls = self._extract_pagination_urls(soup, directory_url)
+            
+            return {
+                'directory_url': directory_url,
+                'directory_type': directory_type or self._detect_directory_type(soup),
+                'scraped_at': datetime.now().isoformat(),
+                'scraping_method': 'browser_automation',
+                'businesses': businesses,
+                'total_found': len(businesses),
+                'pagination_urls': pagination_urls,
+                'has_more_pages': len(pagination_urls) > 0,
+                'status': 'success'
+            }
+            
         except Exception as e:
             logger.error(f"Browser directory scrape failed: {e}")
             return {'status': 'failed', 'error': str(e)}
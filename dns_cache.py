@@ -0,0 +1,303 @@
+"""
+DNS Cache for ScrapeX
+Caching resolver behind socket.getaddrinfo, with bulk prefetch of harvested domains
+"""
+
+import ipaddress
+import os
+import socket
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from single_flight import SingleFlight
+
+try:
+    import dns.resolver
+    DNSPYTHON_AVAILABLE = True
+except ImportError:
+    DNSPYTHON_AVAILABLE = False
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The real resolver, captured before install() replaces socket.getaddrinfo
+_system_getaddrinfo = socket.getaddrinfo
+
+# (family, ip) pairs plus the TTL they may be cached for
+Addresses = Tuple[List[Tuple[int, str]], Optional[float]]
+
+
+class SystemResolver:
+    """
+    Resolves with the operating system resolver
+
+    getaddrinfo does not expose record TTLs, so results carry no TTL and the
+    cache applies its default.
+    """
+
+    def resolve(self, host: str) -> Addresses:
+        addresses = []
+        for family, _, _, _, sockaddr in _system_getaddrinfo(host, None, 0, socket.SOCK_STREAM):
+            if (family, sockaddr[0]) not in addresses:
+                addresses.append((family, sockaddr[0]))
+        return addresses, None
+
+
+class DnspythonResolver:
+    """
+    Resolves A/AAAA records with dnspython, keeping the records' TTL
+
+    dnspython queries the nameservers directly and does not read /etc/hosts,
+    so names DNS does not know (hosts-file entries, single-label names) are
+    handed to the system resolver. A hosts-file entry that overrides a name
+    DNS does know is not honoured.
+    """
+
+    def __init__(self, lifetime: float = 5.0, fallback=None):
+        self.resolver = dns.resolver.Resolver()
+        self.resolver.lifetime = lifetime
+        self.fallback = fallback or SystemResolver()
+
+    def resolve(self, host: str) -> Addresses:
+        addresses, ttls, error = [], [], None
+        for record_type, family in (('A', socket.AF_INET), ('AAAA', socket.AF_INET6)):
+            try:
+                answer = self.resolver.resolve(host, record_type)
+            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+                continue
+            except dns.exception.DNSException as e:
+                # One record type timing out must not fail a host the other resolved
+                error = e
+                continue
+            addresses.extend((family, record.address) for record in answer)
+            ttls.append(answer.rrset.ttl)
+
+        if addresses:
+            return addresses, float(min(ttls))
+        if error is not None:
+            raise socket.gaierror(socket.EAI_AGAIN, str(error))
+        return self.fallback.resolve(host)
+
+
+class DNSCache:
+    """
+    Process-wide caching resolver
+
+    Features:
+    - install() replaces socket.getaddrinfo, so requests, httpx and asyncio
+      lookups all share it; entrypoints (API startup, queue workers) call it
+      explicitly when SCRAPEX_DNS_CACHE is enabled, never at import time
+    - Positive answers are kept for the record TTL (bounded), or a default TTL
+      when the resolver does not report one
+    - Failed lookups are cached for a short negative TTL
+    - Concurrent lookups of the same host share one resolver call
+    - Pluggable resolver: anything with resolve(host) -> ([(family, ip)], ttl),
+      e.g. a stub returning fixed addresses in tests
+    - prefetch() resolves many hosts concurrently ahead of a scrape
+    """
+
+    # Configuration
+    ENABLED = os.getenv('SCRAPEX_DNS_CACHE', 'true').lower() == 'true'
+    DEFAULT_TTL_SECONDS = float(os.getenv('SCRAPEX_DNS_TTL', '300'))
+    MIN_TTL_SECONDS = 30.0
+    MAX_TTL_SECONDS = float(os.getenv('SCRAPEX_DNS_MAX_TTL', '3600'))
+    NEGATIVE_TTL_SECONDS = float(os.getenv('SCRAPEX_DNS_NEGATIVE_TTL', '60'))
+    MAX_ENTRIES = int(os.getenv('SCRAPEX_DNS_CACHE_SIZE', '10000'))
+    PREFETCH_WORKERS = int(os.getenv('SCRAPEX_DNS_PREFETCH_WORKERS', '32'))
+    PREFETCH_TIMEOUT_SECONDS = float(os.getenv('SCRAPEX_DNS_PREFETCH_TIMEOUT', '15'))
+
+    def __init__(self, resolver=None, default_ttl: Optional[float] = None,
+                 negative_ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Initialize DNS cache
+
+        Args:
+            resolver: Object with resolve(host); defaults to dnspython when
+                      installed (real TTLs), otherwise the system resolver
+            default_ttl: Seconds to keep answers that carry no TTL
+            negative_ttl: Seconds to remember failed lookups
+            max_entries: Hosts kept before the least recently used are dropped
+        """
+        if resolver is None:
+            resolver = SystemResolver()
+            if DNSPYTHON_AVAILABLE:
+                try:
+                    resolver = DnspythonResolver()
+                except dns.resolver.NoResolverConfiguration as e:
+                    logger.warning(f"No nameservers for dnspython, using the system resolver: {e}")
+        self.resolver = resolver
+        self.default_ttl = default_ttl or self.DEFAULT_TTL_SECONDS
+        self.negative_ttl = negative_ttl if negative_ttl is not None else self.NEGATIVE_TTL_SECONDS
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._entries: OrderedDict = OrderedDict()  # host -> (expires_at, addresses or gaierror)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight('dns')
+        self._installed = False
+        self._stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'failures': 0, 'prefetched': 0}
+
+    def lookup(self, host: str) -> List[Tuple[int, str]]:
+        """
+        Resolve a host through the cache
+
+        Args:
+            host: Hostname
+
+        Returns:
+            List of (family, ip) pairs
+
+        Raises:
+            socket.gaierror: The host does not resolve (possibly a cached failure)
+        """
+        host = host.lower().rstrip('.')
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(host)
+                if isinstance(entry[1], socket.gaierror):
+                    self._stats['negative_hits'] += 1
+                    raise entry[1]
+                self._stats['hits'] += 1
+                return list(entry[1])
+            self._stats['misses'] += 1
+
+        return self._flights.do(host, self._resolve, host)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Drop-in replacement for socket.getaddrinfo backed by the cache"""
+        if not self._cacheable(host, port, flags):
+            return _system_getaddrinfo(host, port, family, type, proto, flags)
+
+        host = host.decode('idna') if isinstance(host, bytes) else host
+        port = int(port or 0)
+        socktypes = [type] if type else [socket.SOCK_STREAM, socket.SOCK_DGRAM]
+        results = []
+        for address_family, ip in self.lookup(host):
+            if family and address_family != family:
+                continue
+            sockaddr = (ip, port) if address_family == socket.AF_INET else (ip, port, 0, 0)
+            for socktype in socktypes:
+                protocol = proto or (socket.IPPROTO_TCP if socktype == socket.SOCK_STREAM else socket.IPPROTO_UDP)
+                results.append((address_family, socktype, protocol, '', sockaddr))
+
+        if not results:
+            raise socket.gaierror(socket.EAI_ADDRFAMILY if hasattr(socket, 'EAI_ADDRFAMILY') else socket.EAI_NONAME,
+                                  f"No address of the requested family for {host}")
+        return results
+
+    def install(self):
+        """Route socket.getaddrinfo through this cache (idempotent; called at process startup)"""
+        with self._lock:
+            if self._installed:
+                return
+            socket.getaddrinfo = self.getaddrinfo
+            self._installed = True
+        logger.info(f"DNS cache installed ({type(self.resolver).__name__})")
+
+    def uninstall(self):
+        """Restore the system socket.getaddrinfo"""
+        with self._lock:
+            if self._installed:
+                socket.getaddrinfo = _system_getaddrinfo
+                self._installed = False
+
+    def prefetch(self, urls: Iterable[str], timeout: Optional[float] = None) -> Dict:
+        """
+        Resolve the hosts of many URLs concurrently
+
+        Lookups still running after the timeout are left to finish in the
+        background; the scrape that needs them will join the in-flight lookup.
+
+        Args:
+            urls: URLs or hostnames
+            timeout: Seconds to wait for the lookups
+
+        Returns:
+            Dict with hosts, resolved, failed and pending counts
+        """
+        hosts = sorted({self._hostname(url) for url in urls if url} - {''})
+        hosts = [host for host in hosts if self._cacheable(host, None, 0)]
+        if not hosts:
+            return {'hosts': 0, 'resolved': 0, 'failed': 0, 'pending': 0}
+
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=min(self.PREFETCH_WORKERS, len(hosts)),
+                                      thread_name_prefix='dns-prefetch')
+        futures = [executor.submit(self._prefetch_one, host) for host in hosts]
+        done, pending = wait(futures, timeout=timeout or self.PREFETCH_TIMEOUT_SECONDS)
+        executor.shutdown(wait=False)
+
+        resolved = sum(1 for future in done if future.result())
+        with self._lock:
+            self._stats['prefetched'] += len(hosts)
+        summary = {'hosts': len(hosts), 'resolved': resolved, 'failed': len(done) - resolved,
+                   'pending': len(pending)}
+        logger.info(f"DNS prefetch: {summary} in {time.time() - start_time:.1f}s")
+        return summary
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        with self._lock:
+            return {'entries': len(self._entries), 'installed': self._installed, **self._stats}
+
+    def clear(self):
+        """Forget every cached answer"""
+        with self._lock:
+            self._entries.clear()
+
+    def _resolve(self, host: str) -> List[Tuple[int, str]]:
+        """Ask the resolver and cache the answer (or the failure)"""
+        try:
+            addresses, ttl = self.resolver.resolve(host)
+        except socket.gaierror as e:
+            with self._lock:
+                self._stats['failures'] += 1
+                self._store(host, e, self.negative_ttl)
+            raise
+
+        ttl = self.default_ttl if ttl is None else min(self.MAX_TTL_SECONDS, max(self.MIN_TTL_SECONDS, ttl))
+        with self._lock:
+            self._store(host, list(addresses), ttl)
+        return list(addresses)
+
+    def _store(self, host: str, value, ttl: float):
+        """Add a cache entry, evicting the least recently used (lock held)"""
+        self._entries[host] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(host)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prefetch_one(self, host: str) -> bool:
+        try:
+            self.lookup(host)
+            return True
+        except (socket.gaierror, OSError):
+            return False
+
+    def _hostname(self, url: str) -> str:
+        """Hostname exactly as a request to the URL will look it up"""
+        return (urlparse(url if '://' in url else f"http://{url}").hostname or '').rstrip('.')
+
+    def _cacheable(self, host, port, flags: int) -> bool:
+        """Whether a lookup can be answered from the cache"""
+        if not host or flags & (socket.AI_CANONNAME | socket.AI_NUMERICHOST):
+            return False
+        if port is not None and not (isinstance(port, int) or str(port).isdigit()):
+            return False  # service names ('http') go to the system resolver
+        host = host.decode('idna') if isinstance(host, bytes) else host
+        if host == 'localhost':
+            return False
+        try:
+            ipaddress.ip_address(host.split('%')[0])
+            return False  # IP literals need no lookup
+        except ValueError:
+            return True
+
+
+# Global instance
+dns_cache = DNSCache()
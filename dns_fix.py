@@ -11,44 +11,60 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Browser-like headers shared by every scraper HTTP client
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
 
-def configure_dns_session():
+
+def configure_dns_session(pool_connections: int = 10, pool_maxsize: int = 20, retries: bool = True):
     """
     Configure requests session with proper DNS resolution and retry logic
+    
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Keep-alive connections per host pool
+        retries: Retry inside the adapter; pass False when the caller
+                 retries itself (the fetch service retries per job budget)
     """
     # Force DNS resolution using system resolver
     socket.setdefaulttimeout(30)
     
+    # Lookups go through the DNS cache once the process entrypoint has
+    # called dns_cache.install(); building a session never patches sockets
+    
     # Create session with retry logic
     session = requests.Session()
     
-    # Configure retry strategy
+    # Configure retry strategy. 429s are left to the host limiter, which
+    # honours Retry-After and slows the whole host down instead of retrying
+    # blindly; connection/DNS failures get a single retry because hosts that
+    # stay unreachable are short-circuited by the host circuit breaker.
     retry_strategy = Retry(
         total=5,
+        connect=1,
         backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
+        status_forcelist=[500, 502, 503, 504],
         allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
     )
     
     # Mount adapter with retry strategy
     adapter = HTTPAdapter(
-        max_retries=retry_strategy,
-        pool_connections=10,
-        pool_maxsize=20
+        max_retries=retry_strategy if retries else 0,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize
     )
     
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     
     # Set headers
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    })
+    session.headers.update(DEFAULT_HEADERS)
     
     return session
 
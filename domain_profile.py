@@ -0,0 +1,221 @@
+"""
+Domain Profiles for ScrapeX
+Remembers per domain whether plain HTTP works or the page needs a browser
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Markers identifying the CMS/site builder from raw HTML
+CMS_SIGNATURES = [
+    ('wix', re.compile(r'static\.wixstatic\.com|wix-warmup-data|_wixCssImports', re.I)),
+    ('squarespace', re.compile(r'static1\.squarespace\.com|Static\.SQUARESPACE_CONTEXT', re.I)),
+    ('shopify', re.compile(r'cdn\.shopify\.com|Shopify\.theme', re.I)),
+    ('webflow', re.compile(r'data-wf-page|assets\.website-files\.com', re.I)),
+    ('godaddy', re.compile(r'img1\.wsimg\.com|godaddy website builder', re.I)),
+    ('weebly', re.compile(r'editmysite\.com|weebly', re.I)),
+    ('wordpress', re.compile(r'/wp-content/|/wp-includes/', re.I)),
+    ('drupal', re.compile(r'Drupal\.settings|/sites/default/files/', re.I)),
+    ('joomla', re.compile(r'/media/jui/|content="Joomla', re.I)),
+]
+
+# Builders whose pages carry no useful content until JavaScript runs
+JS_RENDERED_CMS = ('wix',)
+
+
+def domain_key(url: str) -> str:
+    """Canonical profile key for a URL (lowercase host without www.)"""
+    host = (urlparse(url if '://' in url else f"http://{url}").hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def detect_cms(html: str) -> Optional[str]:
+    """Identify the CMS/site builder that produced a page, if recognisable"""
+    if not html:
+        return None
+    sample = html[:200_000]
+    for name, pattern in CMS_SIGNATURES:
+        if pattern.search(sample):
+            return name
+    return None
+
+
+class DomainProfileStore:
+    """
+    Persistent per-domain fetch strategy profiles
+
+    Features:
+    - Tracks HTTP successes, HTTP failures that a browser then fixed, and CMS
+    - Counts decay exponentially with age, so a domain that once needed a
+      browser is retried over plain HTTP after a while
+    - Shared by all scrapers and jobs through one SQLite file
+    """
+
+    # Configuration
+    DB_PATH = os.getenv('SCRAPEX_DOMAIN_PROFILE_PATH', '/tmp/scrapex_domain_profiles.db')
+    HALF_LIFE_HOURS = float(os.getenv('SCRAPEX_DOMAIN_PROFILE_HALF_LIFE_HOURS', '168'))
+    BROWSER_FIRST_SCORE = float(os.getenv('SCRAPEX_DOMAIN_PROFILE_BROWSER_SCORE', '1.5'))
+    MAX_HTTP_SUCCESS_RATE = 0.3
+
+    def __init__(self, db_path: Optional[str] = None, half_life_hours: Optional[float] = None,
+                 browser_first_score: Optional[float] = None):
+        """
+        Initialize domain profile store
+
+        Args:
+            db_path: Path of the SQLite database file
+            half_life_hours: Hours after which recorded outcomes count half
+            browser_first_score: Decayed count of "HTTP failed, browser worked"
+                outcomes needed before HTTP is skipped
+        """
+        self.db_path = db_path or self.DB_PATH
+        self.half_life = (half_life_hours or self.HALF_LIFE_HOURS) * 3600
+        self.browser_first_score = browser_first_score or self.BROWSER_FIRST_SCORE
+        self._lock = threading.Lock()
+        self._stats = {'lookups': 0, 'browser_first': 0, 'recorded': 0}
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the profile database"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the profile table"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS domain_profiles (
+                    domain TEXT PRIMARY KEY,
+                    http_ok REAL NOT NULL DEFAULT 0,
+                    http_failed REAL NOT NULL DEFAULT 0,
+                    needs_browser REAL NOT NULL DEFAULT 0,
+                    cms TEXT,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Get a domain's profile with counts decayed to now
+
+        Args:
+            url: Any URL on the domain
+
+        Returns:
+            Dict with domain, http_ok, http_failed, needs_browser, cms and
+            updated_at, or None if the domain has no profile
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM domain_profiles WHERE domain = ?',
+                               (domain_key(url),)).fetchone()
+        return self._decayed(dict(row)) if row else None
+
+    def prefers_browser(self, url: str) -> bool:
+        """
+        Decide whether to skip plain HTTP and render the domain directly
+
+        Args:
+            url: URL about to be scraped
+
+        Returns:
+            True when recent history says HTTP is not worth trying
+        """
+        profile = self.get(url)
+        with self._lock:
+            self._stats['lookups'] += 1
+        if not profile:
+            return False
+
+        http_total = profile['http_ok'] + profile['http_failed']
+        http_rate = profile['http_ok'] / http_total if http_total else 0.0
+        if http_rate > self.MAX_HTTP_SUCCESS_RATE:
+            return False
+
+        browser_first = (profile['needs_browser'] >= self.browser_first_score
+                         or (profile['cms'] in JS_RENDERED_CMS and profile['needs_browser'] > 0.5))
+        if browser_first:
+            with self._lock:
+                self._stats['browser_first'] += 1
+            logger.info(f"{profile['domain']}: going straight to the browser "
+                        f"(needs_browser={profile['needs_browser']:.2f}, cms={profile['cms']})")
+        return browser_first
+
+    def record(self, url: str, http_ok: Optional[bool] = None, browser_ok: Optional[bool] = None,
+               cms: Optional[str] = None):
+        """
+        Record the outcome of a scrape
+
+        Args:
+            url: Scraped URL
+            http_ok: Whether plain HTTP produced usable data (None: not tried)
+            browser_ok: Whether the browser produced usable data (None: not tried)
+            cms: CMS detected in the page, if any
+        """
+        domain = domain_key(url)
+        if not domain:
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('SELECT * FROM domain_profiles WHERE domain = ?', (domain,)).fetchone()
+                profile = self._decayed(dict(row), now) if row else {
+                    'http_ok': 0.0, 'http_failed': 0.0, 'needs_browser': 0.0, 'cms': None
+                }
+
+                if http_ok is True:
+                    profile['http_ok'] += 1
+                elif http_ok is False:
+                    profile['http_failed'] += 1
+                    if browser_ok:
+                        profile['needs_browser'] += 1
+
+                conn.execute('''
+                    INSERT OR REPLACE INTO domain_profiles
+                        (domain, http_ok, http_failed, needs_browser, cms, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (domain, profile['http_ok'], profile['http_failed'], profile['needs_browser'],
+                      cms or profile['cms'], now))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        with self._lock:
+            self._stats['recorded'] += 1
+
+    def stats(self) -> Dict:
+        """Get profile counters"""
+        with self._connect() as conn:
+            domains = conn.execute('SELECT COUNT(*) FROM domain_profiles').fetchone()[0]
+        with self._lock:
+            return {'domains': domains, **self._stats}
+
+    def _decayed(self, profile: Dict, now: Optional[float] = None) -> Dict:
+        """Apply exponential decay to a stored profile's counts"""
+        age = max(0.0, (now or time.time()) - profile['updated_at'])
+        factor = 0.5 ** (age / self.half_life)
+        for field in ('http_ok', 'http_failed', 'needs_browser'):
+            profile[field] *= factor
+        return profile
+
+
+# Global instance
+domain_profiles = DomainProfileStore()
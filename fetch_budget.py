@@ -0,0 +1,140 @@
+"""
+Fetch Budget for ScrapeX
+One deadline and retry allowance shared by every request a job makes
+"""
+
+import contextvars
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple, Union
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class BudgetExhausted(TimeoutError):
+    """Raised instead of a request once the job's fetch deadline has passed"""
+
+
+class FetchBudget:
+    """
+    Per-job fetch budget
+
+    Features:
+    - One deadline for all of a job's requests: timeouts are clamped to the
+      time left and no request starts after it has passed
+    - Retries (connection failures, 5xx, throttling) are drawn from a shared
+      allowance of a minimum plus a fraction of the requests made, so a run of
+      failing hosts cannot multiply the job's traffic
+    - Bound to the current context, so it follows the job into asyncio tasks
+      and into worker threads submitted with contextvars.copy_context().run
+    """
+
+    # Configuration
+    DEADLINE_SECONDS = float(os.getenv('SCRAPEX_JOB_FETCH_DEADLINE', '1800'))
+    RETRY_RATIO = float(os.getenv('SCRAPEX_JOB_RETRY_RATIO', '0.1'))
+    MIN_RETRIES = int(os.getenv('SCRAPEX_JOB_MIN_RETRIES', '10'))
+
+    def __init__(self, deadline_seconds: Optional[float] = None, retry_ratio: Optional[float] = None,
+                 min_retries: Optional[int] = None):
+        """
+        Initialize fetch budget
+
+        Args:
+            deadline_seconds: Seconds from now after which requests are refused
+            retry_ratio: Retries allowed per request made
+            min_retries: Retries allowed regardless of request count
+        """
+        self.deadline_seconds = deadline_seconds or self.DEADLINE_SECONDS
+        self.retry_ratio = retry_ratio if retry_ratio is not None else self.RETRY_RATIO
+        self.min_retries = min_retries if min_retries is not None else self.MIN_RETRIES
+        self.deadline = time.monotonic() + self.deadline_seconds
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'retries_denied': 0, 'refused': 0}
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline"""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def start_request(self, url: str):
+        """
+        Count a request, refusing it once the deadline has passed
+
+        Raises:
+            BudgetExhausted: The job is out of time
+        """
+        with self._lock:
+            if self.deadline <= time.monotonic():
+                self._stats['refused'] += 1
+                raise BudgetExhausted(f"Fetch budget of {self.deadline_seconds:g}s exhausted; not fetching {url}")
+            self._stats['requests'] += 1
+
+    def clamp(self, timeout: Timeout) -> Timeout:
+        """Shorten a timeout (or (connect, read) pair) to the time left"""
+        remaining = max(0.1, self.remaining())
+        if isinstance(timeout, tuple):
+            return tuple(min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+
+    def allow_retry(self, delay: float = 0.0) -> bool:
+        """
+        Take a retry from the allowance
+
+        Args:
+            delay: Seconds the retry would wait first
+
+        Returns:
+            True if the caller may retry
+        """
+        with self._lock:
+            allowance = self.min_retries + self.retry_ratio * self._stats['requests']
+            if self._stats['retries'] >= allowance or delay >= self.remaining():
+                self._stats['retries_denied'] += 1
+                return False
+            self._stats['retries'] += 1
+            return True
+
+    def stats(self) -> Dict:
+        """Get budget counters"""
+        with self._lock:
+            return {'deadline_seconds': self.deadline_seconds, 'remaining_seconds': round(self.remaining(), 1),
+                    **self._stats}
+
+
+_current_budget: contextvars.ContextVar = contextvars.ContextVar('scrapex_fetch_budget', default=None)
+
+
+def current_budget() -> Optional[FetchBudget]:
+    """Get the budget bound to the running job (None outside a job)"""
+    return _current_budget.get()
+
+
+def allow_retry(delay: float = 0.0) -> bool:
+    """Take a retry from the current budget (always allowed outside a job)"""
+    budget = _current_budget.get()
+    return budget is None or budget.allow_retry(delay)
+
+
+@contextmanager
+def fetch_budget(budget: Optional[FetchBudget] = None, **kwargs):
+    """
+    Bind a fetch budget to the current context for the duration of a job
+
+    Args:
+        budget: Budget to bind (a new FetchBudget(**kwargs) by default)
+
+    Yields:
+        The bound FetchBudget
+    """
+    budget = budget or FetchBudget(**kwargs)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+        logger.info(f"Fetch budget: {budget.stats()}")
@@ -0,0 +1,221 @@
+"""
+Fetch Service for ScrapeX
+One process-wide HTTP client shared by every scraper
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional
+
+import requests
+
+from dns_fix import configure_dns_session
+from fetch_budget import current_budget
+from http_cache import HTTPCache, http_cache
+from host_limiter import host_limiter
+from host_timeouts import host_timeouts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Content types scrapers can parse; anything else is aborted after the headers
+PARSEABLE_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', 'text/xml', 'application/xml')
+
+# Download cap per response body (longer bodies are truncated)
+MAX_BODY_BYTES = int(os.getenv('SCRAPEX_FETCH_MAX_BYTES', str(3 * 1024 * 1024)))
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class ContentTypeRejected(requests.exceptions.RequestException):
+    """Raised when a URL serves something other than a web page (PDF, video, ...)"""
+
+
+def is_parseable(content_type: Optional[str]) -> bool:
+    """Whether a Content-Type header is HTML-like (a missing header is given the benefit of the doubt)"""
+    if not content_type:
+        return True
+    return content_type.split(';')[0].strip().lower() in PARSEABLE_CONTENT_TYPES
+
+
+class _CappedSession:
+    """
+    Session wrapper that streams bodies, gating on type and stopping at a size cap
+
+    Handed to the HTTP cache in place of the session, so the cache, host
+    limiter and breaker see an ordinary response with its body already read.
+    """
+
+    def __init__(self, service: 'FetchService', scraper: str, on_headers: Optional[Callable[[], None]] = None):
+        self.service = service
+        self.scraper = scraper
+        self.on_headers = on_headers
+
+    def get(self, url: str, timeout: float, **kwargs) -> requests.Response:
+        # Timeouts come from the host's latency, clamped to the job's budget
+        connect_timeout, read_timeout = host_timeouts.timeouts(url, timeout)
+        budget = current_budget()
+        if budget is not None:
+            budget.start_request(url)
+            connect_timeout, read_timeout = budget.clamp((connect_timeout, read_timeout))
+
+        try:
+            response = self.service.session.get(url, stream=True, timeout=(connect_timeout, read_timeout), **kwargs)
+        except requests.exceptions.ReadTimeout:
+            host_timeouts.observe_timeout(url, read_timeout)
+            raise
+        host_timeouts.observe(url, ttfb_seconds=response.elapsed.total_seconds())
+        if self.on_headers and response.status_code < 400:
+            self.on_headers()
+
+        try:
+            content_type = response.headers.get('content-type')
+            if response.status_code < 300 and not is_parseable(content_type):
+                self.service.record_event(self.scraper, 'rejected')
+                raise ContentTypeRejected(f"{url} is {content_type}, not a web page", response=response)
+
+            body, truncated = bytearray(), False
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                room = self.service.max_body_bytes - len(body)
+                if len(chunk) > room:
+                    body.extend(chunk[:room])
+                    truncated = True
+                    break
+                body.extend(chunk)
+        finally:
+            response.close()
+
+        response._content = bytes(body)
+        response._content_consumed = True
+        response.truncated = truncated
+        if truncated:
+            self.service.record_event(self.scraper, 'truncated')
+            logger.warning(f"Truncated {url} at {self.service.max_body_bytes} bytes")
+        return response
+
+
+class FetchService:
+    """
+    Shared synchronous fetch layer
+
+    Features:
+    - One requests.Session and connection pool for all scrapers and jobs, so
+      keep-alive connections (and their TLS handshakes) are reused across them
+    - Unified browser headers (configure_dns_session); lookups use the DNS
+      cache once the process has installed it
+    - Every GET goes through the HTTP cache, host limiter and circuit breaker;
+      retries come from the job's fetch budget instead of the adapter
+    - Connect/read timeouts adapt to each host's observed latency
+    - Bodies are streamed: non-HTML content types are aborted after the
+      headers and bodies stop at a size cap (truncations are counted)
+    - Per-scraper counters: requests, cache hits, errors, bytes and time
+    """
+
+    # Configuration
+    POOL_HOSTS = int(os.getenv('SCRAPEX_FETCH_POOL_HOSTS', '200'))
+    POOL_SIZE = int(os.getenv('SCRAPEX_FETCH_POOL_SIZE', '20'))
+    TIMEOUT_SECONDS = float(os.getenv('SCRAPEX_FETCH_TIMEOUT', '30'))
+
+    def __init__(self, pool_hosts: Optional[int] = None, pool_size: Optional[int] = None,
+                 timeout: Optional[float] = None, cache: Optional[HTTPCache] = None,
+                 max_body_bytes: Optional[int] = None):
+        """
+        Initialize fetch service
+
+        Args:
+            pool_hosts: Hosts whose connection pools are kept open
+            pool_size: Keep-alive connections kept per host
+            timeout: Default request timeout in seconds
+            cache: HTTP cache (defaults to the shared cache)
+            max_body_bytes: Bytes read from a response body before it is truncated
+        """
+        self.pool_hosts = pool_hosts or self.POOL_HOSTS
+        self.pool_size = pool_size or self.POOL_SIZE
+        self.timeout = timeout or self.TIMEOUT_SECONDS
+        self.cache = cache or http_cache
+        self.max_body_bytes = max_body_bytes or MAX_BODY_BYTES
+        self.session = configure_dns_session(pool_connections=self.pool_hosts, pool_maxsize=self.pool_size,
+                                             retries=False)
+        self._lock = threading.Lock()
+        self._scrapers: Dict[str, Dict] = {}
+
+    def get(self, url: str, scraper: str = 'default', timeout: Optional[float] = None,
+            use_cache: bool = True, on_headers: Optional[Callable[[], None]] = None) -> requests.Response:
+        """
+        GET a URL with the shared session
+
+        Args:
+            url: URL to fetch
+            scraper: Name the request is counted under in stats()
+            timeout: Read timeout for hosts without latency history (seconds)
+            use_cache: Serve fresh cached copies and store the response
+            on_headers: Called when the host has answered (status below 400),
+                        before the body is downloaded; not called for cache hits
+
+        Returns:
+            requests.Response (call raise_for_status as usual); response.truncated
+            is True when the body was cut off at the size cap
+
+        Raises:
+            ContentTypeRejected: The URL serves a non-HTML document
+            BudgetExhausted: The running job is out of fetch time
+        """
+        start_time = time.time()
+        session = _CappedSession(self, scraper, on_headers)
+        try:
+            if use_cache:
+                response = self.cache.get(session, url, timeout=timeout or self.timeout)
+            else:
+                response = host_limiter.get(session, url, timeout=timeout or self.timeout)
+        except Exception:
+            self.record(scraper, time.time() - start_time, error=True)
+            raise
+
+        self.record(scraper, time.time() - start_time, size=len(response.content),
+                    cached=getattr(response, 'from_cache', False), error=response.status_code >= 400)
+        return response
+
+    def record(self, scraper: str, seconds: float, size: int = 0, cached: bool = False, error: bool = False):
+        """Count a request for a scraper (also used by the async fetch engine)"""
+        with self._lock:
+            counters = self._counters(scraper)
+            counters['requests'] += 1
+            counters['cache_hits'] += int(cached)
+            counters['errors'] += int(error)
+            counters['bytes'] += size
+            counters['seconds'] += seconds
+
+    def record_event(self, scraper: str, counter: str):
+        """Count a truncated or rejected response for a scraper (also used by the async fetch engine)"""
+        with self._lock:
+            self._counters(scraper)[counter] += 1
+
+    def _counters(self, scraper: str) -> Dict:
+        """Get (or create) a scraper's counters (lock held)"""
+        counters = self._scrapers.get(scraper)
+        if counters is None:
+            counters = self._scrapers[scraper] = {
+                'requests': 0, 'cache_hits': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0,
+                'truncated': 0, 'rejected': 0
+            }
+        return counters
+
+    def stats(self) -> Dict:
+        """Get pool settings and per-scraper counters"""
+        with self._lock:
+            scrapers = {
+                name: {**counters, 'avg_ms': round(counters['seconds'] * 1000 / counters['requests'], 1)}
+                for name, counters in self._scrapers.items()
+            }
+        return {'pool_hosts': self.pool_hosts, 'pool_size': self.pool_size,
+                'max_body_bytes': self.max_body_bytes, 'scrapers': scrapers}
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+# Global instance
+fetch_service = FetchService()
@@ -11,6 +11,9 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
+from fetch_service import FetchService, fetch_service
+from host_breaker import HostUnavailableError
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,15 +21,9 @@ logger = logging.getLogger(__name__)
 class HealthcareFacilityScraper:
     """Scrapes healthcare facility data from websites"""
 
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
+    def __init__(self, fetcher: FetchService = None):
+        self.fetcher = fetcher or fetch_service
+        # Read timeout until the host has latency history (see host_timeouts)
         self.timeout = 10
 
     def scrape_facility_website(self, url: str) -> Dict:
@@ -40,7 +37,7 @@ class HealthcareFacilityScraper:
             Dictionary with extracted facility data
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            response = self.fetcher.get(url, scraper='healthcare', timeout=self.timeout)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, 'html.parser')
             
@@ -62,7 +59,7 @@ class HealthcareFacilityScraper:
             logger.info(f"Successfully scraped {url}")
             return facility_data
             
-        except requests.RequestException as e:
+        except (requests.RequestException, HostUnavailableError, TimeoutError) as e:
             logger.error(f"Failed to scrape {url}: {str(e)}")
             return {
                 'url': url,
@@ -0,0 +1,254 @@
+"""
+Host Circuit Breaker for ScrapeX
+Stops retrying dead or unresolvable sites and remembers them across jobs
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import httpx
+import requests
+
+from domain_profile import domain_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Errors meaning the host could not be reached at all (DNS, refused, timeouts).
+# HTTP error statuses are answers from a live host and never trip the breaker.
+CONNECTION_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadTimeout,
+    httpx.PoolTimeout,
+)
+
+
+class HostUnavailableError(Exception):
+    """Raised instead of a request while a host's circuit is open"""
+
+    def __init__(self, host: str, retry_at: float, last_error: Optional[str] = None):
+        self.host = host
+        self.retry_at = retry_at
+        self.last_error = last_error
+        super().__init__(f"{host} is unreachable (circuit open for another "
+                         f"{max(0, retry_at - time.time()):.0f}s; last error: {last_error})")
+
+
+class _Circuit:
+    """Breaker state for one host"""
+
+    def __init__(self, failures: int = 0, opens: int = 0, open_until: float = 0.0,
+                 last_error: Optional[str] = None):
+        self.failures = failures
+        self.opens = opens
+        self.open_until = open_until
+        self.last_error = last_error
+        self.probe_started = 0.0
+
+    def reset(self):
+        """Close the circuit and forget its failures"""
+        self.failures = 0
+        self.opens = 0
+        self.open_until = 0.0
+        self.last_error = None
+        self.probe_started = 0.0
+
+
+class HostCircuitBreaker:
+    """
+    Per-host circuit breaker with a persistent negative cache
+
+    Features:
+    - Opens after N consecutive connection/DNS/timeout failures to a host
+    - While open, requests fail immediately with HostUnavailableError
+    - After the cool-down one probe request is let through (half-open); success
+      closes the circuit, failure re-opens it with a doubled cool-down
+    - Open circuits are stored in SQLite, so the next job (or another worker
+      process) skips a dead domain without rediscovering it
+    - Circuits are kept in memory for the most recently used hosts only; an
+      evicted open circuit is reloaded from SQLite on the host's next request
+    - SQLite is only touched outside the lock, so a slow disk never blocks
+      requests to other hosts
+    """
+
+    # Configuration
+    DB_PATH = os.getenv('SCRAPEX_BREAKER_PATH', '/tmp/scrapex_dead_hosts.db')
+    FAILURE_THRESHOLD = int(os.getenv('SCRAPEX_BREAKER_FAILURES', '3'))
+    COOLDOWN_SECONDS = float(os.getenv('SCRAPEX_BREAKER_COOLDOWN', '900'))
+    MAX_COOLDOWN_SECONDS = float(os.getenv('SCRAPEX_BREAKER_MAX_COOLDOWN', '86400'))
+    PROBE_TIMEOUT_SECONDS = 120
+    MAX_TRACKED_HOSTS = int(os.getenv('SCRAPEX_BREAKER_MAX_HOSTS', '10000'))
+
+    def __init__(self, db_path: Optional[str] = None, failure_threshold: Optional[int] = None,
+                 cooldown_seconds: Optional[float] = None):
+        """
+        Initialize circuit breaker
+
+        Args:
+            db_path: Path of the SQLite negative cache
+            failure_threshold: Consecutive failures that open a host's circuit
+            cooldown_seconds: First open period (doubles on each re-open)
+        """
+        self.db_path = db_path or self.DB_PATH
+        self.failure_threshold = failure_threshold or self.FAILURE_THRESHOLD
+        self.cooldown = cooldown_seconds or self.COOLDOWN_SECONDS
+        self._circuits: OrderedDict = OrderedDict()  # host -> _Circuit, least recently used first
+        self._lock = threading.Lock()
+        self._stats = {'short_circuited': 0, 'opened': 0, 'closed': 0}
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the negative cache"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the negative cache table"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dead_hosts (
+                    host TEXT PRIMARY KEY,
+                    opens INTEGER NOT NULL,
+                    open_until REAL NOT NULL,
+                    last_error TEXT,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+    def check(self, url: str):
+        """
+        Raise if requests to the URL's host are currently short-circuited
+
+        Args:
+            url: URL about to be requested
+
+        Raises:
+            HostUnavailableError: The host's circuit is open
+        """
+        host = domain_key(url)
+        circuit = self._circuit(host)
+        now = time.time()
+        with self._lock:
+            if circuit.open_until <= now:
+                if not circuit.opens:
+                    return
+                # Half-open: let one probe through (another one if the last
+                # probe never reported back)
+                if now - circuit.probe_started > self.PROBE_TIMEOUT_SECONDS:
+                    circuit.probe_started = now
+                    return
+            self._stats['short_circuited'] += 1
+            retry_at = max(circuit.open_until, now)
+            last_error = circuit.last_error
+        raise HostUnavailableError(host, retry_at, last_error)
+
+    def record_success(self, url: str):
+        """Close the URL's host circuit after any response from it"""
+        host = domain_key(url)
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or (not circuit.failures and not circuit.opens):
+                return
+            was_open = circuit.opens > 0
+            circuit.reset()
+            if was_open:
+                self._stats['closed'] += 1
+
+        if was_open:
+            logger.info(f"{host} is reachable again; circuit closed")
+            with self._connect() as conn:
+                conn.execute('DELETE FROM dead_hosts WHERE host = ?', (host,))
+
+    def record_failure(self, url: str, error: Exception):
+        """
+        Count a connection-level failure for the URL's host
+
+        Args:
+            url: Requested URL
+            error: Exception raised by the request
+        """
+        host = domain_key(url)
+        circuit = self._circuit(host)
+        now = time.time()
+        with self._lock:
+            circuit.last_error = f"{type(error).__name__}: {str(error)[:200]}"
+            if circuit.open_until > now:
+                return  # a request sent before the circuit opened
+            circuit.failures += 1
+            if not circuit.probe_started and circuit.failures < self.failure_threshold:
+                return
+
+            # Threshold reached, or the half-open probe failed
+            circuit.opens += 1
+            circuit.failures = 0
+            circuit.probe_started = 0.0
+            cooldown = min(self.MAX_COOLDOWN_SECONDS, self.cooldown * 2 ** (circuit.opens - 1))
+            circuit.open_until = now + cooldown
+            self._stats['opened'] += 1
+            opens, open_until, last_error = circuit.opens, circuit.open_until, circuit.last_error
+
+        logger.warning(f"Circuit opened for {host} for {cooldown:.0f}s ({last_error})")
+        with self._connect() as conn:
+            conn.execute(
+                '''INSERT OR REPLACE INTO dead_hosts (host, opens, open_until, last_error, updated_at)
+                   VALUES (?, ?, ?, ?, ?)''',
+                (host, opens, open_until, last_error, now)
+            )
+
+    def is_failure(self, error: Exception) -> bool:
+        """Whether an exception means the host itself is unreachable"""
+        return isinstance(error, CONNECTION_ERRORS)
+
+    def stats(self) -> Dict:
+        """Get breaker counters"""
+        now = time.time()
+        with self._connect() as conn:
+            dead = conn.execute('SELECT COUNT(*) FROM dead_hosts WHERE open_until > ?', (now,)).fetchone()[0]
+        with self._lock:
+            return {'dead_hosts': dead, 'tracked_hosts': len(self._circuits), **self._stats}
+
+    def _circuit(self, host: str) -> _Circuit:
+        """Get a host's circuit, loading it from the negative cache on first use (lock not held)"""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is not None:
+                self._circuits.move_to_end(host)
+                return circuit
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT opens, open_until, last_error FROM dead_hosts WHERE host = ?',
+                               (host,)).fetchone()
+
+        with self._lock:
+            # Another thread may have loaded the host while this one read SQLite
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                circuit = _Circuit(opens=row[0], open_until=row[1], last_error=row[2]) if row else _Circuit()
+                self._store(host, circuit)
+            return circuit
+
+    def _store(self, host: str, circuit: _Circuit):
+        """Track a circuit, dropping the least recently used host (lock held)"""
+        self._circuits[host] = circuit
+        self._circuits.move_to_end(host)
+        while len(self._circuits) > self.MAX_TRACKED_HOSTS:
+            self._circuits.popitem(last=False)
+
+
+# Global instance
+host_breaker = HostCircuitBreaker()
@@ -0,0 +1,297 @@
+"""
+Per-Host Politeness for ScrapeX
+Token-bucket rate limits, per-host concurrency and Retry-After handling for outgoing requests
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, TypeVar
+
+from domain_profile import domain_key
+from fetch_budget import allow_retry
+from host_breaker import host_breaker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Status codes meaning "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+# Server errors worth retrying after a short backoff
+RETRY_STATUSES = (500, 502, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def interleave_by_host(items: Iterable[T], url_fn: Callable[[T], Optional[str]]) -> List[T]:
+    """
+    Reorder work round-robin across hosts
+
+    Consecutive items then target different hosts, so workers spread over
+    many sites instead of queueing behind one host's rate limit. Order within
+    each host is kept.
+    """
+    by_host: OrderedDict = OrderedDict()
+    for item in items:
+        by_host.setdefault(domain_key(url_fn(item) or ''), []).append(item)
+
+    queues = [iter(group) for group in by_host.values()]
+    result = []
+    while queues:
+        remaining = []
+        for host_items in queues:
+            item = next(host_items, None)
+            if item is not None:
+                result.append(item)
+                remaining.append(host_items)
+        queues = remaining
+    return result
+
+
+class _HostState:
+    """Bucket, slots and throttle state for one host"""
+
+    def __init__(self, limiter: 'HostLimiter'):
+        self.rate = limiter.rate
+        self.tokens = float(limiter.burst)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_used = self.last_refill
+        self.slots = threading.BoundedSemaphore(limiter.max_concurrent)
+
+
+class HostLimiter:
+    """
+    Politeness scheduler shared by every scraper HTTP request
+
+    Features:
+    - Token bucket per host: sustained requests/second with a small burst
+    - Per-host concurrency cap for threaded scrapers
+    - 429/503 responses block the host for Retry-After (or a default pause)
+      and halve its rate; successes restore the rate gradually
+    - Callers get the delay they need, so async code sleeps without
+      holding a thread and threaded code sleeps only for its own host
+    - Retries of connection failures, server errors and throttling are drawn
+      from the running job's fetch budget rather than granted per request
+    """
+
+    # Configuration
+    RATE_PER_SECOND = float(os.getenv('SCRAPEX_HOST_RATE', '2'))
+    BURST = int(os.getenv('SCRAPEX_HOST_BURST', '4'))
+    MAX_CONCURRENT = int(os.getenv('SCRAPEX_HOST_MAX_CONCURRENT', '2'))
+    DEFAULT_PAUSE_SECONDS = float(os.getenv('SCRAPEX_HOST_THROTTLE_PAUSE', '10'))
+    MAX_RETRY_AFTER_SECONDS = float(os.getenv('SCRAPEX_HOST_MAX_RETRY_AFTER', '30'))
+    MAX_RETRIES = int(os.getenv('SCRAPEX_HOST_MAX_RETRIES', '2'))
+    RETRY_BACKOFF_SECONDS = 1.0
+    MIN_RATE_PER_SECOND = 0.1
+    MAX_TRACKED_HOSTS = 10000
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 max_concurrent: Optional[int] = None):
+        """
+        Initialize host limiter
+
+        Args:
+            rate: Sustained requests per second per host
+            burst: Requests a quiet host may send back to back
+            max_concurrent: Concurrent requests per host (threaded callers)
+        """
+        self.rate = rate or self.RATE_PER_SECOND
+        self.burst = burst or self.BURST
+        self.max_concurrent = max_concurrent or self.MAX_CONCURRENT
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'delayed': 0, 'delay_seconds': 0.0, 'throttled': 0}
+
+    def reserve(self, url: str) -> float:
+        """
+        Take a token for the URL's host
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(domain_key(url), now)
+            state.tokens = min(self.burst, state.tokens + (now - state.last_refill) * state.rate)
+            state.last_refill = now
+            state.tokens -= 1  # may go negative: a reservation for a future slot
+
+            delay = max(0.0, -state.tokens / state.rate, state.blocked_until - now)
+            self._stats['requests'] += 1
+            if delay > 0:
+                self._stats['delayed'] += 1
+                self._stats['delay_seconds'] += delay
+            return delay
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Hold a host concurrency slot and wait for the host's rate limit (blocking)
+
+        Args:
+            url: URL about to be requested
+        """
+        with self._lock:
+            state = self._state(domain_key(url), time.monotonic())
+        with state.slots:
+            delay = self.reserve(url)
+            if delay > 0:
+                time.sleep(delay)
+            yield
+
+    def observe(self, url: str, status_code: int, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Adapt the host's pacing to a response
+
+        Args:
+            url: Requested URL
+            status_code: Response status
+            headers: Response headers
+
+        Returns:
+            Seconds to wait before retrying once, for throttling responses with
+            a short enough Retry-After; None when the request should not be retried
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(domain_key(url), now)
+
+            if status_code not in THROTTLE_STATUSES:
+                if status_code < 400 and state.rate < self.rate:
+                    state.rate = min(self.rate, state.rate + self.rate * 0.1)
+                return None
+
+            retry_after = parse_retry_after(headers.get('retry-after'))
+            pause = retry_after if retry_after is not None else self.DEFAULT_PAUSE_SECONDS
+            state.blocked_until = max(state.blocked_until, now + pause)
+            state.rate = max(self.MIN_RATE_PER_SECOND, state.rate / 2)
+            state.tokens = min(state.tokens, 0.0)
+            self._stats['throttled'] += 1
+
+        logger.warning(f"{domain_key(url)} answered {status_code}; pausing host {pause:.0f}s "
+                       f"(rate now {state.rate:.2f}/s)")
+        if (retry_after is not None or status_code == 429) and pause <= self.MAX_RETRY_AFTER_SECONDS:
+            return pause
+        return None
+
+    def retry_delay(self, url: str, attempt: int, status_code: Optional[int] = None,
+                    headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """
+        Decide whether a request is retried, after a response or a connection failure
+
+        Args:
+            url: Requested URL
+            attempt: Zero-based attempt that just finished
+            status_code: Response status (None after a connection failure)
+            headers: Response headers
+
+        Returns:
+            Seconds to wait before the retry, or None to give up
+        """
+        if status_code is None:
+            retry_in = self.RETRY_BACKOFF_SECONDS * 2 ** attempt
+        else:
+            retry_in = self.observe(url, status_code, headers or {})
+            if retry_in is None and status_code in RETRY_STATUSES:
+                retry_in = self.RETRY_BACKOFF_SECONDS * 2 ** attempt
+        if retry_in is None or attempt >= self.MAX_RETRIES or not allow_retry(retry_in):
+            return None
+        logger.info(f"Retrying {url} after {retry_in:.0f}s")
+        return retry_in
+
+    def get(self, session, url: str, **kwargs):
+        """
+        Polite requests GET: waits for the host and retries within the job's budget
+
+        Hosts whose circuit is open fail fast with HostUnavailableError, and
+        connection failures are reported to the circuit breaker.
+
+        Args:
+            session: requests.Session to send with
+            url: URL to fetch
+            **kwargs: Passed to session.get
+
+        Returns:
+            requests.Response
+        """
+        attempt = 0
+        while True:
+            host_breaker.check(url)
+            error = None
+            with self.slot(url):
+                try:
+                    response = session.get(url, **kwargs)
+                except Exception as e:
+                    if not host_breaker.is_failure(e):
+                        raise
+                    error = e
+
+            if error is None:
+                host_breaker.record_success(url)
+                retry_in = self.retry_delay(url, attempt, response.status_code, response.headers)
+                if retry_in is None:
+                    return response
+                if response.status_code not in THROTTLE_STATUSES:
+                    time.sleep(retry_in)
+                # Throttled hosts are blocked for retry_in; slot() waits it out
+            else:
+                retry_in = self.retry_delay(url, attempt)
+                if retry_in is None:
+                    # One breaker failure per request, however many attempts it took
+                    host_breaker.record_failure(url, error)
+                    raise error
+                time.sleep(retry_in)
+            attempt += 1
+
+    def stats(self) -> Dict:
+        """Get limiter counters"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'tracked_hosts': len(self._hosts),
+                'blocked_hosts': sum(1 for state in self._hosts.values() if state.blocked_until > now),
+                **self._stats
+            }
+
+    def _state(self, host: str, now: float) -> _HostState:
+        """Get (or create) a host's state (lock held)"""
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= self.MAX_TRACKED_HOSTS:
+                self._prune(now)
+            state = self._hosts[host] = _HostState(self)
+        state.last_used = now
+        return state
+
+    def _prune(self, now: float):
+        """Forget hosts idle for a while (lock held)"""
+        idle = [host for host, state in self._hosts.items()
+                if now - state.last_used > 600 and state.blocked_until < now]
+        for host in idle:
+            del self._hosts[host]
+
+
+# Global instance
+host_limiter = HostLimiter()
@@ -0,0 +1,159 @@
+"""
+Adaptive Host Timeouts for ScrapeX
+Connect and read timeouts derived from each host's observed latency
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Sequence, Tuple
+
+from domain_profile import domain_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..1) of a non-empty sample"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class _Latency:
+    """Rolling latency samples for one host"""
+
+    def __init__(self, window: int):
+        self.connect = deque(maxlen=window)
+        self.ttfb = deque(maxlen=window)
+        self.timeouts = 0
+
+
+class HostTimeouts:
+    """
+    Per-host timeouts learned from latency
+
+    Features:
+    - Rolling window of connect and time-to-first-byte samples per host
+    - Timeouts are the p95 latency times a multiplier, bounded on both sides:
+      fast hosts that stop answering are given up on quickly, slow-but-alive
+      hosts get more time than the scraper default
+    - Hosts without enough samples use the caller's timeout (connect capped)
+    - Read timeouts are recorded as samples, so a slow host gets a longer
+      window on its next request instead of timing out again
+    - requests only reports total time to headers, so connect samples come
+      from the async engine; both clients contribute TTFB samples
+    """
+
+    # Configuration
+    CONNECT_TIMEOUT_SECONDS = float(os.getenv('SCRAPEX_CONNECT_TIMEOUT', '10'))
+    MIN_CONNECT_TIMEOUT_SECONDS = 2.0
+    MIN_READ_TIMEOUT_SECONDS = 5.0
+    MAX_READ_TIMEOUT_SECONDS = float(os.getenv('SCRAPEX_MAX_READ_TIMEOUT', '90'))
+    MULTIPLIER = float(os.getenv('SCRAPEX_TIMEOUT_MULTIPLIER', '3'))
+    WINDOW = 50
+    MIN_SAMPLES = 5
+    MAX_TRACKED_HOSTS = 10000
+
+    def __init__(self, multiplier: Optional[float] = None, window: Optional[int] = None):
+        """
+        Initialize host timeouts
+
+        Args:
+            multiplier: Timeout as a multiple of the host's p95 latency
+            window: Samples kept per host and kind
+        """
+        self.multiplier = multiplier or self.MULTIPLIER
+        self.window = window or self.WINDOW
+        self._hosts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'adapted': 0, 'default': 0, 'read_timeouts': 0}
+
+    def timeouts(self, url: str, default: float) -> Tuple[float, float]:
+        """
+        Get (connect, read) timeouts for a request
+
+        Args:
+            url: URL about to be requested
+            default: Caller's timeout, used while the host has too few samples
+
+        Returns:
+            Tuple of connect and read timeouts in seconds
+        """
+        connect = min(default, self.CONNECT_TIMEOUT_SECONDS)
+        read = default
+        with self._lock:
+            latency = self._hosts.get(domain_key(url))
+            adapted = False
+            if latency is not None:
+                if len(latency.connect) >= self.MIN_SAMPLES:
+                    connect = self._bounded(percentile(latency.connect, 0.95),
+                                            self.MIN_CONNECT_TIMEOUT_SECONDS, self.CONNECT_TIMEOUT_SECONDS)
+                    adapted = True
+                if len(latency.ttfb) >= self.MIN_SAMPLES:
+                    read = self._bounded(percentile(latency.ttfb, 0.95),
+                                         self.MIN_READ_TIMEOUT_SECONDS, self.MAX_READ_TIMEOUT_SECONDS)
+                    adapted = True
+            self._stats['adapted' if adapted else 'default'] += 1
+        return connect, read
+
+    def observe(self, url: str, connect_seconds: Optional[float] = None, ttfb_seconds: Optional[float] = None):
+        """
+        Record a request's latency
+
+        Args:
+            url: Requested URL
+            connect_seconds: Time to open the connection (None if reused or unknown)
+            ttfb_seconds: Time from sending the request to the response headers
+        """
+        with self._lock:
+            latency = self._latency(domain_key(url))
+            if connect_seconds is not None:
+                latency.connect.append(connect_seconds)
+            if ttfb_seconds is not None:
+                latency.ttfb.append(ttfb_seconds)
+
+    def observe_timeout(self, url: str, read_timeout: float):
+        """Record a read timeout as a sample of (at least) the timeout that expired"""
+        with self._lock:
+            latency = self._latency(domain_key(url))
+            latency.ttfb.append(read_timeout)
+            latency.timeouts += 1
+            self._stats['read_timeouts'] += 1
+
+    def latency(self, url: str) -> Dict:
+        """Get a host's p50/p95 connect and TTFB in milliseconds"""
+        with self._lock:
+            latency = self._hosts.get(domain_key(url))
+            if latency is None:
+                return {}
+            summary = {'timeouts': latency.timeouts}
+            for kind in ('connect', 'ttfb'):
+                samples = getattr(latency, kind)
+                if samples:
+                    summary[f'{kind}_p50_ms'] = round(percentile(samples, 0.5) * 1000)
+                    summary[f'{kind}_p95_ms'] = round(percentile(samples, 0.95) * 1000)
+            return summary
+
+    def stats(self) -> Dict:
+        """Get timeout counters"""
+        with self._lock:
+            return {'tracked_hosts': len(self._hosts), **self._stats}
+
+    def _bounded(self, p95: float, lower: float, upper: float) -> float:
+        return min(upper, max(lower, p95 * self.multiplier))
+
+    def _latency(self, host: str) -> _Latency:
+        """Get (or create) a host's samples, dropping the least recently used host (lock held)"""
+        latency = self._hosts.get(host)
+        if latency is None:
+            latency = self._hosts[host] = _Latency(self.window)
+            while len(self._hosts) > self.MAX_TRACKED_HOSTS:
+                self._hosts.popitem(last=False)
+        self._hosts.move_to_end(host)
+        return latency
+
+
+# Global instance
+host_timeouts = HostTimeouts()
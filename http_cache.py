@@ -0,0 +1,379 @@
+"""
+HTTP Response Cache for ScrapeX
+On-disk cache of fetched pages with Cache-Control freshness and conditional revalidation
+"""
+
+import contextvars
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from host_limiter import host_limiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body (bodies are stored decoded, so
+# Content-Encoding is dropped)
+STORED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control', 'expires', 'date')
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*(s-maxage|max-age)\s*=\s*"?(\d+)"?', re.I)
+
+# Set while a forced refresh runs: cached pages are revalidated, never served as fresh
+_revalidate_all: contextvars.ContextVar = contextvars.ContextVar('scrapex_http_cache_revalidate', default=False)
+
+
+@contextmanager
+def revalidating():
+    """
+    Revalidate every cached page fetched in this context with the origin
+
+    Like the fetch budget, this follows the context into asyncio tasks and
+    into worker threads submitted with contextvars.copy_context().run.
+    """
+    token = _revalidate_all.set(True)
+    try:
+        yield
+    finally:
+        _revalidate_all.reset(token)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a URL
+
+    Lowercases scheme and host, drops default ports and the fragment, sorts
+    query parameters and uses '/' for an empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPCache:
+    """
+    Shared on-disk HTTP cache for scraper GET requests
+
+    Features:
+    - Keyed by normalized URL, shared across jobs, users and processes
+    - Freshness from Cache-Control (max-age, no-cache, no-store) and Expires,
+      with a heuristic lifetime for pages that send no caching headers
+    - Stale entries are revalidated with If-None-Match / If-Modified-Since;
+      a 304 reuses the stored body
+    - Inside revalidating() (forced refreshes) every entry is treated as stale
+    - Bounded total size, evicting least recently used entries
+    - Hit, revalidation and miss counters
+    """
+
+    # Configuration
+    DB_PATH = os.getenv('SCRAPEX_HTTP_CACHE_PATH', '/tmp/scrapex_http_cache.db')
+    MAX_SIZE_MB = int(os.getenv('SCRAPEX_HTTP_CACHE_MAX_MB', '256'))
+    MAX_ENTRY_MB = int(os.getenv('SCRAPEX_HTTP_CACHE_MAX_ENTRY_MB', '5'))
+    DEFAULT_TTL_SECONDS = int(os.getenv('SCRAPEX_HTTP_CACHE_DEFAULT_TTL', '3600'))
+    ENABLED = os.getenv('SCRAPEX_HTTP_CACHE', 'true').lower() == 'true'
+
+    def __init__(self, db_path: Optional[str] = None, max_size_mb: Optional[int] = None,
+                 default_ttl: Optional[int] = None, enabled: Optional[bool] = None):
+        """
+        Initialize HTTP cache
+
+        Args:
+            db_path: Path of the SQLite database file
+            max_size_mb: Total size of cached bodies before eviction
+            default_ttl: Maximum heuristic lifetime for pages without caching headers
+            enabled: Turn caching on or off
+        """
+        self.db_path = db_path or self.DB_PATH
+        self.max_bytes = (max_size_mb or self.MAX_SIZE_MB) * 1024 * 1024
+        self.max_entry_bytes = self.MAX_ENTRY_MB * 1024 * 1024
+        self.default_ttl = default_ttl if default_ttl is not None else self.DEFAULT_TTL_SECONDS
+        self.enabled = self.ENABLED if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._size = 0
+        if self.enabled:
+            self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the cache database"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create the cache table"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    final_url TEXT NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache(last_access)')
+            self._size = conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Find a cached response
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Dict with final_url, headers, body and fresh (False: revalidate
+            before use), or None if the URL is not cached
+        """
+        if not self.enabled:
+            return None
+
+        key = normalize_url(url)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT final_url, headers, body, expires_at FROM http_cache WHERE url = ?',
+                               (key,)).fetchone()
+            if row is not None:
+                conn.execute('UPDATE http_cache SET last_access = ? WHERE url = ?', (now, key))
+
+        if row is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+
+        return {'final_url': row[0], 'headers': json.loads(row[1]), 'body': row[2], 'fresh': now < row[3]}
+
+    def validators(self, entry: Dict) -> Dict:
+        """Conditional request headers for revalidating a cached entry"""
+        headers = {}
+        if entry['headers'].get('etag'):
+            headers['If-None-Match'] = entry['headers']['etag']
+        if entry['headers'].get('last-modified'):
+            headers['If-Modified-Since'] = entry['headers']['last-modified']
+        return headers
+
+    def record_hit(self, revalidated: bool = False):
+        """Count a response served from the cache"""
+        with self._lock:
+            self._stats['revalidated' if revalidated else 'hits'] += 1
+
+    def record_miss(self):
+        """Count a cached entry that could not be reused"""
+        with self._lock:
+            self._stats['misses'] += 1
+
+    def store(self, url: str, status_code: int, headers: Mapping[str, str], body: bytes,
+              final_url: Optional[str] = None):
+        """
+        Cache a response if its headers allow it
+
+        Args:
+            url: Requested URL
+            status_code: Response status (only 200 is cached)
+            headers: Response headers (case-insensitive mapping)
+            body: Raw response body
+            final_url: URL after redirects
+        """
+        if not self.enabled or status_code != 200 or len(body) > self.max_entry_bytes:
+            return
+
+        cache_control = (headers.get('cache-control') or '').lower()
+        if 'no-store' in cache_control or headers.get('vary', '').strip() == '*':
+            return
+
+        now = time.time()
+        kept = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        key = normalize_url(url)
+
+        with self._connect() as conn:
+            previous = conn.execute('SELECT size FROM http_cache WHERE url = ?', (key,)).fetchone()
+            conn.execute(
+                '''INSERT OR REPLACE INTO http_cache
+                   (url, final_url, headers, body, size, stored_at, expires_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                (key, final_url or url, json.dumps(kept), body, len(body), now,
+                 now + self._lifetime(headers, now), now)
+            )
+
+        with self._lock:
+            self._stats['stored'] += 1
+            self._size += len(body) - (previous[0] if previous else 0)
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def refresh(self, url: str, headers: Mapping[str, str]):
+        """
+        Extend a cached entry after a 304 Not Modified
+
+        Args:
+            url: Requested URL
+            headers: Headers of the 304 response (may update validators and freshness)
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT headers FROM http_cache WHERE url = ?', (key,)).fetchone()
+            if row is None:
+                return
+            stored = json.loads(row[0])
+            stored.update({name: headers[name] for name in STORED_HEADERS if headers.get(name)})
+            conn.execute('UPDATE http_cache SET headers = ?, expires_at = ?, last_access = ? WHERE url = ?',
+                         (json.dumps(stored), now + self._lifetime(stored, now), now, key))
+
+    def get(self, session: requests.Session, url: str, timeout: Optional[float] = None) -> requests.Response:
+        """
+        requests GET through the cache
+
+        Args:
+            session: Session used for network requests
+            url: URL to fetch
+            timeout: Request timeout in seconds
+
+        Returns:
+            requests.Response, either from the network or rebuilt from the cache
+        """
+        entry = self.lookup(url)
+        if self.servable(entry):
+            self.record_hit()
+            return self._requests_response(url, entry)
+
+        response = host_limiter.get(session, url, timeout=timeout,
+                                    headers=self.validators(entry) if entry else None)
+        if entry and response.status_code == 304:
+            self.refresh(url, response.headers)
+            self.record_hit(revalidated=True)
+            return self._requests_response(url, entry)
+
+        if entry:
+            self.record_miss()
+        # A body cut off at the download cap must not be served as the page later
+        if not getattr(response, 'truncated', False):
+            self.store(url, response.status_code, response.headers, response.content, response.url)
+        return response
+
+    def servable(self, entry: Optional[Dict]) -> bool:
+        """Whether a looked-up entry may be used without asking the origin"""
+        return bool(entry) and entry['fresh'] and not _revalidate_all.get()
+
+    def stats(self) -> Dict:
+        """Get cache counters"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['revalidated'] + self._stats['misses']
+            return {
+                'enabled': self.enabled,
+                'size_mb': round(self._size / 1024 / 1024, 2),
+                'max_size_mb': self.max_bytes // (1024 * 1024),
+                **self._stats,
+                'hit_rate': (self._stats['hits'] + self._stats['revalidated']) / lookups if lookups else 0
+            }
+
+    def clear(self):
+        """Remove every cached response"""
+        if not self.enabled:
+            return
+        with self._connect() as conn:
+            conn.execute('DELETE FROM http_cache')
+        with self._lock:
+            self._size = 0
+
+    def _lifetime(self, headers: Mapping[str, str], now: float) -> float:
+        """Seconds a response stays fresh (0: revalidate on every use)"""
+        cache_control = (headers.get('cache-control') or '').lower()
+        if 'no-cache' in cache_control:
+            return 0
+
+        max_ages = {name.lower(): int(value) for name, value in _MAX_AGE.findall(cache_control)}
+        if max_ages:
+            age = headers.get('age')
+            return max(0, max_ages.get('s-maxage', max_ages.get('max-age', 0)) - (int(age) if age and age.isdigit() else 0))
+
+        expires = _parse_http_date(headers.get('expires'))
+        if expires is not None:
+            date = _parse_http_date(headers.get('date')) or now
+            return max(0, expires - date)
+
+        # Heuristic freshness: 10% of the time since the page last changed
+        last_modified = _parse_http_date(headers.get('last-modified'))
+        if last_modified is not None:
+            return min(self.default_ttl, max(0, (now - last_modified) / 10))
+        return self.default_ttl
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is 90% of its size bound"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        with self._connect() as conn:
+            # Other processes share the file, so start from the real total
+            size = conn.execute('SELECT COALESCE(SUM(size), 0) FROM http_cache').fetchone()[0]
+            rows = conn.execute('SELECT url, size FROM http_cache ORDER BY last_access').fetchall()
+            for key, entry_size in rows:
+                if size <= target:
+                    break
+                conn.execute('DELETE FROM http_cache WHERE url = ?', (key,))
+                size -= entry_size
+                evicted += 1
+
+        with self._lock:
+            self._size = size
+            self._stats['evicted'] += evicted
+        logger.info(f"HTTP cache evicted {evicted} entries ({size / 1024 / 1024:.1f}MB left)")
+
+    def _requests_response(self, url: str, entry: Dict) -> requests.Response:
+        """Rebuild a requests.Response from a cached entry"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response._content = entry['body']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.url = entry['final_url'] or url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        response.truncated = False  # only complete bodies are stored
+        return response
+
+    def httpx_response(self, url: str, entry: Dict) -> httpx.Response:
+        """Rebuild an httpx.Response from a cached entry"""
+        response = httpx.Response(200, headers=entry['headers'], content=entry['body'],
+                                  request=httpx.Request('GET', entry['final_url'] or url))
+        response.truncated = False  # only complete bodies are stored
+        return response
+
+
+# Global instance
+http_cache = HTTPCache()
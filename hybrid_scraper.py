@@ -11,13 +11,11 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
-# Import browser scraper for fallback
-try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    logging.warning("Playwright not available, browser automation disabled")
+# Shared browser pool for fallback
+from browser_pool import browser_pool, PLAYWRIGHT_AVAILABLE, RENDER_MARGIN_SECONDS
+from page_readiness import CONTACT_SIGNALS, wait_until_ready
+from domain_profile import domain_profiles, detect_cms
+from fetch_service import fetch_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,16 +26,12 @@ class HybridScraper:
     Intelligent scraper that:
     1. Tries fast HTTP request first
     2. Falls back to browser automation if blocked (403) or no data found
-    3. Returns comprehensive facility data
+    3. Goes straight to the browser for domains that recently needed it
+    4. Returns comprehensive facility data
     """
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-        })
+        self.fetcher = fetch_service
         self.timeout = 15
 
     def scrape_facility_website(self, url: str) -> Dict:
@@ -46,27 +40,44 @@ class HybridScraper:
         """
         logger.info(f"Starting hybrid scrape of {url}")
         
+        # Step 0: Skip the doomed HTTP attempt for domains known to need a browser
+        browser_result = None
+        if PLAYWRIGHT_AVAILABLE and domain_profiles.prefers_browser(url):
+            browser_result = self._try_browser_scrape(url)
+            if self._has_data(browser_result):
+                domain_profiles.record(url, browser_ok=True)
+                return browser_result
+            logger.info(f"Browser-first scrape found nothing for {url}, trying HTTP")
+        
         # Step 1: Try HTTP request first (fast)
         http_result = self._try_http_scrape(url)
         
         # Check if HTTP scrape was successful and found data
-        if http_result.get('status') == 'success' and len(http_result.get('phone', [])) > 0:
+        if self._has_data(http_result):
             logger.info(f"HTTP scrape successful for {url}")
+            domain_profiles.record(url, http_ok=True, cms=http_result.get('cms'))
             return http_result
         
         # Step 2: If HTTP failed or no phone found, try browser automation
         if PLAYWRIGHT_AVAILABLE:
-            logger.info(f"HTTP scrape failed or incomplete, trying browser automation for {url}")
-            browser_result = self._try_browser_scrape(url)
+            if browser_result is None:
+                logger.info(f"HTTP scrape failed or incomplete, trying browser automation for {url}")
+                browser_result = self._try_browser_scrape(url)
+            domain_profiles.record(url, http_ok=False, browser_ok=self._has_data(browser_result),
+                                   cms=http_result.get('cms'))
             return browser_result
         else:
             logger.warning("Browser automation not available, returning HTTP result")
             return http_result
 
+    def _has_data(self, result: Dict) -> bool:
+        """Whether a scrape result found what we came for (a phone number)"""
+        return result.get('status') == 'success' and len(result.get('phone', [])) > 0
+
     def _try_http_scrape(self, url: str) -> Dict:
         """Try to scrape using HTTP request"""
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.fetcher.get(url, scraper='hybrid', timeout=self.timeout)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -82,6 +93,7 @@ class HybridScraper:
                 'hours': self._extract_hours(soup),
                 'services': self._extract_services(soup),
                 'website_quality': self._assess_website_quality(soup),
+                'cms': detect_cms(response.text),
                 'status': 'success'
             }
             
@@ -101,69 +113,48 @@ class HybridScraper:
 
     def _try_browser_scrape(self, url: str) -> Dict:
         """Scrape using Playwright browser automation"""
+        def render(page):
+            # Navigate with shorter timeout
+            logger.info(f"Browser navigating to {url}")
+            try:
+                page.goto(url, wait_until='domcontentloaded', timeout=20000)
+                ready = wait_until_ready(page, CONTACT_SIGNALS)
+                logger.info(f"Page ready in {ready['elapsed_ms']}ms ({ready['reason']})")
+            except:
+                # If networkidle fails, try with just load
+                logger.warning("Network idle timeout, continuing anyway")
+            
+            # Get content
+            return page.content(), page.inner_text('body')
+        
         try:
-            with sync_playwright() as p:
-                # Launch browser with args to bypass detection
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox'
-                    ]
-                )
-                
-                # Create context
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    locale='en-US',
-                )
-                
-                page = context.new_page()
-                
-                # Add script to remove webdriver property
-                page.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                """)
-                
-                # Navigate with shorter timeout
-                logger.info(f"Browser navigating to {url}")
-                try:
-                    page.goto(url, wait_until='domcontentloaded', timeout=20000)
-                    page.wait_for_timeout(2000)
-                except:
-                    # If networkidle fails, try with just load
-                    logger.warning("Network idle timeout, continuing anyway")
-                
-                # Get content
-                content = page.content()
-                page_text = page.inner_text('body') if page else ""
-                
-                browser.close()
-                
-                # Parse content
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                facility_data = {
-                    'url': url,
-                    'scraped_at': datetime.now().isoformat(),
-                    'scraping_method': 'browser_automation',
-                    'facility_name': self._extract_facility_name(soup),
-                    'phone': self._extract_phone_from_text(page_text),
-                    'email': self._extract_email(soup),
-                    'address': self._extract_address(soup),
-                    'hours': self._extract_hours(soup),
-                    'services': self._extract_services(soup),
-                    'website_quality': self._assess_website_quality(soup),
-                    'status': 'success'
-                }
-                
-                logger.info(f"Browser scrape complete for {url}, found {len(facility_data['phone'])} phones")
-                return facility_data
-                
+            # Render with a warm pooled browser (stealth init script included)
+            content, page_text = browser_pool.run(render, context_options={
+                'viewport': {'width': 1920, 'height': 1080},
+                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'locale': 'en-US',
+            }, timeout=20 + RENDER_MARGIN_SECONDS)
+            
+            # Parse content
+            soup = BeautifulSoup(content, 'html.parser')
+            
+            facility_data = {
+                'url': url,
+                'scraped_at': datetime.now().isoformat(),
+                'scraping_method': 'browser_automation',
+                'facility_name': self._extract_facility_name(soup),
+                'phone': self._extract_phone_from_text(page_text),
+                'email': self._extract_email(soup),
+                'address': self._extract_address(soup),
+                'hours': self._extract_hours(soup),
+                'services': self._extract_services(soup),
+                'website_quality': self._assess_website_quality(soup),
+                'status': 'success'
+            }
+            
+            logger.info(f"Browser scrape complete for {url}, found {len(facility_data['phone'])} phones")
+            return facility_data
+            
         except Exception as e:
             logger.error(f"Browser scrape failed for {url}: {e}")
             return {
@@ -3,6 +3,7 @@ Integrated Scraping Pipeline for ScrapeX
 Combines directory scraping with individual business scraping
 """
 
+import contextvars
 import json
 import logging
 from typing import Dict, List, Optional
@@ -12,6 +13,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from directory_scraper import DirectoryScraper
 from universal_scraper import UniversalBusinessScraper
+from business_cache import business_cache
+from host_limiter import interleave_by_host
+from dns_cache import dns_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,7 +44,8 @@ class IntegratedScrapingPipeline:
 
     def scrape_directory_and_businesses(self, directory_url: str, 
                                        max_businesses: Optional[int] = None,
-                                       max_pages: int = 10) -> Dict:
+                                       max_pages: int = 10,
+                                       force_refresh: bool = False) -> Dict:
         """
         Complete pipeline: scrape directory, then scrape each business
         
@@ -48,6 +53,7 @@ class IntegratedScrapingPipeline:
             directory_url: URL of business directory
             max_businesses: Optional limit on number of businesses to scrape
             max_pages: Maximum directory pages to scrape
+            force_refresh: Scrape every website even if a fresh cached result exists
             
         Returns:
             Dict with directory info and detailed business data
@@ -76,9 +82,12 @@ class IntegratedScrapingPipeline:
             businesses_from_directory = businesses_from_directory[:max_businesses]
             logger.info(f"Limited to {max_businesses} businesses")
         
+        # Resolve every harvested domain concurrently before the scrape needs them
+        dns_cache.prefetch(b.get('website') for b in businesses_from_directory)
+        
         # Step 2: Scrape each individual business
         logger.info("Step 2: Scraping individual businesses for detailed info...")
-        detailed_businesses = self._scrape_businesses_parallel(businesses_from_directory)
+        detailed_businesses = self._scrape_businesses_parallel(businesses_from_directory, force_refresh)
         
         # Step 3: Combine and return results
         return {
@@ -93,12 +102,13 @@ class IntegratedScrapingPipeline:
             'summary': self._generate_summary(detailed_businesses)
         }
 
-    def _scrape_businesses_parallel(self, business_list: List[Dict]) -> List[Dict]:
+    def _scrape_businesses_parallel(self, business_list: List[Dict], force_refresh: bool = False) -> List[Dict]:
         """
         Scrape multiple businesses in parallel
         
         Args:
             business_list: List of businesses from directory
+            force_refresh: Bypass the result cache
             
         Returns:
             List of detailed business data
@@ -106,13 +116,17 @@ class IntegratedScrapingPipeline:
         detailed_businesses = []
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all scraping tasks
+            # Submit all scraping tasks, round-robin across hosts so the
+            # workers are not all waiting on one site's rate limit (each in a
+            # copy of this context so the job's fetch budget applies)
             future_to_business = {
                 executor.submit(
+                    contextvars.copy_context().run,
                     self._scrape_single_business, 
-                    business
+                    business,
+                    force_refresh
                 ): business 
-                for business in business_list
+                for business in interleave_by_host(business_list, lambda b: b.get('website'))
             }
             
             # Collect results as they complete
@@ -129,12 +143,13 @@ class IntegratedScrapingPipeline:
         
         return detailed_businesses
 
-    def _scrape_single_business(self, directory_business: Dict) -> Optional[Dict]:
+    def _scrape_single_business(self, directory_business: Dict, force_refresh: bool = False) -> Optional[Dict]:
         """
         Scrape a single business and combine with directory data
         
         Args:
             directory_business: Business data from directory
+            force_refresh: Scrape even if a fresh cached result exists
             
         Returns:
             Combined business data
@@ -144,10 +159,11 @@ class IntegratedScrapingPipeline:
             return None
         
         try:
-            # Scrape the business website
-            detailed_data = self.business_scraper.scrape_business(
+            # Scrape the business website (or reuse a recent result from any job)
+            detailed_data = business_cache.get_or_scrape(
                 website,
-                business_type=directory_business.get('category')
+                lambda url: self.business_scraper.scrape_business(url, business_type=directory_business.get('category')),
+                force_refresh=force_refresh
             )
             
             # Combine directory data with scraped data
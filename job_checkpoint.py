@@ -0,0 +1,127 @@
+"""
+Job Checkpointing for ScrapeX Directory Jobs
+Records what a batch job has already done so it can resume after a crash or restart
+"""
+
+import json
+import os
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Directory holding job output, checkpoints and result spools
+JOB_OUTPUT_DIR = os.getenv('SCRAPEX_JOB_DIR', '/tmp')
+
+
+def job_output_path(job_id: str) -> str:
+    """Path of the JSONL results spool for a job"""
+    return os.path.join(JOB_OUTPUT_DIR, f"job_{job_id}_results.jsonl")
+
+
+class JobCheckpoint:
+    """
+    Checkpoint log for a directory batch job
+
+    Layout (alongside the results spool):
+    - job_<id>_checkpoint.json: job parameters and the directory listing snapshot
+    - job_<id>_checkpoint.log: one completed website per line, fsync'd per batch
+
+    The snapshot means a resumed job never re-scrapes the directory, and the
+    completed log means it never re-fetches a business it already finished.
+    """
+
+    def __init__(self, job_id: str, metadata: Optional[Dict] = None, directory: str = JOB_OUTPUT_DIR):
+        """
+        Initialize checkpoint
+
+        Args:
+            job_id: Job identifier
+            metadata: Extra fields stored with the snapshot (e.g. user_id)
+            directory: Directory holding job files
+        """
+        self.job_id = job_id
+        self.metadata = metadata or {}
+        self.snapshot_path = os.path.join(directory, f"job_{job_id}_checkpoint.json")
+        self.log_path = os.path.join(directory, f"job_{job_id}_checkpoint.log")
+
+    def exists(self) -> bool:
+        """Check if a snapshot has been written for this job"""
+        return os.path.exists(self.snapshot_path)
+
+    def save_snapshot(self, params: Dict, businesses: Optional[List[Dict]] = None,
+                      total_found: Optional[int] = None):
+        """
+        Write the job parameters and directory listing snapshot
+
+        Args:
+            params: Job parameters (directory_url, max_businesses, max_pages, ...)
+            businesses: Directory listing to process, or None if not scraped yet
+            total_found: Number of businesses found before max_businesses was applied
+        """
+        snapshot = {
+            'job_id': self.job_id,
+            **self.metadata,
+            'params': params,
+            'total_found': total_found,
+            'businesses': businesses
+        }
+
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def load_snapshot(self) -> Optional[Dict]:
+        """Read the snapshot, or None if the job has no checkpoint"""
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read checkpoint for job {self.job_id}: {e}")
+            return None
+
+    def mark_completed(self, outcomes: Iterable[Tuple[str, bool]]):
+        """
+        Append completed websites to the log and fsync
+
+        Args:
+            outcomes: (website, succeeded) pairs
+        """
+        lines = ''.join(
+            json.dumps({'website': website, 'ok': ok}) + '\n'
+            for website, ok in outcomes if website
+        )
+        if not lines:
+            return
+
+        with open(self.log_path, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_completed(self) -> Dict[str, bool]:
+        """
+        Read the completed log
+
+        Returns:
+            Mapping of website -> whether it was scraped successfully
+        """
+        completed = {}
+        try:
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash mid-append
+                    completed[entry['website']] = entry.get('ok', False)
+        except FileNotFoundError:
+            pass
+
+        return completed
@@ -0,0 +1,145 @@
+"""
+Job Execution Engine for ScrapeX
+Runs blocking scrape/analysis jobs off the API event loop with a bounded queue
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the executor has no room for another job"""
+
+
+class JobExecutor:
+    """
+    Bounded worker pool for background jobs
+
+    Features:
+    - Fixed number of worker threads, so scraping never runs on the event loop
+    - Bounded queue: submit() fails fast instead of piling up unbounded work
+    - Running/queued counters for health reporting
+    - Tracks which job ids are queued or running (is_active)
+    """
+
+    # Configuration
+    MAX_WORKERS = int(os.getenv('SCRAPEX_JOB_WORKERS', '4'))
+    MAX_QUEUED = int(os.getenv('SCRAPEX_JOB_QUEUE_SIZE', '50'))
+
+    def __init__(self, max_workers: int = None, max_queued: int = None):
+        """
+        Initialize job executor
+
+        Args:
+            max_workers: Number of jobs that run at the same time
+            max_queued: Number of jobs allowed to wait for a worker
+        """
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.max_queued = max_queued if max_queued is not None else self.MAX_QUEUED
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queued)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._active = set()
+
+    def submit(self, job_id: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a job for execution
+
+        Args:
+            job_id: Job identifier (for logging)
+            fn: Blocking job function
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Future for the job
+
+        Raises:
+            QueueFullError: If all workers are busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError(
+                f"Job queue is full ({self.max_workers} running, {self.max_queued} queued). "
+                "Please try again in a few minutes."
+            )
+
+        with self._lock:
+            self._pending += 1
+            self._active.add(job_id)
+
+        try:
+            future = self._executor.submit(self._run, job_id, fn, *args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(job_id)
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._finished(job_id))
+        logger.info(f"Queued job {job_id} ({self.stats()['queued']} waiting)")
+        return future
+
+    def _run(self, job_id: str, fn: Callable, *args, **kwargs):
+        """Run a job on a worker thread and keep counters up to date"""
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self._completed += 1
+            return result
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            logger.error(f"Job {job_id} raised: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _finished(self, job_id: str):
+        """Free the job's slot once its future is done (or cancelled)"""
+        with self._lock:
+            self._active.discard(job_id)
+        self._slots.release()
+
+    def is_active(self, job_id: str) -> bool:
+        """Whether a job is queued or running on this executor"""
+        with self._lock:
+            return job_id in self._active
+
+    def stats(self) -> Dict:
+        """Get current executor load"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queued': self.max_queued,
+                'running': self._running,
+                'queued': self._pending,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs and (optionally) wait for running ones"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Global instance
+job_executor = JobExecutor()
@@ -0,0 +1,346 @@
+"""
+Job Handlers for ScrapeX
+Scrape, bulk scrape, directory and analysis jobs, shared by the API process and queue workers
+"""
+
+import os
+import re
+import threading
+import time
+import logging
+import requests
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+
+from universal_scraper import UniversalBusinessScraper
+from integrated_scraper import IntegratedScrapingPipeline
+from batch_processor import BatchProcessor
+from job_checkpoint import JobCheckpoint, job_output_path
+from supabase_manager import db_manager
+from progress_writer import progress_writer
+from business_sink import BusinessSink
+from fetch_budget import fetch_budget
+from resource_manager import resource_manager
+from ai_analysis_engine import HealthcareAIAnalyzer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize services
+scraper = UniversalBusinessScraper()
+integrated_pipeline = IntegratedScrapingPipeline(max_workers=5)
+batch_processor = BatchProcessor(batch_size=50, max_workers=5)
+analyzer = HealthcareAIAnalyzer()
+
+# Jobs whose worker lost the lease; their handlers stop and record nothing more
+_cancelled_jobs = set()
+_cancelled_lock = threading.Lock()
+
+
+def cancel_job(job_id: str):
+    """Ask a running job to stop without recording any further results"""
+    with _cancelled_lock:
+        _cancelled_jobs.add(job_id)
+
+
+def is_cancelled(job_id: str) -> bool:
+    """Whether a job has been asked to stop"""
+    with _cancelled_lock:
+        return job_id in _cancelled_jobs
+
+
+def report_progress(job_id: str, progress: Dict):
+    """Queue a job's progress for the database, unless the job was cancelled"""
+    if not is_cancelled(job_id):
+        progress_writer.report(job_id, progress)
+
+
+# Phone number formatting function
+def format_phone_to_e164(phone: str) -> str:
+    """Convert phone number to E.164 format (+1XXXXXXXXXX)"""
+    # Remove all non-digit characters
+    digits = re.sub(r'\D', '', phone)
+
+    # If it starts with 1 and has 11 digits, add +
+    if len(digits) == 11 and digits.startswith('1'):
+        return f'+{digits}'
+    # If it has 10 digits, add +1
+    elif len(digits) == 10:
+        return f'+1{digits}'
+    # If it already starts with + return as is
+    elif phone.startswith('+'):
+        return phone
+    else:
+        # Return as is and let Retell reject if invalid
+        return phone
+
+
+# Retell AI call function
+def initiate_retell_call(business_name: str, phone_number: str) -> Dict:
+    """Initiate a call via Retell AI"""
+    retell_api_key = os.getenv('RETELL_API_KEY')
+    agent_id = os.getenv('RETELL_AGENT_ID', 'agent_05e8f725879b2997086400e39f')
+    from_number = os.getenv('RETELL_FROM_NUMBER', '+16099084403')
+
+    headers = {
+        'Authorization': f'Bearer {retell_api_key}',
+        'Content-Type': 'application/json'
+    }
+
+    # Format phone number to E.164
+    formatted_phone = format_phone_to_e164(phone_number)
+
+    call_config = {
+        'agent_id': agent_id,
+        'from_number': from_number,
+        'to_number': formatted_phone,
+        'metadata': {
+            'business_name': business_name,
+            'source': 'automated_scrape',
+            'timestamp': datetime.now().isoformat()
+        }
+    }
+
+    response = requests.post(
+        'https://api.retellai.com/v2/create-phone-call',
+        headers=headers,
+        json=call_config
+    )
+
+    if response.status_code == 201:
+        return response.json()
+    else:
+        raise Exception(f"Retell API error: {response.status_code} - {response.text}")
+
+
+# Job handlers
+#
+# Each handler runs a job to completion on the calling thread and returns
+# the updates to apply to the job record ('status' is always set). They do
+# not touch the API's job storage, so the same code runs inline in the API
+# process or in a queue worker process.
+
+def process_scrape_job(job_id: str, url: str, business_type: Optional[str] = None) -> Dict:
+    """Process scrape job with automated calling"""
+    updates = {}
+    try:
+        # Scrape the business
+        result = scraper.scrape_business(url, business_type)
+        updates['status'] = 'completed'
+        updates['result'] = result
+        logger.info(f"Scrape job {job_id} completed")
+
+        # Automatically initiate call if phone numbers found
+        # Try both possible formats
+        phone_numbers = result.get('contact_info', {}).get('phone_numbers', []) or result.get('phone', [])
+        if phone_numbers:
+            first_phone = phone_numbers[0]
+            business_name = result.get('business_name', 'Unknown Business')
+
+            # Check if automatic calling is enabled
+            enable_auto_calling = os.getenv('ENABLE_AUTO_CALLING', 'false').lower() == 'true'
+
+            if enable_auto_calling:
+                logger.info(f"Initiating automated call to {first_phone} for {business_name}")
+
+                # Initiate call via Retell AI
+                try:
+                    call_result = initiate_retell_call(business_name, first_phone)
+                    updates['call_initiated'] = True
+                    updates['call_id'] = call_result.get('call_id')
+                    updates['call_phone'] = first_phone
+                    logger.info(f"Call initiated successfully: {call_result.get('call_id')}")
+                except Exception as call_error:
+                    logger.error(f"Failed to initiate call: {str(call_error)}")
+                    updates['call_initiated'] = False
+                    updates['call_error'] = str(call_error)
+            else:
+                logger.info(f"Auto-calling disabled. Phone number found: {first_phone}")
+                updates['call_initiated'] = False
+                updates['call_phone'] = first_phone
+                updates['call_error'] = 'Auto-calling disabled via ENABLE_AUTO_CALLING=false'
+        else:
+            logger.warning(f"No phone numbers found for {url}, skipping automated call")
+            updates['call_initiated'] = False
+            updates['call_error'] = 'No phone numbers found'
+
+    except Exception as e:
+        updates['status'] = 'failed'
+        updates['error'] = str(e)
+        logger.error(f"Scrape job {job_id} failed: {str(e)}")
+
+    return updates
+
+
+def process_bulk_scrape_job(job_id: str, urls: List[str], business_type: Optional[str] = None) -> Dict:
+    """Process bulk scrape job"""
+    try:
+        with fetch_budget() as budget:
+            results = scraper.scrape_multiple_businesses(urls, business_type)
+        logger.info(f"Bulk scrape job {job_id} completed")
+        return {
+            'status': 'completed',
+            'results': results,
+            'processed': len(results),
+            'fetch_budget': budget.stats()
+        }
+    except Exception as e:
+        logger.error(f"Bulk scrape job {job_id} failed: {str(e)}")
+        return {'status': 'failed', 'error': str(e)}
+
+
+def process_directory_scrape_job(job_id: str, user_id: str, directory_url: str,
+                                 max_businesses: Optional[int] = None,
+                                 max_pages: int = 10,
+                                 batch_size: int = 50,
+                                 use_batch_processing: bool = True,
+                                 resume: bool = False,
+                                 force_refresh: bool = False) -> Dict:
+    """Process directory scrape job with safety measures"""
+    start_time = time.time()
+
+    # Queue workers run in their own process, so track the job here if the
+    # API process has not already registered it with this resource manager
+    if job_id not in resource_manager.active_jobs:
+        resource_manager.register_job(job_id, user_id)
+
+    # Businesses are saved while the job runs, so a failure keeps what was scraped
+    sink = BusinessSink(job_id, user_id, resume=resume) if use_batch_processing else None
+
+    try:
+        # Update job status
+        db_manager.update_job(job_id, {'status': 'processing', 'started_at': datetime.now().isoformat()})
+
+        # Check for timeout periodically
+        if resource_manager.check_job_timeout(job_id):
+            raise TimeoutError("Job exceeded 30 minute timeout")
+
+        # Every request of the job shares one deadline and retry allowance
+        with fetch_budget() as budget:
+            # Use batch processing for safety
+            if use_batch_processing:
+                logger.info(f"Using batch processing (batch_size={batch_size})")
+                result = batch_processor.process_directory_in_batches(
+                    directory_url=directory_url,
+                    output_file=job_output_path(job_id),
+                    max_businesses=max_businesses,
+                    max_pages=max_pages,
+                    checkpoint=JobCheckpoint(job_id, metadata={'user_id': user_id}),
+                    resume=resume,
+                    progress_callback=lambda progress: report_progress(job_id, progress),
+                    result_callback=sink.put,
+                    force_refresh=force_refresh,
+                    should_stop=lambda: is_cancelled(job_id)
+                )
+            else:
+                logger.info("Using integrated pipeline")
+                result = integrated_pipeline.scrape_directory_and_businesses(
+                    directory_url,
+                    max_businesses=max_businesses,
+                    max_pages=max_pages,
+                    force_refresh=force_refresh
+                )
+        result['fetch_budget'] = budget.stats()
+
+        if is_cancelled(job_id):
+            # Another worker owns the job now; leave its records alone
+            if sink:
+                sink.close(discard=True)
+            logger.warning(f"Directory scrape job {job_id} stopped after its lease was lost")
+            return {'status': 'cancelled', 'result': result}
+
+        if use_batch_processing:
+            save_result = sink.close()
+        else:
+            # Save businesses to database
+            save_result = {'failed': 0}
+            if result.get('status') == 'success' or result.get('status') == 'completed':
+                save_result = db_manager.save_businesses_bulk(job_id, user_id, result.get('businesses', []))
+
+        if save_result['failed']:
+            logger.warning(f"Job {job_id}: {save_result['failed']} businesses were not saved")
+
+        # Calculate stats
+        duration = time.time() - start_time
+        job_stats = resource_manager.get_job_stats(job_id)
+        
+        # Write the last coalesced progress before the final status
+        progress_writer.close(job_id)
+
+        # Update job as completed
+        db_manager.update_job(job_id, {
+            'status': 'completed',
+            'completed_at': datetime.now().isoformat(),
+            'result': result,
+            'processed_count': result.get('total_processed', 0),
+            'successful_count': result.get('successful', 0),
+            'failed_count': result.get('failed', 0),
+            'duration_seconds': duration,
+            'memory_used_mb': job_stats.get('memory_used_mb') if job_stats else None
+        })
+
+        logger.info(f"Directory scrape job {job_id} completed - {result.get('successful', 0)} businesses scraped in {duration:.1f}s")
+        return {'status': 'completed', 'result': result}
+
+    except TimeoutError as e:
+        logger.error(f"Job {job_id} timed out: {str(e)}")
+        db_manager.update_job(job_id, {'status': 'failed', 'error_message': str(e)})
+        return {'status': 'failed', 'error': str(e)}
+
+    except Exception as e:
+        logger.error(f"Directory scrape job {job_id} failed: {str(e)}")
+        db_manager.update_job(job_id, {'status': 'failed', 'error_message': str(e)})
+        return {'status': 'failed', 'error': str(e)}
+
+    finally:
+        # Always unregister job to free up resources
+        if sink:
+            sink.close()
+        progress_writer.close(job_id, discard=is_cancelled(job_id))
+        resource_manager.unregister_job(job_id)
+
+
+def process_analysis_job(job_id: str, business_data: Dict) -> Dict:
+    """Process analysis job"""
+    try:
+        result = analyzer.analyze_facility(business_data)
+        logger.info(f"Analysis job {job_id} completed")
+        return {'status': 'completed', 'result': result}
+    except Exception as e:
+        logger.error(f"Analysis job {job_id} failed: {str(e)}")
+        return {'status': 'failed', 'error': str(e)}
+
+
+# Job type -> handler
+JOB_HANDLERS: Dict[str, Callable[..., Dict]] = {
+    'scrape': process_scrape_job,
+    'bulk_scrape': process_bulk_scrape_job,
+    'directory_scrape': process_directory_scrape_job,
+    'analysis': process_analysis_job,
+}
+
+
+def run_job(job_id: str, job_type: str, params: Dict) -> Dict:
+    """
+    Run a job by type
+
+    Args:
+        job_id: Job identifier
+        job_type: Key in JOB_HANDLERS
+        params: Keyword arguments for the handler
+
+    Returns:
+        Updates to apply to the job record
+    """
+    handler = JOB_HANDLERS.get(job_type)
+    if handler is None:
+        return {'status': 'failed', 'error': f"Unknown job type: {job_type}"}
+
+    try:
+        return handler(job_id, **params)
+    except Exception as e:
+        logger.error(f"Job {job_id} ({job_type}) crashed: {str(e)}")
+        return {'status': 'failed', 'error': str(e)}
+    finally:
+        with _cancelled_lock:
+            _cancelled_jobs.discard(job_id)
@@ -0,0 +1,323 @@
+"""
+Durable Job Queue for ScrapeX
+Persists scrape/directory/analysis jobs so separate worker processes can claim them
+"""
+
+import json
+import os
+import sqlite3
+import time
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Terminal job states
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+class JobQueue(ABC):
+    """
+    Interface for durable job queues
+
+    Jobs move queued -> running -> completed/failed. A running job holds a
+    lease that its worker renews with heartbeat(); if the worker dies the
+    lease expires and the job is handed to another worker until
+    max_attempts is reached.
+
+    SQLiteJobQueue is the local implementation; a Postgres/Supabase queue
+    plugs in by implementing the same methods.
+    """
+
+    @abstractmethod
+    def enqueue(self, job_id: str, job_type: str, params: Dict,
+                user_id: Optional[str] = None, max_attempts: int = 3) -> Dict:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, updates: Dict) -> bool:
+        ...
+
+    @abstractmethod
+    def release(self, job_id: str, worker_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def get_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        ...
+
+    @abstractmethod
+    def count_active(self, user_id: Optional[str] = None, job_type: Optional[str] = None) -> int:
+        ...
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite-backed job queue shared by the API process and local workers
+
+    Uses WAL mode and BEGIN IMMEDIATE transactions so several worker
+    processes on one node can claim jobs without double-processing.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize queue
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection in autocommit mode (transactions are explicit)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create tables and indexes"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    job_id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    user_id TEXT,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    heartbeat_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_job_queue_status ON job_queue(status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_job_queue_user ON job_queue(user_id, status)')
+
+    def enqueue(self, job_id: str, job_type: str, params: Dict,
+                user_id: Optional[str] = None, max_attempts: int = 3) -> Dict:
+        """
+        Add a job to the queue
+
+        Args:
+            job_id: Job identifier
+            job_type: Handler name (scrape, bulk_scrape, directory_scrape, analysis)
+            params: Handler parameters (must be JSON serializable)
+            user_id: Owner of the job
+            max_attempts: Claims allowed before the job is failed
+
+        Returns:
+            Queued job record
+
+        Raises:
+            ValueError: If a job with this ID is already queued or running
+        """
+        now = time.time()
+        with self._connect() as conn:
+            # A finished job can be queued again under the same ID (resume)
+            queued = conn.execute(
+                '''INSERT INTO job_queue
+                   (job_id, job_type, user_id, params, status, max_attempts, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)
+                   ON CONFLICT(job_id) DO UPDATE SET
+                       job_type = excluded.job_type, params = excluded.params, status = 'queued',
+                       attempts = 0, max_attempts = excluded.max_attempts, worker_id = NULL,
+                       lease_expires_at = NULL, result = NULL, error = NULL,
+                       updated_at = excluded.updated_at
+                   WHERE job_queue.status IN ('completed', 'failed')''',
+                (job_id, job_type, user_id, json.dumps(params, default=str), max_attempts, now, now)
+            ).rowcount
+        if not queued:
+            raise ValueError(f"Job {job_id} is already queued or running")
+
+        logger.info(f"Enqueued {job_type} job {job_id}")
+        return self.get(job_id)
+
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[Dict]:
+        """
+        Claim the oldest queued job
+
+        Expired leases (dead workers) are recovered first: the job goes back
+        to the queue, or is failed if it has used all of its attempts.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the claim holds without a heartbeat
+
+        Returns:
+            Claimed job record, or None if the queue is empty
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    '''UPDATE job_queue
+                       SET status = 'failed', worker_id = NULL, updated_at = ?,
+                           error = 'Worker stopped responding; retries exhausted'
+                       WHERE status = 'running' AND lease_expires_at < ? AND attempts >= max_attempts''',
+                    (now, now)
+                )
+                recovered = conn.execute(
+                    '''UPDATE job_queue
+                       SET status = 'queued', worker_id = NULL, updated_at = ?
+                       WHERE status = 'running' AND lease_expires_at < ?''',
+                    (now, now)
+                ).rowcount
+                if recovered:
+                    logger.warning(f"Requeued {recovered} job(s) from unresponsive workers")
+
+                row = conn.execute(
+                    '''SELECT job_id FROM job_queue
+                       WHERE status = 'queued'
+                       ORDER BY created_at LIMIT 1'''
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+
+                conn.execute(
+                    '''UPDATE job_queue
+                       SET status = 'running', worker_id = ?, attempts = attempts + 1,
+                           lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                       WHERE job_id = ?''',
+                    (worker_id, now + lease_seconds, now, now, row['job_id'])
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+        return self.get(row['job_id'])
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """
+        Extend a running job's lease
+
+        Returns:
+            False if the worker no longer owns the job
+        """
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute(
+                '''UPDATE job_queue
+                   SET lease_expires_at = ?, heartbeat_at = ?, updated_at = ?
+                   WHERE job_id = ? AND worker_id = ? AND status = 'running' ''',
+                (now + lease_seconds, now, now, job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def complete(self, job_id: str, worker_id: str, updates: Dict) -> bool:
+        """
+        Record a job's outcome
+
+        Args:
+            job_id: Job identifier
+            worker_id: Worker that ran the job
+            updates: Job record updates returned by the handler; its 'status'
+                     ('completed' or 'failed') becomes the queue status
+
+        Returns:
+            False if the worker no longer owns the job
+        """
+        status = updates.get('status', 'completed')
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute(
+                '''UPDATE job_queue
+                   SET status = ?, result = ?, error = ?, lease_expires_at = NULL, updated_at = ?
+                   WHERE job_id = ? AND worker_id = ? AND status = 'running' ''',
+                (status, json.dumps(updates, default=str), updates.get('error'), now, job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Put a running job back on the queue (e.g. on worker shutdown)"""
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute(
+                '''UPDATE job_queue
+                   SET status = 'queued', worker_id = NULL, lease_expires_at = NULL, updated_at = ?
+                   WHERE job_id = ? AND worker_id = ? AND status = 'running' ''',
+                (now, job_id, worker_id)
+            ).rowcount
+        return updated > 0
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job record by ID"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM job_queue WHERE job_id = ?', (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        """Get the records of several jobs in one query, keyed by job ID (unknown IDs are left out)"""
+        if not job_ids:
+            return {}
+        placeholders = ', '.join('?' * len(job_ids))
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT * FROM job_queue WHERE job_id IN ({placeholders})', list(job_ids)).fetchall()
+        return {row['job_id']: self._decode(row) for row in rows}
+
+    def _decode(self, row: sqlite3.Row) -> Dict:
+        """Turn a job_queue row into a job record"""
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def count_active(self, user_id: Optional[str] = None, job_type: Optional[str] = None) -> int:
+        """Count queued and running jobs, optionally for one user/type"""
+        query = "SELECT COUNT(*) FROM job_queue WHERE status IN ('queued', 'running')"
+        args = []
+        if user_id is not None:
+            query += ' AND user_id = ?'
+            args.append(user_id)
+        if job_type is not None:
+            query += ' AND job_type = ?'
+            args.append(job_type)
+
+        with self._connect() as conn:
+            return conn.execute(query, args).fetchone()[0]
+
+
+def create_job_queue(url: Optional[str] = None) -> JobQueue:
+    """
+    Build the job queue configured by SCRAPEX_JOB_QUEUE_URL
+
+    Args:
+        url: Queue URL, e.g. sqlite:////var/data/scrapex_jobs.db
+
+    Returns:
+        JobQueue implementation
+    """
+    url = url or os.getenv('SCRAPEX_JOB_QUEUE_URL', 'sqlite:////tmp/scrapex_jobs.db')
+
+    if url.startswith('sqlite:///'):
+        return SQLiteJobQueue(url[len('sqlite:///'):])
+
+    raise ValueError(f"Unsupported job queue URL: {url} (implement JobQueue for this backend)")
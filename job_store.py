@@ -0,0 +1,261 @@
+"""
+Job Store for ScrapeX
+Bounded in-memory hot tier over an indexed SQLite cold tier for API job records
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """
+    Job record storage for the API
+
+    Features:
+    - Every write goes to SQLite (indexed by job id, user and created_at)
+    - Recently used records are kept in an LRU hot tier bounded by size and TTL
+    - Listing jobs is an indexed query instead of a copy of every record
+    - The lock only guards the hot tier: JSON encoding and SQLite I/O happen
+      outside it, so reads never wait behind a job writing a large result
+      (writers are serialized separately so updates are not lost)
+    """
+
+    # Configuration
+    MAX_HOT_JOBS = int(os.getenv('SCRAPEX_JOB_STORE_HOT_SIZE', '200'))
+    HOT_TTL_SECONDS = int(os.getenv('SCRAPEX_JOB_STORE_HOT_TTL', '900'))
+    DB_PATH = os.getenv('SCRAPEX_JOB_STORE_PATH', '/tmp/scrapex_job_store.db')
+
+    def __init__(self, db_path: Optional[str] = None, max_hot: Optional[int] = None,
+                 hot_ttl: Optional[int] = None):
+        """
+        Initialize job store
+
+        Args:
+            db_path: Path of the SQLite database file
+            max_hot: Maximum number of records kept in memory
+            hot_ttl: Seconds a record stays in memory without being accessed
+        """
+        self.db_path = db_path or self.DB_PATH
+        self.max_hot = max_hot or self.MAX_HOT_JOBS
+        self.hot_ttl = hot_ttl if hot_ttl is not None else self.HOT_TTL_SECONDS
+        self._hot: OrderedDict = OrderedDict()  # job_id -> (last_access, record)
+        self._lock = threading.Lock()  # hot tier only
+        self._write_lock = threading.Lock()  # serializes read-modify-write of records
+        self._hits = 0
+        self._misses = 0
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection to the cold tier"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        """Create tables and indexes"""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    job_type TEXT,
+                    user_id TEXT,
+                    status TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs(user_id, created_at)')
+
+    def put(self, job_id: str, job: Dict):
+        """
+        Create or replace a job record
+
+        Args:
+            job_id: Job identifier
+            job: Full job record ('type', 'status', 'created_at', ...)
+        """
+        job = dict(job)
+        job.setdefault('id', job_id)
+        job.setdefault('created_at', datetime.now().isoformat())
+
+        data = json.dumps(job, default=str)
+        with self._write_lock:
+            self._write(job_id, job, data)
+            with self._lock:
+                self._remember(job_id, job)
+
+    def update(self, job_id: str, updates: Dict) -> Optional[Dict]:
+        """
+        Merge updates into an existing job record
+
+        Args:
+            job_id: Job identifier
+            updates: Fields to set
+
+        Returns:
+            Updated record, or None if the job does not exist
+        """
+        with self._write_lock:
+            job = self._load(job_id)
+            if job is None:
+                logger.warning(f"Update for unknown job {job_id} ignored")
+                return None
+
+            # A new dict: readers may be copying the one in the hot tier
+            job = {**job, **updates}
+            self._write(job_id, job, json.dumps(job, default=str))
+            with self._lock:
+                self._remember(job_id, job)
+            return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a copy of a job record"""
+        job = self._load(job_id)
+        return dict(job) if job is not None else None
+
+    def exists(self, job_id: str) -> bool:
+        """Check whether a job record exists"""
+        with self._lock:
+            if job_id in self._hot:
+                return True
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM jobs WHERE job_id = ?', (job_id,)).fetchone() is not None
+
+    def list(self, limit: int = 50, user_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get the most recent job records, oldest first
+
+        Args:
+            limit: Maximum number of records
+            user_id: Optional owner filter
+
+        Returns:
+            List of job records
+        """
+        query = 'SELECT data FROM jobs'
+        args = []
+        if user_id is not None:
+            query += ' WHERE user_id = ?'
+            args.append(user_id)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        args.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, args).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def mark_interrupted(self) -> int:
+        """
+        Mark jobs left 'processing' by a previous process as 'interrupted'
+
+        Call at startup, before any job is submitted, when jobs run in-process:
+        nothing can still be running them and they can be resumed.
+
+        Returns:
+            Number of jobs marked
+        """
+        with self._write_lock:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT job_id, data FROM jobs WHERE status = 'processing'").fetchall()
+            for job_id, data in rows:
+                job = json.loads(data)
+                job.update({'status': 'interrupted', 'interrupted_at': datetime.now().isoformat()})
+                self._write(job_id, job, json.dumps(job, default=str))
+                with self._lock:
+                    self._hot.pop(job_id, None)
+
+        if rows:
+            logger.warning(f"Marked {len(rows)} jobs interrupted by a restart")
+        return len(rows)
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        """Count stored job records"""
+        with self._connect() as conn:
+            if user_id is None:
+                return conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+            return conn.execute('SELECT COUNT(*) FROM jobs WHERE user_id = ?', (user_id,)).fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Get hot tier usage"""
+        with self._lock:
+            return {
+                'hot_jobs': len(self._hot),
+                'max_hot_jobs': self.max_hot,
+                'hot_hits': self._hits,
+                'hot_misses': self._misses
+            }
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a record from the hot tier, falling back to SQLite (lock not held)
+
+        Records in the hot tier are never modified in place; callers must not
+        modify the returned dict either.
+        """
+        with self._lock:
+            entry = self._hot.get(job_id)
+            if entry is not None and time.time() - entry[0] <= self.hot_ttl:
+                self._hits += 1
+                self._hot.move_to_end(job_id)
+                self._hot[job_id] = (time.time(), entry[1])
+                return entry[1]
+            self._misses += 1
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = json.loads(row[0])
+        with self._lock:
+            # A writer may have cached a newer version while SQLite was read
+            entry = self._hot.get(job_id)
+            if entry is not None and time.time() - entry[0] <= self.hot_ttl:
+                return entry[1]
+            self._remember(job_id, job)
+        return job
+
+    def _write(self, job_id: str, job: Dict, data: str):
+        """Persist a record and its JSON encoding to SQLite (lock not held)"""
+        with self._connect() as conn:
+            conn.execute(
+                '''INSERT OR REPLACE INTO jobs (job_id, job_type, user_id, status, created_at, updated_at, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (job_id, job.get('type'), job.get('user_id'), job.get('status'),
+                 job['created_at'], time.time(), data)
+            )
+
+    def _remember(self, job_id: str, job: Dict):
+        """Put a record in the hot tier and evict expired/least recently used ones (lock held)"""
+        now = time.time()
+        self._hot[job_id] = (now, job)
+        self._hot.move_to_end(job_id)
+
+        while self._hot:
+            oldest_id, (last_access, _) = next(iter(self._hot.items()))
+            if len(self._hot) > self.max_hot or now - last_access > self.hot_ttl:
+                del self._hot[oldest_id]
+            else:
+                break
+
+
+# Global instance
+job_store = JobStore()
@@ -0,0 +1,187 @@
+"""
+Job Queue Worker for ScrapeX
+Claims jobs from the durable job queue and runs them
+
+Usage:
+    python -m job_worker --workers 4
+"""
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import logging
+import multiprocessing
+from typing import Dict, Optional
+
+from job_queue import JobQueue, create_job_queue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Single queue worker
+
+    Claims one job at a time, runs it on a thread while renewing the lease
+    with heartbeats, and records the outcome. If the process dies the lease
+    lapses and another worker picks the job up; directory jobs picked up
+    again resume from their checkpoint. A worker that finds its lease gone
+    stops the job and discards its result.
+    """
+
+    # Configuration
+    LEASE_SECONDS = int(os.getenv('SCRAPEX_JOB_LEASE_SECONDS', '120'))
+    POLL_INTERVAL_SECONDS = float(os.getenv('SCRAPEX_JOB_POLL_SECONDS', '2'))
+
+    def __init__(self, queue: JobQueue, worker_id: Optional[str] = None,
+                 lease_seconds: Optional[int] = None, poll_interval: Optional[float] = None):
+        """
+        Initialize worker
+
+        Args:
+            queue: Job queue to claim from
+            worker_id: Unique worker identifier (defaults to host-pid)
+            lease_seconds: Lease length; heartbeats renew it every third of this
+            poll_interval: Sleep between claims when the queue is empty
+        """
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds or self.LEASE_SECONDS
+        self.poll_interval = poll_interval or self.POLL_INTERVAL_SECONDS
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Stop after the current job (or stop and release it if still running)"""
+        self._stopping.set()
+
+    def run_forever(self):
+        """Claim and run jobs until stopped"""
+        logger.info(f"Worker {self.worker_id} started")
+        while not self._stopping.is_set():
+            try:
+                if not self.run_once():
+                    self._stopping.wait(self.poll_interval)
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} error: {e}")
+                self._stopping.wait(self.poll_interval)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """
+        Claim and run a single job
+
+        Returns:
+            False if the queue was empty
+        """
+        job = self.queue.claim(self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        self._run_claimed(job)
+        return True
+
+    def _run_claimed(self, job: Dict):
+        """Run a claimed job with heartbeats and record its outcome"""
+        # Imported here so the supervisor never builds scrapers/clients that
+        # forked workers would inherit
+        from job_handlers import cancel_job, run_job
+
+        job_id = job['job_id']
+        params = dict(job['params'])
+        if job['job_type'] == 'directory_scrape' and job['attempts'] > 1:
+            params['resume'] = True
+
+        logger.info(f"Worker {self.worker_id} running {job['job_type']} job {job_id} (attempt {job['attempts']})")
+
+        outcome = {}
+
+        def target():
+            outcome['updates'] = run_job(job_id, job['job_type'], params)
+
+        thread = threading.Thread(target=target, name=f"job-{job_id}", daemon=True)
+        thread.start()
+
+        while thread.is_alive():
+            thread.join(self.lease_seconds / 3)
+            if not thread.is_alive():
+                break
+
+            if self._stopping.is_set():
+                # Stop the job, then hand it back now instead of waiting for
+                # the lease to lapse (it must not run on after another worker
+                # has claimed it)
+                cancel_job(job_id)
+                thread.join()
+                self.queue.release(job_id, self.worker_id)
+                logger.warning(f"Worker {self.worker_id} released job {job_id} on shutdown")
+                return
+
+            if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                # Another worker may already be running the job: stop this run
+                # and drop whatever it produces
+                logger.warning(f"Worker {self.worker_id} lost lease on job {job_id}; stopping it")
+                cancel_job(job_id)
+                thread.join()
+                logger.warning(f"Worker {self.worker_id} dropped the result of job {job_id}")
+                return
+
+        updates = outcome.get('updates') or {'status': 'failed', 'error': 'Job produced no result'}
+        if not self.queue.complete(job_id, self.worker_id, updates):
+            logger.warning(f"Job {job_id} was reassigned before worker {self.worker_id} finished it")
+
+
+def _worker_main(index: int):
+    """Entry point of a worker process"""
+    from dns_cache import dns_cache
+    if dns_cache.ENABLED:
+        dns_cache.install()
+
+    worker = JobWorker(create_job_queue(), worker_id=f"{socket.gethostname()}-{os.getpid()}-{index}")
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: worker.stop())
+    worker.run_forever()
+
+
+def main():
+    """Start N worker processes and restart any that die"""
+    parser = argparse.ArgumentParser(description='ScrapeX job queue worker')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SCRAPEX_QUEUE_WORKERS', '2')),
+                        help='Number of worker processes')
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        _worker_main(0)
+        return
+
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    processes = {}
+    for index in range(args.workers):
+        processes[index] = multiprocessing.Process(target=_worker_main, args=(index,))
+        processes[index].start()
+
+    while not stopping.is_set():
+        for index, process in list(processes.items()):
+            if not process.is_alive():
+                logger.warning(f"Worker process {index} exited ({process.exitcode}); restarting")
+                processes[index] = multiprocessing.Process(target=_worker_main, args=(index,))
+                processes[index].start()
+        stopping.wait(5)
+
+    for process in processes.values():
+        process.terminate()
+    for process in processes.values():
+        process.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
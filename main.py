@@ -3,25 +3,37 @@ ScrapeX Backend API
 FastAPI application for healthcare facility scraping, analysis, and autonomous calling
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime
-import json
 import logging
 import os
+import threading
 import requests
 
-from universal_scraper import UniversalBusinessScraper
 from directory_scraper import DirectoryScraper
-from integrated_scraper import IntegratedScrapingPipeline
-from batch_processor import BatchProcessor
+from browser_pool import browser_pool
+from render_service import render_service
+from job_checkpoint import JobCheckpoint
 from supabase_manager import db_manager
 from resource_manager import resource_manager
-from ai_analysis_engine import HealthcareAIAnalyzer
+from job_executor import job_executor, QueueFullError
+from job_store import job_store
+from domain_profile import domain_profiles
+from http_cache import http_cache
+from business_cache import business_cache
+from host_limiter import host_limiter
+from host_breaker import host_breaker
+from host_timeouts import host_timeouts
+from dns_cache import dns_cache
+from fetch_service import fetch_service
+from job_queue import create_job_queue, FINISHED_STATUSES
+from job_handlers import scraper, run_job, initiate_retell_call
 # Removed: from autonomous_caller import AutonomousCallManager - Using Retell AI directly
 from human_ai_caller import HumanAICaller
 from multilingual_caller import MultilingualAICaller
@@ -48,15 +60,44 @@ app.add_middleware(
 
 # Initialize services
 # Version: 2.0 - Automated Calling with Universal Scraper
-scraper = UniversalBusinessScraper()
+# (scraping/analysis services live in job_handlers, shared with queue workers)
 directory_scraper = DirectoryScraper()
-integrated_pipeline = IntegratedScrapingPipeline(max_workers=5)
-batch_processor = BatchProcessor(batch_size=50, max_workers=5)
-analyzer = HealthcareAIAnalyzer()
 # Removed: call_manager = AutonomousCallManager() - Using Retell AI directly
 human_caller = HumanAICaller()
 multilingual_caller = MultilingualAICaller()
 
+# Job execution mode:
+# - inline: jobs run on this process's job executor (default)
+# - durable: jobs go to the persistent job queue and run in `python -m job_worker`
+JOB_QUEUE_MODE = os.getenv('SCRAPEX_JOB_QUEUE', 'inline').lower()
+job_queue = create_job_queue() if JOB_QUEUE_MODE == 'durable' else None
+
+
+@app.on_event("startup")
+async def install_dns_cache():
+    """Route this process's DNS lookups through the shared cache"""
+    if dns_cache.ENABLED:
+        dns_cache.install()
+
+
+@app.on_event("startup")
+async def reconcile_interrupted_jobs():
+    """Jobs run in this process, so any left 'processing' were cut off by a restart"""
+    if job_queue is None:
+        job_store.mark_interrupted()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Close the shared async HTTP client, browsers and job executor"""
+    await scraper.fetch_engine.aclose()
+    fetch_service.close()
+    job_executor.shutdown(wait=False)
+    browser_pool.close()
+    render_service.close()
+    dns_cache.uninstall()
+
+
 # Request/Response models
 class ScrapeRequest(BaseModel):
     """Request to scrape any business"""
@@ -76,6 +117,7 @@ class DirectoryScrapeRequest(BaseModel):
     max_pages: int = 10
     use_batch_processing: bool = True
     batch_size: int = 50
+    force_refresh: bool = False  # ignore cached results for recently scraped websites
 
 class AnalysisRequest(BaseModel):
     """Request to analyze scraped business data"""
@@ -95,16 +137,82 @@ class JobResponse(BaseModel):
     data: Optional[Dict] = None
 
 
-# In-memory job storage (in production, use database)
-jobs_db = {}
+# Job records live in job_store (bounded memory, persisted to SQLite)
 job_counter = 0
+_job_counter_lock = threading.Lock()
 
 
 def generate_job_id() -> str:
-    """Generate unique job ID"""
+    """Generate unique job ID (endpoints call this from threadpool threads)"""
     global job_counter
-    job_counter += 1
-    return f"job_{job_counter:06d}"
+    with _job_counter_lock:
+        job_counter += 1
+        # The counter restarts with the process; skip IDs that still have a
+        # checkpoint on disk so a resumable job is never overwritten.
+        # The same applies to IDs the job store or durable queue already know about.
+        while (job_store.exists(f"job_{job_counter:06d}")
+               or JobCheckpoint(f"job_{job_counter:06d}").exists()
+               or (job_queue and job_queue.get(f"job_{job_counter:06d}"))):
+            job_counter += 1
+        return f"job_{job_counter:06d}"
+
+
+def submit_job(job_id: str, job_type: str, params: Dict, user_id: Optional[str] = None):
+    """
+    Hand a job to the durable job queue or the in-process job executor
+    
+    Job functions are blocking, so they run on executor threads (or worker
+    processes) and never on the event loop serving API requests.
+    
+    Args:
+        job_id: Job identifier
+        job_type: Handler name in job_handlers.JOB_HANDLERS
+        params: Handler keyword arguments
+        user_id: Owner of the job
+    
+    Raises:
+        HTTPException: 503 if the job queue is full, 409 if the job is already queued
+    """
+    try:
+        if job_queue is not None:
+            job_queue.enqueue(job_id, job_type, params, user_id=user_id)
+        else:
+            job_executor.submit(job_id, _run_job_inline, job_id, job_type, params)
+    except QueueFullError as e:
+        job_store.update(job_id, {'status': 'failed', 'error': str(e)})
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+def _run_job_inline(job_id: str, job_type: str, params: Dict):
+    """Run a job on a job executor thread and record its outcome"""
+    updates = run_job(job_id, job_type, params)
+    job_store.update(job_id, updates)
+
+
+def _merge_queue_state(job: Optional[Dict], queued: Dict) -> Dict:
+    """
+    Overlay a durable queue record on the in-memory job record
+    
+    Queued and running jobs keep the API's 'processing' status and report the
+    queue state separately; finished jobs take the worker's result.
+    """
+    job = dict(job or {
+        'id': queued['job_id'],
+        'type': queued['job_type'],
+        'created_at': datetime.fromtimestamp(queued['created_at']).isoformat(),
+        **queued['params']
+    })
+    
+    if queued['status'] in FINISHED_STATUSES:
+        job.update(queued['result'] or {'status': queued['status'], 'error': queued['error']})
+    else:
+        job['status'] = 'processing'
+        job['queue_status'] = queued['status']
+        job['attempts'] = queued['attempts']
+    
+    return job
 
 
 @app.get("/")
@@ -129,8 +237,8 @@ async def root():
 
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
+def health_check():
+    """Health check endpoint (a plain def: the stats below query SQLite, so FastAPI runs it in the threadpool)"""
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -138,7 +246,22 @@ async def health_check():
             "scraper": "ready",
             "analyzer": "ready",
             "call_manager": "ready"
-        }
+        },
+        "job_queue": {
+            "mode": JOB_QUEUE_MODE,
+            "active": job_queue.count_active() if job_queue else None
+        },
+        "job_store": job_store.stats(),
+        "job_executor": job_executor.stats(),
+        "domain_profiles": domain_profiles.stats(),
+        "http_cache": http_cache.stats(),
+        "business_cache": business_cache.stats(),
+        "scrape_coalescing": scraper.coalescing_stats(),
+        "host_limiter": host_limiter.stats(),
+        "host_breaker": host_breaker.stats(),
+        "host_timeouts": host_timeouts.stats(),
+        "dns_cache": dns_cache.stats(),
+        "fetch_service": fetch_service.stats()
     }
 
 
@@ -156,7 +279,7 @@ async def debug_info():
 
 
 @app.post("/api/v1/scrape")
-async def scrape_business(request: ScrapeRequest, background_tasks: BackgroundTasks):
+def scrape_business(request: ScrapeRequest):
     """
     Scrape a single business website (any type)
     
@@ -170,7 +293,7 @@ async def scrape_business(request: ScrapeRequest, background_tasks: BackgroundTa
         job_id = generate_job_id()
         
         # Create job record
-        jobs_db[job_id] = {
+        job_store.put(job_id, {
             'id': job_id,
             'type': 'scrape',
             'status': 'processing',
@@ -180,15 +303,13 @@ async def scrape_business(request: ScrapeRequest, background_tasks: BackgroundTa
             'business_type': request.business_type,
             'result': None,
             'error': None
-        }
+        })
         
         # Process in background
-        background_tasks.add_task(
-            _process_scrape_job,
-            job_id,
-            request.url,
-            request.business_type
-        )
+        submit_job(job_id, 'scrape', {
+            'url': request.url,
+            'business_type': request.business_type
+        })
         
         return {
             'job_id': job_id,
@@ -196,13 +317,15 @@ async def scrape_business(request: ScrapeRequest, background_tasks: BackgroundTa
             'message': 'Scraping job started'
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to start scrape job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/bulk-scrape")
-async def bulk_scrape(request: BulkScrapeRequest, background_tasks: BackgroundTasks):
+def bulk_scrape(request: BulkScrapeRequest):
     """
     Scrape multiple businesses (any type)
     
@@ -216,7 +339,7 @@ async def bulk_scrape(request: BulkScrapeRequest, background_tasks: BackgroundTa
         job_id = generate_job_id()
         
         # Create job record
-        jobs_db[job_id] = {
+        job_store.put(job_id, {
             'id': job_id,
             'type': 'bulk_scrape',
             'status': 'processing',
@@ -226,15 +349,13 @@ async def bulk_scrape(request: BulkScrapeRequest, background_tasks: BackgroundTa
             'processed': 0,
             'results': [],
             'error': None
-        }
+        })
         
         # Process in background
-        background_tasks.add_task(
-            _process_bulk_scrape_job,
-            job_id,
-            request.urls,
-            request.business_type
-        )
+        submit_job(job_id, 'bulk_scrape', {
+            'urls': request.urls,
+            'business_type': request.business_type
+        })
         
         return {
             'job_id': job_id,
@@ -242,13 +363,15 @@ async def bulk_scrape(request: BulkScrapeRequest, background_tasks: BackgroundTa
             'message': f'Bulk scraping job started for {len(request.urls)} URLs'
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to start bulk scrape job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/scrape-directory")
-async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: BackgroundTasks):
+def scrape_directory(request: DirectoryScrapeRequest):
     """
     Scrape a business directory (Chamber of Commerce, tourism sites, etc.)
     
@@ -268,8 +391,9 @@ async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: Ba
         # TODO: Get user_id from auth token
         user_id = "demo_user"  # Replace with actual auth
         
-        # Check rate limits
-        limit_check = resource_manager.check_can_start_job(user_id)
+        # Check rate limits (queued jobs are counted by the durable queue)
+        active_jobs = job_queue.count_active(user_id, 'directory_scrape') if job_queue else None
+        limit_check = resource_manager.check_can_start_job(user_id, active_jobs)
         if not limit_check['can_start']:
             raise HTTPException(status_code=429, detail=limit_check['message'])
         
@@ -279,8 +403,9 @@ async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: Ba
         # Generate job ID
         job_id = generate_job_id()
         
-        # Register job with resource manager
-        resource_manager.register_job(job_id, user_id)
+        # Register job with resource manager (queue workers register their own)
+        if job_queue is None:
+            resource_manager.register_job(job_id, user_id)
         
         # Create job in database
         db_manager.create_job(
@@ -293,10 +418,11 @@ async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: Ba
             batch_size=batch_size
         )
         
-        # Also store in memory for backward compatibility
-        jobs_db[job_id] = {
+        # Also keep in the job store for backward compatibility
+        job_store.put(job_id, {
             'id': job_id,
             'type': 'directory_scrape',
+            'user_id': user_id,
             'status': 'processing',
             'created_at': datetime.now().isoformat(),
             'directory_url': request.directory_url,
@@ -305,19 +431,23 @@ async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: Ba
             'batch_size': batch_size,
             'result': None,
             'error': None
-        }
+        })
         
         # Process in background
-        background_tasks.add_task(
-            _process_directory_scrape_job_safe,
-            job_id,
-            user_id,
-            request.directory_url,
-            request.max_businesses,
-            request.max_pages,
-            batch_size,
-            request.use_batch_processing
-        )
+        try:
+            submit_job(job_id, 'directory_scrape', {
+                'user_id': user_id,
+                'directory_url': request.directory_url,
+                'max_businesses': request.max_businesses,
+                'max_pages': request.max_pages,
+                'batch_size': batch_size,
+                'use_batch_processing': request.use_batch_processing,
+                'force_refresh': request.force_refresh
+            }, user_id=user_id)
+        except HTTPException as e:
+            resource_manager.unregister_job(job_id)
+            db_manager.update_job(job_id, {'status': 'failed', 'error_message': e.detail})
+            raise
         
         return {
             'job_id': job_id,
@@ -327,13 +457,15 @@ async def scrape_directory(request: DirectoryScrapeRequest, background_tasks: Ba
             'estimated_time_minutes': (request.max_businesses or 50) / 5 if request.max_businesses else 10
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to start directory scrape job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/analyze")
-async def analyze_business(request: AnalysisRequest, background_tasks: BackgroundTasks):
+def analyze_business(request: AnalysisRequest):
     """
     Analyze scraped business data for opportunities
     
@@ -347,7 +479,7 @@ async def analyze_business(request: AnalysisRequest, background_tasks: Backgroun
         job_id = generate_job_id()
         
         # Create job record
-        jobs_db[job_id] = {
+        job_store.put(job_id, {
             'id': job_id,
             'type': 'analysis',
             'status': 'processing',
@@ -355,14 +487,10 @@ async def analyze_business(request: AnalysisRequest, background_tasks: Backgroun
             'business_name': request.business_data.get('business_name'),
             'result': None,
             'error': None
-        }
+        })
         
         # Process in background
-        background_tasks.add_task(
-            _process_analysis_job,
-            job_id,
-            request.business_data
-        )
+        submit_job(job_id, 'analysis', {'business_data': request.business_data})
         
         return {
             'job_id': job_id,
@@ -370,13 +498,15 @@ async def analyze_business(request: AnalysisRequest, background_tasks: Backgroun
             'message': 'Analysis job started'
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to start analysis job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/call")
-async def trigger_call(request: CallRequest, background_tasks: BackgroundTasks):
+async def trigger_call(request: CallRequest):
     """
     Trigger an autonomous call to a healthcare facility
     
@@ -388,7 +518,8 @@ async def trigger_call(request: CallRequest, background_tasks: BackgroundTasks):
     """
     try:
         # Trigger call via Retell AI
-        result = await _initiate_retell_call(
+        result = await run_in_threadpool(
+            initiate_retell_call,
             business_name=request.facility_name,
             phone_number=request.phone_number
         )
@@ -401,7 +532,7 @@ async def trigger_call(request: CallRequest, background_tasks: BackgroundTasks):
 
 
 @app.get("/api/v1/jobs/{job_id}")
-async def get_job(job_id: str):
+def get_job(job_id: str):
     """
     Get job status and results
     
@@ -411,30 +542,74 @@ async def get_job(job_id: str):
     Returns:
         Job status and results
     """
-    if job_id not in jobs_db:
+    job = job_store.get(job_id)
+    queued = job_queue.get(job_id) if job_queue else None
+    
+    if queued:
+        return _merge_queue_state(job, queued)
+    
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return jobs_db[job_id]
+    return job
 
 
 @app.get("/api/v1/jobs")
-async def list_jobs(limit: int = 50):
+def list_jobs(limit: int = 50, user_id: Optional[str] = None):
     """
     List all jobs
     
     Args:
         limit: Maximum number of jobs to return
+        user_id: Optional filter by job owner
         
     Returns:
         List of jobs
     """
-    jobs = list(jobs_db.values())
+    recent = job_store.list(limit, user_id=user_id)
+    if job_queue:
+        queued = job_queue.get_many([job['id'] for job in recent])
+        recent = [_merge_queue_state(job, queued[job['id']]) if job['id'] in queued else job
+                  for job in recent]
     return {
-        'total': len(jobs),
-        'jobs': jobs[-limit:]
+        'total': job_store.count(user_id),
+        'jobs': recent
     }
 
 
+@app.post("/api/v1/jobs/{job_id}/resume")
+def resume_directory_job(job_id: str):
+    """
+    Resume an interrupted directory scrape job from its checkpoint
+    
+    Args:
+        job_id: Job ID to resume
+        
+    Returns:
+        Job ID and number of businesses already completed
+    """
+    # Decide from what is actually executing, not the stored status, which
+    # stays 'processing' if the process died mid-job
+    if job_queue is not None:
+        queued = job_queue.get(job_id)
+        running = bool(queued) and queued['status'] not in FINISHED_STATUSES
+    else:
+        running = job_executor.is_active(job_id)
+    
+    if running:
+        raise HTTPException(status_code=409, detail="Job is already running")
+    
+    try:
+        return resume_job(job_id)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No checkpoint found for job")
+    except Exception as e:
+        logger.error(f"Failed to resume job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/v1/calls")
 async def get_calls(facility_name: Optional[str] = None):
     """
@@ -468,238 +643,82 @@ async def get_call_statistics():
     return stats
 
 
-# Phone number formatting function
-def format_phone_to_e164(phone: str) -> str:
-    """Convert phone number to E.164 format (+1XXXXXXXXXX)"""
-    import re
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
-    
-    # If it starts with 1 and has 11 digits, add +
-    if len(digits) == 11 and digits.startswith('1'):
-        return f'+{digits}'
-    # If it has 10 digits, add +1
-    elif len(digits) == 10:
-        return f'+1{digits}'
-    # If it already starts with + return as is
-    elif phone.startswith('+'):
-        return phone
-    else:
-        # Return as is and let Retell reject if invalid
-        return phone
-
-
-# Retell AI call function
-async def _initiate_retell_call(business_name: str, phone_number: str) -> Dict:
-    """Initiate a call via Retell AI"""
-    retell_api_key = os.getenv('RETELL_API_KEY')
-    agent_id = os.getenv('RETELL_AGENT_ID', 'agent_05e8f725879b2997086400e39f')
-    from_number = os.getenv('RETELL_FROM_NUMBER', '+16099084403')
+def resume_job(job_id: str) -> Dict:
+    """
+    Continue a directory job from its checkpoint
     
-    headers = {
-        'Authorization': f'Bearer {retell_api_key}',
-        'Content-Type': 'application/json'
-    }
+    Reuses the directory listing captured by the original run and skips every
+    website already recorded as completed, appending to the same results file.
     
-    # Format phone number to E.164
-    formatted_phone = format_phone_to_e164(phone_number)
-    
-    call_config = {
-        'agent_id': agent_id,
-        'from_number': from_number,
-        'to_number': formatted_phone,
-        'metadata': {
-            'business_name': business_name,
-            'source': 'automated_scrape',
-            'timestamp': datetime.now().isoformat()
-        }
-    }
+    Args:
+        job_id: Job ID to resume
+        
+    Returns:
+        Job ID and resume progress
+        
+    Raises:
+        FileNotFoundError: If the job has no checkpoint
+        HTTPException: 429 if the user's job limits are reached, 503 if the job
+                       queue is full, 409 if the job is still queued
+    """
+    checkpoint = JobCheckpoint(job_id)
+    snapshot = checkpoint.load_snapshot()
+    if not snapshot:
+        raise FileNotFoundError(job_id)
     
-    response = requests.post(
-        'https://api.retellai.com/v2/create-phone-call',
-        headers=headers,
-        json=call_config
-    )
+    params = snapshot.get('params', {})
+    user_id = snapshot.get('user_id', 'demo_user')
+    already_completed = len(checkpoint.load_completed())
     
-    if response.status_code == 201:
-        return response.json()
-    else:
-        raise Exception(f"Retell API error: {response.status_code} - {response.text}")
-
-
-# Background task functions
-async def _process_scrape_job(job_id: str, url: str, business_type: Optional[str] = None):
-    """Process scrape job in background with automated calling"""
-    try:
-        # Scrape the business
-        result = scraper.scrape_business(url, business_type)
-        jobs_db[job_id]['status'] = 'completed'
-        jobs_db[job_id]['result'] = result
-        logger.info(f"Scrape job {job_id} completed")
-        
-        # Automatically initiate call if phone numbers found
-        # Try both possible formats
-        phone_numbers = result.get('contact_info', {}).get('phone_numbers', []) or result.get('phone', [])
-        if phone_numbers:
-            first_phone = phone_numbers[0]
-            business_name = result.get('business_name', 'Unknown Business')
-            
-            # Check if automatic calling is enabled
-            enable_auto_calling = os.getenv('ENABLE_AUTO_CALLING', 'false').lower() == 'true'
-            
-            if enable_auto_calling:
-                logger.info(f"Initiating automated call to {first_phone} for {business_name}")
-                
-                # Initiate call via Retell AI
-                try:
-                    call_result = await _initiate_retell_call(business_name, first_phone)
-                    jobs_db[job_id]['call_initiated'] = True
-                    jobs_db[job_id]['call_id'] = call_result.get('call_id')
-                    jobs_db[job_id]['call_phone'] = first_phone
-                    logger.info(f"Call initiated successfully: {call_result.get('call_id')}")
-                except Exception as call_error:
-                    logger.error(f"Failed to initiate call: {str(call_error)}")
-                    jobs_db[job_id]['call_initiated'] = False
-                    jobs_db[job_id]['call_error'] = str(call_error)
-            else:
-                logger.info(f"Auto-calling disabled. Phone number found: {first_phone}")
-                jobs_db[job_id]['call_initiated'] = False
-                jobs_db[job_id]['call_phone'] = first_phone
-                jobs_db[job_id]['call_error'] = 'Auto-calling disabled via ENABLE_AUTO_CALLING=false'
-        else:
-            logger.warning(f"No phone numbers found for {url}, skipping automated call")
-            jobs_db[job_id]['call_initiated'] = False
-            jobs_db[job_id]['call_error'] = 'No phone numbers found'
-            
-    except Exception as e:
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        logger.error(f"Scrape job {job_id} failed: {str(e)}")
-
-
-async def _process_bulk_scrape_job(job_id: str, urls: List[str], business_type: Optional[str] = None):
-    """Process bulk scrape job in background"""
-    try:
-        results = scraper.scrape_multiple_businesses(urls)
-        jobs_db[job_id]['status'] = 'completed'
-        jobs_db[job_id]['results'] = results
-        jobs_db[job_id]['processed'] = len(results)
-        logger.info(f"Bulk scrape job {job_id} completed")
-    except Exception as e:
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        logger.error(f"Bulk scrape job {job_id} failed: {str(e)}")
-
-
-async def _process_directory_scrape_job(job_id: str, directory_url: str, 
-                                        max_businesses: Optional[int] = None,
-                                        max_pages: int = 10):
-    """Process directory scrape job in background (legacy)"""
-    try:
-        result = integrated_pipeline.scrape_directory_and_businesses(
-            directory_url,
-            max_businesses=max_businesses,
-            max_pages=max_pages
-        )
-        jobs_db[job_id]['status'] = 'completed'
-        jobs_db[job_id]['result'] = result
-        logger.info(f"Directory scrape job {job_id} completed - found {result.get('businesses_scraped', 0)} businesses")
-    except Exception as e:
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        logger.error(f"Directory scrape job {job_id} failed: {str(e)}")
-
-
-async def _process_directory_scrape_job_safe(job_id: str, user_id: str, directory_url: str,
-                                            max_businesses: Optional[int] = None,
-                                            max_pages: int = 10,
-                                            batch_size: int = 50,
-                                            use_batch_processing: bool = True):
-    """Process directory scrape job with safety measures"""
-    import time
-    start_time = time.time()
+    # A resume starts work like a new job, so it is held to the same limits
+    active_jobs = job_queue.count_active(user_id, 'directory_scrape') if job_queue else None
+    limit_check = resource_manager.check_can_start_job(user_id, active_jobs)
+    if not limit_check['can_start']:
+        raise HTTPException(status_code=429, detail=limit_check['message'])
+    
+    if job_queue is None:
+        resource_manager.register_job(job_id, user_id)
+    
+    existing = job_store.get(job_id) or {}
+    job_store.put(job_id, {
+        **existing,
+        'id': job_id,
+        'type': 'directory_scrape',
+        'user_id': user_id,
+        'status': 'processing',
+        'created_at': existing.get('created_at', datetime.now().isoformat()),
+        'resumed_at': datetime.now().isoformat(),
+        'directory_url': params.get('directory_url'),
+        'max_businesses': params.get('max_businesses'),
+        'max_pages': params.get('max_pages', 10),
+        'batch_size': params.get('batch_size', 50),
+        'result': None,
+        'error': None
+    })
     
     try:
-        # Update job status
-        db_manager.update_job(job_id, {'status': 'processing', 'started_at': datetime.now().isoformat()})
-        jobs_db[job_id]['status'] = 'processing'
-        
-        # Check for timeout periodically
-        if resource_manager.check_job_timeout(job_id):
-            raise TimeoutError("Job exceeded 30 minute timeout")
-        
-        # Use batch processing for safety
-        if use_batch_processing:
-            logger.info(f"Using batch processing (batch_size={batch_size})")
-            result = batch_processor.process_directory_in_batches(
-                directory_url=directory_url,
-                output_file=f"/tmp/job_{job_id}_results.json",
-                max_businesses=max_businesses,
-                max_pages=max_pages
-            )
-        else:
-            logger.info("Using integrated pipeline")
-            result = integrated_pipeline.scrape_directory_and_businesses(
-                directory_url,
-                max_businesses=max_businesses,
-                max_pages=max_pages
-            )
-        
-        # Save businesses to database
-        if result.get('status') == 'success' or result.get('status') == 'completed':
-            businesses = result.get('businesses', [])
-            for business in businesses:
-                db_manager.save_business(job_id, user_id, business)
-        
-        # Calculate stats
-        duration = time.time() - start_time
-        job_stats = resource_manager.get_job_stats(job_id)
-        
-        # Update job as completed
-        db_manager.update_job(job_id, {
-            'status': 'completed',
-            'completed_at': datetime.now().isoformat(),
-            'result': result,
-            'processed_count': result.get('total_processed', 0),
-            'successful_count': result.get('successful', 0),
-            'failed_count': result.get('failed', 0),
-            'duration_seconds': duration,
-            'memory_used_mb': job_stats.get('memory_used_mb') if job_stats else None
-        })
-        
-        jobs_db[job_id]['status'] = 'completed'
-        jobs_db[job_id]['result'] = result
-        
-        logger.info(f"Directory scrape job {job_id} completed - {result.get('successful', 0)} businesses scraped in {duration:.1f}s")
-        
-    except TimeoutError as e:
-        logger.error(f"Job {job_id} timed out: {str(e)}")
-        db_manager.update_job(job_id, {'status': 'failed', 'error_message': str(e)})
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        
-    except Exception as e:
-        logger.error(f"Directory scrape job {job_id} failed: {str(e)}")
-        db_manager.update_job(job_id, {'status': 'failed', 'error_message': str(e)})
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        
-    finally:
-        # Always unregister job to free up resources
+        submit_job(job_id, 'directory_scrape', {
+            'user_id': user_id,
+            'directory_url': params.get('directory_url'),
+            'max_businesses': params.get('max_businesses'),
+            'max_pages': params.get('max_pages', 10),
+            'batch_size': params.get('batch_size', 50),
+            'use_batch_processing': True,
+            'resume': True,
+            'force_refresh': params.get('force_refresh', False)
+        }, user_id=user_id)
+    except HTTPException:
         resource_manager.unregister_job(job_id)
-
-
-async def _process_analysis_job(job_id: str, business_data: Dict):
-    """Process analysis job in background"""
-    try:
-        result = analyzer.analyze_facility(business_data)
-        jobs_db[job_id]['status'] = 'completed'
-        jobs_db[job_id]['result'] = result
-        logger.info(f"Analysis job {job_id} completed")
-    except Exception as e:
-        jobs_db[job_id]['status'] = 'failed'
-        jobs_db[job_id]['error'] = str(e)
-        logger.error(f"Analysis job {job_id} failed: {str(e)}")
+        raise
+    
+    logger.info(f"Resuming job {job_id} ({already_completed} businesses already completed)")
+    
+    return {
+        'job_id': job_id,
+        'status': 'processing',
+        'message': f"Resumed directory scraping job for {params.get('directory_url')}",
+        'already_completed': already_completed
+    }
 
 
 @app.post("/api/v1/retell/webhook")
@@ -0,0 +1,91 @@
+"""
+Page Readiness Detection for ScrapeX
+Waits until a rendered page is usable instead of sleeping for a fixed time
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configuration
+READY_QUIET_MS = int(os.getenv('SCRAPEX_READY_QUIET_MS', '500'))
+READY_MAX_MS = int(os.getenv('SCRAPEX_READY_MAX_MS', '5000'))
+
+# Elements that mean a business page has what scrapers look for
+CONTACT_SIGNALS = ['a[href^="tel:"]', 'a[href^="mailto:"]']
+
+# Listing containers holding an outbound link (directory pages)
+LISTING_SIGNALS = [
+    '[class*="member"] a[href^="http"]',
+    '[class*="listing"] a[href^="http"]',
+    '[class*="business"] a[href^="http"]',
+    '[class*="directory-item"] a[href^="http"]',
+]
+
+# Resolves when the DOM has not changed for quietMs, when any signal
+# selector matches, or after maxMs, whichever comes first
+_READINESS_SCRIPT = """
+({quietMs, maxMs, selectors}) => new Promise(resolve => {
+    const start = performance.now();
+    let lastMutation = start;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, characterData: true
+    });
+    const matched = () => selectors.length > 0 && document.querySelector(selectors.join(',')) !== null;
+    const finish = (reason) => {
+        observer.disconnect();
+        clearInterval(timer);
+        resolve({reason: reason, elapsed_ms: Math.round(performance.now() - start)});
+    };
+    const timer = setInterval(() => {
+        const now = performance.now();
+        if (matched()) return finish('signal');
+        if (now - lastMutation >= quietMs) return finish('quiet');
+        if (now - start >= maxMs) return finish('timeout');
+    }, 50);
+})
+"""
+
+
+def _readiness_args(signals: Optional[List[str]], quiet_ms: Optional[int], max_ms: Optional[int]) -> Dict:
+    return {
+        'quietMs': quiet_ms or READY_QUIET_MS,
+        'maxMs': max_ms or READY_MAX_MS,
+        'selectors': list(signals or [])
+    }
+
+
+def wait_until_ready(page, signals: Optional[List[str]] = None,
+                     quiet_ms: Optional[int] = None, max_ms: Optional[int] = None) -> Dict:
+    """
+    Wait for a (sync API) page to be ready
+
+    Args:
+        page: Playwright sync page
+        signals: CSS selectors whose presence means the content is there
+        quiet_ms: DOM quiet period that counts as settled
+        max_ms: Upper bound on the wait
+
+    Returns:
+        Dict with reason ('signal', 'quiet', 'timeout' or 'error') and elapsed_ms
+    """
+    try:
+        return page.evaluate(_READINESS_SCRIPT, _readiness_args(signals, quiet_ms, max_ms))
+    except Exception as e:
+        # e.g. a client-side redirect destroyed the execution context
+        logger.debug(f"Readiness wait interrupted: {e}")
+        return {'reason': 'error', 'elapsed_ms': None}
+
+
+async def wait_until_ready_async(page, signals: Optional[List[str]] = None,
+                                 quiet_ms: Optional[int] = None, max_ms: Optional[int] = None) -> Dict:
+    """Async API version of wait_until_ready"""
+    try:
+        return await page.evaluate(_READINESS_SCRIPT, _readiness_args(signals, quiet_ms, max_ms))
+    except Exception as e:
+        logger.debug(f"Readiness wait interrupted: {e}")
+        return {'reason': 'error', 'elapsed_ms': None}
@@ -3,7 +3,6 @@ Production Healthcare Facility Scraper
 Uses advanced techniques to bypass bot detection
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 import re
@@ -11,10 +10,12 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
+from browser_pool import browser_pool, PLAYWRIGHT_AVAILABLE, RENDER_MARGIN_SECONDS
+from page_readiness import CONTACT_SIGNALS, wait_until_ready
+from fetch_service import fetch_service
+
 try:
-    from playwright.sync_api import sync_playwright
     from playwright_stealth import stealth
-    PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
@@ -31,11 +32,7 @@ class ProductionScraper:
     """
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+        self.fetcher = fetch_service
         self.timeout = 15
 
     def scrape_facility_website(self, url: str, force_browser: bool = False) -> Dict:
@@ -69,7 +66,7 @@ class ProductionScraper:
     def _try_http_scrape(self, url: str) -> Dict:
         """HTTP scraping attempt"""
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.fetcher.get(url, scraper='production', timeout=self.timeout)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -93,70 +90,52 @@ class ProductionScraper:
 
     def _browser_scrape_with_stealth(self, url: str) -> Dict:
         """Browser scraping with stealth mode"""
+        def render(page):
+            # Apply stealth
+            stealth(page)
+            
+            # Navigate
+            logger.info(f"Navigating to {url}")
+            page.goto(url, wait_until='load', timeout=20000)
+            ready = wait_until_ready(page, CONTACT_SIGNALS)
+            logger.info(f"Page ready in {ready['elapsed_ms']}ms ({ready['reason']})")
+            
+            # Get text content
+            try:
+                page_text = page.inner_text('body')
+            except:
+                page_text = page.content()
+            
+            # Get HTML
+            return page.content(), page_text
+        
         try:
-            with sync_playwright() as p:
-                # Launch with stealth args
-                browser = p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-dev-shm-usage',
-                        '--disable-web-security',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-zygote',
-                        '--disable-gpu'
-                    ]
-                )
-                
-                context = browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                )
-                
-                page = context.new_page()
-                
-                # Apply stealth
-                stealth(page)
-                
-                # Navigate
-                logger.info(f"Navigating to {url}")
-                page.goto(url, wait_until='load', timeout=20000)
-                page.wait_for_timeout(3000)
-                
-                # Get text content
-                try:
-                    page_text = page.inner_text('body')
-                except:
-                    page_text = page.content()
-                
-                # Get HTML
-                content = page.content()
-                
-                browser.close()
-                
-                # Parse
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                # Extract data
-                result = {
-                    'url': url,
-                    'scraped_at': datetime.now().isoformat(),
-                    'scraping_method': 'browser_stealth',
-                    'facility_name': self._extract_facility_name(soup),
-                    'phone': self._extract_phone_from_text(page_text),
-                    'email': self._extract_email(soup),
-                    'address': self._extract_address(soup),
-                    'hours': self._extract_hours(soup),
-                    'services': self._extract_services(soup),
-                    'status': 'success'
-                }
-                
-                logger.info(f"Browser scrape complete: {len(result['phone'])} phones found")
-                return result
-                
+            # Warm pooled browser (launched with the stealth args)
+            content, page_text = browser_pool.run(render, context_options={
+                'viewport': {'width': 1920, 'height': 1080},
+                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            }, init_script=None, timeout=20 + RENDER_MARGIN_SECONDS)
+            
+            # Parse
+            soup = BeautifulSoup(content, 'html.parser')
+            
+            # Extract data
+            result = {
+                'url': url,
+                'scraped_at': datetime.now().isoformat(),
+                'scraping_method': 'browser_stealth',
+                'facility_name': self._extract_facility_name(soup),
+                'phone': self._extract_phone_from_text(page_text),
+                'email': self._extract_email(soup),
+                'address': self._extract_address(soup),
+                'hours': self._extract_hours(soup),
+                'services': self._extract_services(soup),
+                'status': 'success'
+            }
+            
+            logger.info(f"Browser scrape complete: {len(result['phone'])} phones found")
+            return result
+            
         except Exception as e:
             logger.error(f"Browser scrape failed: {e}")
             return {
@@ -0,0 +1,151 @@
+"""
+Progress Writer for ScrapeX
+Write-behind, coalesced job progress updates to the scraping_jobs table
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional
+
+from supabase_manager import db_manager
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class _JobProgress:
+    """Pending progress for one job"""
+
+    def __init__(self):
+        self.pending: Dict = {}
+        self.items = 0
+        self.last_flush = 0.0  # first progress goes out on the next round
+
+
+class ProgressWriter:
+    """
+    Coalescing write-behind writer for job progress
+
+    Features:
+    - report() only merges fields in memory; scraping threads never wait on the database
+    - Each job's updates are coalesced and written at most every N seconds or M reports
+    - One background thread writes for all jobs
+    - close() flushes a job's last progress before its final status is written
+      (or drops it for a cancelled job)
+    """
+
+    # Configuration
+    FLUSH_INTERVAL_SECONDS = float(os.getenv('SCRAPEX_PROGRESS_FLUSH_SECONDS', '5'))
+    FLUSH_EVERY_ITEMS = int(os.getenv('SCRAPEX_PROGRESS_FLUSH_ITEMS', '25'))
+
+    def __init__(self, write_fn: Optional[Callable[[str, Dict], Dict]] = None,
+                 flush_interval: Optional[float] = None, flush_every: Optional[int] = None):
+        """
+        Initialize progress writer
+
+        Args:
+            write_fn: Function persisting (job_id, updates); defaults to db_manager.update_job
+            flush_interval: Maximum seconds between writes for a job with pending progress
+            flush_every: Number of reports that triggers an early write
+        """
+        self.write_fn = write_fn
+        self.flush_interval = flush_interval or self.FLUSH_INTERVAL_SECONDS
+        self.flush_every = flush_every or self.FLUSH_EVERY_ITEMS
+        self._jobs: Dict[str, _JobProgress] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._reports = 0
+        self._writes = 0
+
+    def report(self, job_id: str, updates: Dict):
+        """
+        Record progress for a job (returns immediately)
+
+        Args:
+            job_id: Job identifier
+            updates: scraping_jobs fields, e.g. processed_count, progress_percentage
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _JobProgress()
+            job.pending.update(updates)
+            job.items += 1
+            self._reports += 1
+            due = job.items >= self.flush_every
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='progress-writer', daemon=True)
+                self._thread.start()
+
+        if due:
+            self._wakeup.set()
+
+    def close(self, job_id: str, discard: bool = False):
+        """
+        Write a job's pending progress now and stop tracking it
+
+        Args:
+            job_id: Job identifier
+            discard: Drop pending progress instead of writing it (the job was
+                     cancelled and another worker may own its record)
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+
+        # Taking the write lock also waits out a background round in flight,
+        # so no stale progress can land after the caller's final update
+        with self._write_lock:
+            if job and job.pending and not discard:
+                self._write(job_id, job.pending)
+
+    def stats(self) -> Dict:
+        """Get writer counters"""
+        with self._lock:
+            return {
+                'tracked_jobs': len(self._jobs),
+                'reports': self._reports,
+                'writes': self._writes
+            }
+
+    def _run(self):
+        """Background loop writing due progress"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+
+            # Collect under the write lock so close() either sees a job's
+            # pending progress or waits until this round has written it
+            with self._write_lock:
+                now = time.time()
+                due = []
+                with self._lock:
+                    for job_id, job in self._jobs.items():
+                        if job.pending and (job.items >= self.flush_every
+                                            or now - job.last_flush >= self.flush_interval):
+                            due.append((job_id, job.pending))
+                            job.pending = {}
+                            job.items = 0
+                            job.last_flush = now
+
+                for job_id, updates in due:
+                    self._write(job_id, updates)
+
+    def _write(self, job_id: str, updates: Dict):
+        """Persist coalesced progress for a job (write lock held)"""
+        write_fn = self.write_fn or db_manager.update_job
+
+        try:
+            write_fn(job_id, dict(updates))
+            with self._lock:
+                self._writes += 1
+        except Exception as e:
+            logger.error(f"Failed to write progress for job {job_id}: {e}")
+
+
+# Global instance
+progress_writer = ProgressWriter()
@@ -0,0 +1,296 @@
+"""
+Async Rendering Service for ScrapeX
+Drives many concurrent pages in one Chromium using playwright.async_api
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+import logging
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+    logging.warning("Playwright not available")
+
+from browser_pool import LAUNCH_ARGS, STEALTH_INIT_SCRIPT
+from page_readiness import wait_until_ready_async
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Resource types scrapers never read (only DOM text and links are used).
+# Stylesheets are kept: they decide which text is visible to inner_text.
+BLOCKED_RESOURCE_TYPES = tuple(
+    t.strip() for t in os.getenv('SCRAPEX_RENDER_BLOCK_TYPES', 'image,media,font').split(',') if t.strip()
+)
+
+# Analytics, ad and session-recording hosts (subdomains included)
+BLOCKED_DOMAINS = (
+    'google-analytics.com', 'googletagmanager.com', 'googleadservices.com', 'doubleclick.net',
+    'googlesyndication.com', 'connect.facebook.net', 'facebook.net', 'hotjar.com',
+    'clarity.ms', 'segment.io', 'segment.com', 'mixpanel.com', 'fullstory.com',
+    'nr-data.net', 'newrelic.com', 'quantserve.com', 'scorecardresearch.com',
+    'adnxs.com', 'criteo.com', 'taboola.com', 'outbrain.com', 'bat.bing.com'
+)
+
+# Typical transfer size per blocked request, used to estimate bytes saved
+# (a blocked request is never downloaded, so its real size is unknown)
+TYPICAL_RESOURCE_BYTES = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 35_000,
+    'script': 45_000,
+    'stylesheet': 20_000,
+}
+DEFAULT_RESOURCE_BYTES = 10_000
+
+
+class RenderService:
+    """
+    Shared browser rendering for scrapers escalating from plain HTTP
+
+    Features:
+    - One Chromium driven by the async Playwright API on a dedicated event loop
+    - Many pages render concurrently in that browser, up to a configurable cap
+    - Each render gets its own browser context, closed afterwards
+    - Returns as soon as the page is ready (DOM settled or target elements
+      present) instead of sleeping for a fixed time
+    - Images, media, fonts and tracker requests are blocked by default, with
+      counters for blocked requests and estimated bytes saved
+    - Callable from async code (render) and from worker threads (render_sync)
+    """
+
+    # Configuration
+    MAX_CONCURRENT_PAGES = int(os.getenv('SCRAPEX_RENDER_MAX_PAGES', '8'))
+    HEADLESS = os.getenv('SCRAPEX_BROWSER_HEADLESS', 'true').lower() == 'true'
+
+    def __init__(self, max_concurrent_pages: Optional[int] = None, headless: Optional[bool] = None):
+        """
+        Initialize rendering service (the browser starts on first render)
+
+        Args:
+            max_concurrent_pages: Pages allowed to render at the same time
+            headless: Run Chromium without a window
+        """
+        self.max_concurrent_pages = max_concurrent_pages or self.MAX_CONCURRENT_PAGES
+        self.headless = self.HEADLESS if headless is None else headless
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._slots = None
+        self._stats = {'rendered': 0, 'failed': 0, 'in_flight': 0, 'peak_in_flight': 0, 'launches': 0,
+                       'blocked_requests': 0, 'estimated_bytes_saved': 0,
+                       'ready_waits': 0, 'ready_wait_ms_total': 0}
+        self._blocked_by_type: Dict[str, int] = {}
+
+    async def render(self, url: str, **options) -> Dict:
+        """
+        Render a page from async code
+
+        Args:
+            url: Page URL
+            **options: See _render
+
+        Returns:
+            Dict with html, text, final_url and elapsed_seconds
+        """
+        future = asyncio.run_coroutine_threadsafe(self._render(url, **options), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def render_sync(self, url: str, timeout: Optional[float] = None, **options) -> Dict:
+        """
+        Render a page from a worker thread (blocks until done)
+
+        Args:
+            url: Page URL
+            timeout: Seconds to wait for a page slot and the render
+            **options: See _render
+
+        Returns:
+            Dict with html, text, final_url and elapsed_seconds
+        """
+        future = asyncio.run_coroutine_threadsafe(self._render(url, **options), self._ensure_loop())
+        return future.result(timeout=timeout)
+
+    def stats(self) -> Dict:
+        """Get render counters"""
+        waits = self._stats['ready_waits']
+        return {
+            'max_concurrent_pages': self.max_concurrent_pages,
+            **self._stats,
+            'avg_ready_wait_ms': self._stats['ready_wait_ms_total'] / waits if waits else 0,
+            'blocked_by_type': dict(self._blocked_by_type)
+        }
+
+    def close(self):
+        """Close the browser and stop the service loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Failed to close render service cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the service event loop thread on first use"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not available")
+
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name='render-service', daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _get_browser(self):
+        """Launch Chromium on first use (or after it crashed)"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_concurrent_pages)
+
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+                self._stats['launches'] += 1
+                logger.info("Render service launched Chromium")
+            return self._browser
+
+    async def _render(self, url: str, wait_until: str = 'load', timeout_ms: int = 20000,
+                      ready_signals: Optional[List[str]] = None, ready_max_ms: Optional[int] = None,
+                      scroll: bool = False, context_options: Optional[Dict] = None,
+                      init_script: Optional[str] = STEALTH_INIT_SCRIPT,
+                      block_types: Optional[Iterable[str]] = BLOCKED_RESOURCE_TYPES,
+                      block_domains: Optional[Iterable[str]] = BLOCKED_DOMAINS) -> Dict:
+        """
+        Render a page on the service loop
+
+        Args:
+            url: Page URL
+            wait_until: Navigation event to wait for (load, domcontentloaded, networkidle)
+            timeout_ms: Navigation timeout
+            ready_signals: CSS selectors that mean the content is there
+            ready_max_ms: Upper bound on each readiness wait
+            scroll: Scroll to the bottom to trigger lazy-loaded content
+            context_options: Options for browser.new_context
+            init_script: Script added before navigation (stealth by default)
+            block_types: Playwright resource types to abort (None/empty: block none)
+            block_domains: Hosts whose requests are aborted, subdomains included
+        """
+        browser = await self._get_browser()
+
+        async with self._slots:
+            self._stats['in_flight'] += 1
+            self._stats['peak_in_flight'] = max(self._stats['peak_in_flight'], self._stats['in_flight'])
+            start_time = time.time()
+            blocked = {'requests': 0, 'bytes': 0}
+            context = None
+            try:
+                context = await browser.new_context(**(context_options or {}))
+                if block_types or block_domains:
+                    await context.route('**/*', self._blocking_handler(
+                        set(block_types or ()), tuple(block_domains or ()), blocked
+                    ))
+                page = await context.new_page()
+                if init_script:
+                    await page.add_init_script(init_script)
+
+                await page.goto(url, wait_until=wait_until, timeout=timeout_ms)
+                readiness = [await self._wait_ready(page, 'load', ready_signals, ready_max_ms)]
+                if scroll:
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    # Lazy-loaded content is what we are waiting for now, so
+                    # only a settled DOM counts
+                    readiness.append(await self._wait_ready(page, 'scroll', None, ready_max_ms))
+
+                html = await page.content()
+                try:
+                    text = await page.inner_text('body')
+                except Exception:
+                    text = ''
+
+                self._stats['rendered'] += 1
+                return {
+                    'html': html,
+                    'text': text,
+                    'final_url': page.url,
+                    'elapsed_seconds': time.time() - start_time,
+                    'blocked_requests': blocked['requests'],
+                    'estimated_bytes_saved': blocked['bytes'],
+                    'readiness': readiness
+                }
+            except Exception:
+                self._stats['failed'] += 1
+                raise
+            finally:
+                self._stats['in_flight'] -= 1
+                if context is not None:
+                    await context.close()
+
+    async def _wait_ready(self, page, stage: str, signals: Optional[List[str]],
+                          max_ms: Optional[int]) -> Dict:
+        """Wait for readiness and record how long it took"""
+        result = await wait_until_ready_async(page, signals, max_ms=max_ms)
+        if result.get('elapsed_ms') is not None:
+            self._stats['ready_waits'] += 1
+            self._stats['ready_wait_ms_total'] += result['elapsed_ms']
+        logger.debug(f"Page ready after {stage}: {result}")
+        return {'stage': stage, **result}
+
+    def _blocking_handler(self, block_types: set, block_domains: tuple, blocked: Dict):
+        """Build a route handler aborting blocked requests and counting them"""
+        async def handle(route):
+            request = route.request
+            resource_type = request.resource_type
+
+            if resource_type not in block_types and not self._is_blocked_host(request.url, block_domains):
+                await route.continue_()
+                return
+
+            await route.abort()
+            saved = TYPICAL_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES)
+            blocked['requests'] += 1
+            blocked['bytes'] += saved
+            self._stats['blocked_requests'] += 1
+            self._stats['estimated_bytes_saved'] += saved
+            self._blocked_by_type[resource_type] = self._blocked_by_type.get(resource_type, 0) + 1
+
+        return handle
+
+    def _is_blocked_host(self, url: str, block_domains: tuple) -> bool:
+        """Check a request URL against the blocked domain list"""
+        if not block_domains:
+            return False
+
+        host = urlparse(url).hostname or ''
+        return any(host == domain or host.endswith('.' + domain) for domain in block_domains)
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+# Global instance
+render_service = RenderService()
+atexit.register(render_service.close)
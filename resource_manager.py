@@ -41,12 +41,14 @@ class ResourceManager:
         self.user_job_counts = {}  # user_id -> count
         self.last_cleanup = time.time()
 
-    def check_can_start_job(self, user_id: str) -> Dict:
+    def check_can_start_job(self, user_id: str, active_jobs: Optional[int] = None) -> Dict:
         """
         Check if user can start a new job
         
         Args:
             user_id: User identifier
+            active_jobs: User's active job count when jobs are tracked outside
+                         this process (e.g. by the durable job queue)
             
         Returns:
             Dict with can_start and message
@@ -55,7 +57,7 @@ class ResourceManager:
         self._cleanup_old_jobs()
         
         # Check user's concurrent job limit
-        user_jobs = self.user_job_counts.get(user_id, 0)
+        user_jobs = self.user_job_counts.get(user_id, 0) if active_jobs is None else active_jobs
         
         if user_jobs >= self.MAX_CONCURRENT_JOBS_PER_USER:
             return {
@@ -0,0 +1,155 @@
+"""
+Result Spool for ScrapeX Batch Jobs
+Append-only JSONL storage so large jobs persist results in constant memory
+"""
+
+import json
+import os
+import logging
+from typing import Dict, Iterator, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ResultSpool:
+    """
+    Append-only result file for batch jobs
+
+    Layout:
+    - <path>: one JSON business record per line, appended and fsync'd per batch
+    - <path>.summary.json: small sidecar with job metadata and the final summary
+
+    Writes never re-read earlier records, so persisting batch N costs the same
+    as persisting batch 1 regardless of how many businesses came before it.
+    """
+
+    SUMMARY_SUFFIX = '.summary.json'
+
+    def __init__(self, path: str):
+        """
+        Initialize spool
+
+        Args:
+            path: Path of the JSONL results file
+        """
+        self.path = path
+        self.summary_path = path + self.SUMMARY_SUFFIX
+
+    def start(self, metadata: Dict, resume: bool = False):
+        """
+        Prepare the results file and write the metadata sidecar
+
+        Args:
+            metadata: Job metadata (directory URL, totals, batch size, ...)
+            resume: Keep records already in the file instead of truncating it
+                    (a torn last line left by a crash is dropped)
+        """
+        if resume and os.path.exists(self.path):
+            self._trim_torn_tail()
+            previous = self.read_summary() or {}
+            metadata = {**metadata, 'started_at': previous.get('started_at', metadata.get('started_at')),
+                        'resumed_at': metadata.get('started_at')}
+        else:
+            with open(self.path, 'w'):
+                pass
+        self._write_sidecar({**metadata, 'status': 'running'})
+
+    def append(self, records: List[Dict]) -> int:
+        """
+        Append records to the results file and fsync
+
+        Args:
+            records: Business records to persist
+
+        Returns:
+            Number of records written
+        """
+        if not records:
+            return 0
+
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+        return len(records)
+
+    def write_summary(self, summary: Dict):
+        """
+        Record the final summary in the sidecar
+
+        Args:
+            summary: Job summary returned by the batch processor
+        """
+        sidecar = self.read_summary() or {}
+        sidecar['status'] = summary.get('status', sidecar.get('status'))
+        sidecar['summary'] = summary
+        self._write_sidecar(sidecar)
+
+    def read_summary(self) -> Optional[Dict]:
+        """Read the sidecar, or None if it does not exist"""
+        try:
+            with open(self.summary_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read spool summary {self.summary_path}: {e}")
+            return None
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter_results(self.path)
+
+    def _trim_torn_tail(self):
+        """Cut a partially written last line (a crash mid-append) so new records start on a fresh line"""
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 64 * 1024)
+                f.seek(start)
+                chunk = f.read(position - start)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                logger.warning(f"Dropping {end - position} bytes of a torn record at the end of {self.path}")
+                f.truncate(position)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_sidecar(self, data: Dict):
+        """Atomically replace the sidecar file"""
+        tmp_path = self.summary_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.summary_path)
+
+
+def iter_results(path: str) -> Iterator[Dict]:
+    """
+    Lazily stream records back from a JSONL results file
+
+    A partially written last line (e.g. after a crash mid-append) is skipped.
+
+    Args:
+        path: Path of the JSONL results file
+
+    Yields:
+        One business record at a time
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable record at {path}:{line_num}")
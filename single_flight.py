@@ -0,0 +1,111 @@
+"""
+Single-Flight Request Coalescing for ScrapeX
+Concurrent calls for the same key share one execution and its result
+"""
+
+import asyncio
+import copy
+import threading
+import logging
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Duplicate call suppression
+
+    Features:
+    - The first caller for a key runs the work; callers arriving while it is
+      in flight wait for it instead of starting their own
+    - Every waiter receives its own copy of the result (or the same exception)
+    - Nothing is cached: once the call finishes the next caller runs it again
+    - Works for threads (do) and for coroutines on one event loop (do_async)
+    """
+
+    def __init__(self, name: str = 'single-flight'):
+        """
+        Initialize coalescer
+
+        Args:
+            name: Name used in log messages
+        """
+        self.name = name
+        self._calls: Dict[str, Future] = {}
+        self._tasks = weakref.WeakKeyDictionary()  # event loop -> {key: task}
+        self._lock = threading.Lock()
+        self._stats = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn once per key across concurrent threads
+
+        Args:
+            key: Identity of the work (e.g. canonical URL)
+            fn: Function to run
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            fn's result (waiters get a deep copy)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._stats['executed'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            logger.info(f"{self.name}: joining in-flight call for {key}")
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await fn once per key across concurrent coroutines on the running loop
+
+        Args:
+            key: Identity of the work (e.g. canonical URL)
+            fn: Coroutine function to run
+            *args, **kwargs: Passed to fn
+
+        Returns:
+            fn's result (waiters get a deep copy)
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+
+        task = tasks.get(key)
+        if task is not None:
+            with self._lock:
+                self._stats['coalesced'] += 1
+            logger.info(f"{self.name}: joining in-flight call for {key}")
+            # Shielded so a cancelled waiter does not cancel the shared call
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = tasks[key] = loop.create_task(fn(*args, **kwargs))
+        task.add_done_callback(lambda _: tasks.pop(key, None))
+        with self._lock:
+            self._stats['executed'] += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        """Get coalescing counters"""
+        with self._lock:
+            return {'in_flight': len(self._calls), **self._stats}
@@ -4,6 +4,7 @@ Handles job storage, results, and user usage tracking
 """
 
 import os
+import time
 import logging
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -19,6 +20,14 @@ class SupabaseManager:
     Stores jobs, results, and tracks user usage
     """
 
+    # Bulk insert configuration
+    BULK_CHUNK_SIZE = int(os.getenv('SCRAPEX_DB_BULK_CHUNK_SIZE', '200'))
+    BULK_MAX_RETRIES = int(os.getenv('SCRAPEX_DB_BULK_MAX_RETRIES', '3'))
+    # Natural key of scraped_businesses rows (unique index in supabase_schema.sql)
+    BUSINESS_CONFLICT_KEY = 'job_id,website'
+    # Rows per read request (PostgREST returns at most max-rows, 1000 by default)
+    READ_PAGE_SIZE = int(os.getenv('SCRAPEX_DB_READ_PAGE_SIZE', '1000'))
+
     def __init__(self):
         """Initialize Supabase client"""
         supabase_url = os.getenv('SUPABASE_URL')
@@ -134,32 +143,120 @@ class SupabaseManager:
             return {'status': 'error', 'message': 'Database not available'}
         
         try:
-            record = {
-                'job_id': job_id,
-                'user_id': user_id,
-                'business_name': business_data.get('business_name'),
-                'business_type': business_data.get('business_type'),
-                'website': business_data.get('url') or business_data.get('website'),
-                'phone': business_data.get('phone', []),
-                'email': business_data.get('email', []),
-                'address': business_data.get('address'),
-                'description': business_data.get('description'),
-                'owner_names': business_data.get('owner_info', {}).get('names', []),
-                'owner_emails': business_data.get('owner_info', {}).get('emails', []),
-                'owner_linkedin': business_data.get('owner_info', {}).get('linkedin', []),
-                'services': business_data.get('services', []),
-                'social_media': business_data.get('social_media', {}),
-                'source_directory': business_data.get('directory_listing', {}).get('website'),
-                'raw_data': business_data
-            }
+            record = self._business_record(job_id, user_id, business_data)
             
-            result = self.client.table('scraped_businesses').insert(record).execute()
+            result = self.client.table('scraped_businesses')\
+                .upsert(record, on_conflict=self.BUSINESS_CONFLICT_KEY)\
+                .execute()
             return result.data[0] if result.data else record
             
         except Exception as e:
             logger.error(f"Failed to save business: {e}")
             return {'status': 'error', 'message': str(e)}
 
+    def save_businesses_bulk(self, job_id: str, user_id: str, businesses: List[Dict],
+                             chunk_size: Optional[int] = None) -> Dict:
+        """
+        Save many scraped businesses with multi-row upserts
+        
+        Each chunk is one request to Supabase and is retried with backoff on
+        failure; chunks that still fail are reported instead of aborting the
+        rest of the save. Rows are upserted on (job_id, website), so retrying
+        a chunk whose first attempt committed before timing out does not
+        duplicate it.
+        
+        Args:
+            job_id: Associated job ID
+            user_id: User who owns this data
+            businesses: List of business information dicts
+            chunk_size: Rows per insert request
+            
+        Returns:
+            Dict with status ('success', 'partial' or 'error'), saved and
+            failed counts, and the failed chunks
+        """
+        if not self.client:
+            return {'status': 'error', 'message': 'Database not available', 'saved': 0, 'failed': len(businesses)}
+        
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        saved = 0
+        failed_chunks = []
+        
+        for start in range(0, len(businesses), chunk_size):
+            chunk = businesses[start:start + chunk_size]
+            try:
+                records = self._unique_records(
+                    [self._business_record(job_id, user_id, business) for business in chunk]
+                )
+            except Exception as e:
+                # Malformed data fails the same way on every attempt, so don't retry
+                logger.error(f"Failed to build rows for businesses {start}-{start + len(chunk) - 1} "
+                             f"for job {job_id}: {e}")
+                failed_chunks.append({'start': start, 'count': len(chunk), 'error': str(e)})
+                continue
+            
+            for attempt in range(1, self.BULK_MAX_RETRIES + 1):
+                try:
+                    self.client.table('scraped_businesses')\
+                        .upsert(records, on_conflict=self.BUSINESS_CONFLICT_KEY)\
+                        .execute()
+                    saved += len(chunk)
+                    break
+                except Exception as e:
+                    if attempt == self.BULK_MAX_RETRIES:
+                        logger.error(f"Failed to save businesses {start}-{start + len(chunk) - 1} "
+                                     f"for job {job_id} after {attempt} attempts: {e}")
+                        failed_chunks.append({'start': start, 'count': len(chunk), 'error': str(e)})
+                    else:
+                        logger.warning(f"Bulk insert for job {job_id} failed (attempt {attempt}), retrying: {e}")
+                        time.sleep(2 ** (attempt - 1))
+        
+        failed = sum(chunk['count'] for chunk in failed_chunks)
+        if not failed_chunks:
+            status = 'success'
+        elif saved:
+            status = 'partial'
+        else:
+            status = 'error'
+        
+        logger.info(f"Saved {saved}/{len(businesses)} businesses for job {job_id}")
+        
+        return {
+            'status': status,
+            'saved': saved,
+            'failed': failed,
+            'failed_chunks': failed_chunks
+        }
+
+    def _unique_records(self, records: List[Dict]) -> List[Dict]:
+        """Keep the last row per website (one upsert cannot touch the same key twice)"""
+        by_website = {}
+        for index, record in enumerate(records):
+            by_website[record['website'] or index] = record
+        return list(by_website.values())
+
+    def _business_record(self, job_id: str, user_id: str, business_data: Dict) -> Dict:
+        """Build a scraped_businesses row from scraped business data"""
+        owner_info = business_data.get('owner_info') or {}
+        return {
+            'job_id': job_id,
+            'user_id': user_id,
+            'business_name': business_data.get('business_name'),
+            'business_type': business_data.get('business_type'),
+            'website': business_data.get('url') or business_data.get('website'),
+            'phone': business_data.get('phone', []),
+            'email': business_data.get('email', []),
+            'address': business_data.get('address'),
+            'description': business_data.get('description'),
+            'owner_names': owner_info.get('names', []),
+            'owner_emails': owner_info.get('emails', []),
+            'owner_linkedin': owner_info.get('linkedin', []),
+            'services': business_data.get('services', []),
+            'social_media': business_data.get('social_media', {}),
+            'source_directory': (business_data.get('directory_listing') or {}).get('website'),
+            'raw_data': business_data
+        }
+
     def get_job_businesses(self, job_id: str) -> List[Dict]:
         """Get all businesses for a job"""
         if not self.client:
@@ -176,6 +273,25 @@ class SupabaseManager:
             logger.error(f"Failed to get job businesses: {e}")
             return []
 
+    def get_job_business_websites(self, job_id: str) -> List[str]:
+        """Get the websites of the businesses already saved for a job (read a page at a time)"""
+        if not self.client:
+            return []
+        
+        websites = []
+        start = 0
+        while True:
+            result = self.client.table('scraped_businesses')\
+                .select('website')\
+                .eq('job_id', job_id)\
+                .order('website')\
+                .range(start, start + self.READ_PAGE_SIZE - 1)\
+                .execute()
+            websites.extend(row['website'] for row in result.data if row.get('website'))
+            if len(result.data) < self.READ_PAGE_SIZE:
+                return websites
+            start += self.READ_PAGE_SIZE
+
     def check_user_limits(self, user_id: str) -> Dict:
         """
         Check if user has exceeded usage limits
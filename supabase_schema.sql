@@ -78,6 +78,9 @@ CREATE TABLE IF NOT EXISTS scraped_businesses (
 CREATE INDEX IF NOT EXISTS idx_scraped_businesses_job_id ON scraped_businesses(job_id);
 CREATE INDEX IF NOT EXISTS idx_scraped_businesses_user_id ON scraped_businesses(user_id);
 CREATE INDEX IF NOT EXISTS idx_scraped_businesses_website ON scraped_businesses(website);
+-- One row per website per job: bulk saves upsert on this key, so a retried
+-- insert is idempotent (remove existing duplicates before creating it)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_scraped_businesses_job_website ON scraped_businesses(job_id, website);
 
 -- User usage tracking: prevents abuse
 CREATE TABLE IF NOT EXISTS user_usage (
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+End-to-end test of a directory job: real scraper -> BatchProcessor -> BusinessSink
+(directory listing and pages are faked, so no network or database is needed)
+"""
+
+import batch_processor
+import business_sink
+from batch_processor import BatchProcessor
+from business_cache import BusinessResultCache
+from business_sink import BusinessSink
+from result_spool import iter_results
+from universal_scraper import UniversalBusinessScraper
+
+
+class FakeDirectoryScraper:
+    def __init__(self, businesses):
+        self.businesses = businesses
+
+    def scrape_multiple_pages(self, directory_url, max_pages=10):
+        return {'status': 'success', 'businesses': self.businesses}
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.rows = []
+
+    def save_businesses_bulk(self, job_id, user_id, businesses, chunk_size=None):
+        self.rows.extend(businesses)
+        return {'status': 'success', 'saved': len(businesses), 'failed': 0}
+
+
+def test_directory_job_saves_scraped_businesses(tmp_path, monkeypatch, fake_fetcher):
+    database = FakeDatabase()
+    monkeypatch.setattr(business_sink, 'db_manager', database)
+    monkeypatch.setattr(batch_processor.dns_cache, 'prefetch', lambda urls, timeout=None: {})
+    monkeypatch.setattr(batch_processor, 'business_cache', BusinessResultCache(db_path=str(tmp_path / 'results.db')))
+
+    listings = [{'business_name': f'Business {i}', 'website': f'https://business{i}.example/'}
+                for i in range(5)]
+    listings.append({'business_name': 'Down', 'website': 'https://down.example/'})
+
+    processor = BatchProcessor(batch_size=2, max_workers=3)
+    processor.directory_scraper = FakeDirectoryScraper(listings)
+    processor.business_scraper = UniversalBusinessScraper(
+        fetcher=fake_fetcher({'https://down.example/': 500}), speculative_contact=False
+    )
+
+    sink = BusinessSink('job-1', 'user-1', flush_interval=0.1)
+    output_file = str(tmp_path / 'job-1.jsonl')
+    summary = processor.process_directory_in_batches(
+        'https://chamber.example/directory', output_file,
+        result_callback=sink.put
+    )
+    saved = sink.close()
+
+    assert summary['successful'] == 5
+    assert summary['failed'] == 1
+    assert saved['saved'] == 5
+    assert sorted(row['website'] for row in database.rows) == sorted(l['website'] for l in listings[:5])
+    assert len(list(iter_results(output_file))) == 5
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test the business result cache with real UniversalBusinessScraper results
+(pages are served by a fake fetcher, so no network is needed)
+"""
+
+from business_cache import BusinessResultCache
+from universal_scraper import UniversalBusinessScraper
+
+
+def make_scraper(fetcher):
+    return UniversalBusinessScraper(fetcher=fetcher, speculative_contact=False)
+
+
+def test_scrape_result_reports_status(fake_fetcher):
+    fetcher = fake_fetcher({'https://down.example/': 500})
+    scraper = make_scraper(fetcher)
+
+    assert scraper.scrape_business('https://joes.example/')['status'] == 'success'
+    failed = scraper.scrape_business('https://down.example/')
+    assert failed['status'] == 'error'
+    assert failed['error']
+
+
+def test_successful_scrapes_are_cached(tmp_path, fake_fetcher):
+    cache = BusinessResultCache(db_path=str(tmp_path / 'results.db'))
+    fetcher = fake_fetcher()
+    scraper = make_scraper(fetcher)
+    urls = [f'https://business{i}.example/' for i in range(5)]
+
+    for url in urls:
+        result = cache.get_or_scrape(url, scraper.scrape_business)
+        assert result['status'] == 'success'
+    assert cache.stats()['stored'] == 5
+
+    # A second pass is served entirely from the cache
+    fetcher.requests.clear()
+    for url in urls:
+        result = cache.get_or_scrape(url, scraper.scrape_business)
+        assert result['from_cache']
+        assert result['phone']
+    assert fetcher.requests == []
+
+
+def test_failed_scrapes_are_not_cached(tmp_path, fake_fetcher):
+    cache = BusinessResultCache(db_path=str(tmp_path / 'results.db'))
+    scraper = make_scraper(fake_fetcher({'https://down.example/': 500}))
+
+    cache.get_or_scrape('https://down.example/', scraper.scrape_business)
+
+    assert cache.get('https://down.example/') is None
+    assert cache.stats()['stored'] == 0
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the write-behind business sink against a fake database
+"""
+
+import business_sink
+from business_sink import BusinessSink
+
+
+class FlakyDatabase:
+    """Raises on the first save, then stores rows"""
+
+    def __init__(self, saved_websites=()):
+        self.rows = []
+        self.calls = 0
+        self.saved_websites = list(saved_websites)
+
+    def save_businesses_bulk(self, job_id, user_id, businesses, chunk_size=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise ValueError('Object of type datetime is not JSON serializable')
+        self.rows.extend(businesses)
+        return {'status': 'success', 'saved': len(businesses), 'failed': 0}
+
+    def get_job_business_websites(self, job_id):
+        return self.saved_websites
+
+
+def test_failed_save_does_not_stop_writer(monkeypatch):
+    database = FlakyDatabase()
+    monkeypatch.setattr(business_sink, 'db_manager', database)
+    sink = BusinessSink('job-1', 'user-1', max_queued=2, flush_size=1, flush_interval=0.1)
+
+    for i in range(5):
+        sink.put({'website': f'https://business{i}.example/'})
+    stats = sink.close()
+
+    assert stats == {'received': 5, 'saved': 4, 'failed': 1, 'skipped': 0}
+
+
+def test_resumed_job_skips_businesses_already_saved(monkeypatch):
+    database = FlakyDatabase(saved_websites=['https://business0.example/'])
+    database.calls = 1
+    monkeypatch.setattr(business_sink, 'db_manager', database)
+    sink = BusinessSink('job-1', 'user-1', flush_interval=0.1, resume=True)
+
+    for i in range(3):
+        sink.put({'website': f'https://business{i}.example/'})
+    sink.put({'website': 'https://business1.example/'})
+    stats = sink.close()
+
+    assert stats['saved'] == 2
+    assert stats['skipped'] == 2
+    assert [row['website'] for row in database.rows] == ['https://business1.example/', 'https://business2.example/']
+
+
+class PagedTable:
+    """Fake Supabase table query that, like PostgREST, returns at most max_rows per request"""
+
+    def __init__(self, rows, max_rows):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.requests = 0
+        self._range = (0, len(rows) - 1)
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def execute(self):
+        self.requests += 1
+        start, end = self._range
+        return type('Result', (), {'data': self.rows[start:min(end + 1, start + self.max_rows)]})
+
+
+def test_saved_websites_are_read_page_by_page():
+    from supabase_manager import SupabaseManager
+
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.client = PagedTable([{'website': f'https://b{i}.example/'} for i in range(2500)], max_rows=1000)
+
+    websites = manager.get_job_business_websites('job-1')
+
+    assert len(websites) == 2500
+    assert manager.client.requests == 3
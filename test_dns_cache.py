@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the DNS cache with stub resolvers (no real lookups)
+"""
+
+import socket
+
+import dns.exception
+import dns.resolver
+
+from dns_cache import DNSCache, DnspythonResolver
+
+
+class StubResolver:
+    """Returns fixed answers and counts lookups"""
+
+    def __init__(self, answers, ttl=None):
+        self.answers = answers
+        self.ttl = ttl
+        self.lookups = []
+
+    def resolve(self, host):
+        self.lookups.append(host)
+        if host not in self.answers:
+            raise socket.gaierror(socket.EAI_NONAME, f"{host} not found")
+        return self.answers[host], self.ttl
+
+
+def test_answers_are_cached():
+    resolver = StubResolver({'shop.example': [(socket.AF_INET, '192.0.2.10')]})
+    cache = DNSCache(resolver=resolver)
+
+    assert cache.lookup('shop.example') == [(socket.AF_INET, '192.0.2.10')]
+    assert cache.lookup('SHOP.example.') == [(socket.AF_INET, '192.0.2.10')]
+    assert resolver.lookups == ['shop.example']
+    assert cache.stats()['hits'] == 1
+
+
+def test_failures_are_cached_for_the_negative_ttl(monkeypatch):
+    resolver = StubResolver({})
+    cache = DNSCache(resolver=resolver, negative_ttl=60)
+    clock = [1000.0]
+    monkeypatch.setattr('dns_cache.time.monotonic', lambda: clock[0])
+
+    for _ in range(2):
+        try:
+            cache.lookup('gone.example')
+        except socket.gaierror:
+            pass
+    assert resolver.lookups == ['gone.example']
+    assert cache.stats()['negative_hits'] == 1
+
+    clock[0] += 61
+    try:
+        cache.lookup('gone.example')
+    except socket.gaierror:
+        pass
+    assert len(resolver.lookups) == 2
+
+
+def test_record_ttl_is_bounded(monkeypatch):
+    resolver = StubResolver({'short.example': [(socket.AF_INET, '192.0.2.1')]}, ttl=1)
+    cache = DNSCache(resolver=resolver)
+    clock = [1000.0]
+    monkeypatch.setattr('dns_cache.time.monotonic', lambda: clock[0])
+
+    cache.lookup('short.example')
+    clock[0] += 10  # past the record TTL, within MIN_TTL_SECONDS
+    cache.lookup('short.example')
+    assert len(resolver.lookups) == 1
+
+
+def test_getaddrinfo_shape():
+    cache = DNSCache(resolver=StubResolver({'shop.example': [(socket.AF_INET, '192.0.2.10')]}))
+
+    results = cache.getaddrinfo('shop.example', 443, type=socket.SOCK_STREAM)
+
+    assert results == [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', ('192.0.2.10', 443))]
+
+
+class FakeAnswer(list):
+    def __init__(self, addresses, ttl):
+        super().__init__(type('Record', (), {'address': address}) for address in addresses)
+        self.rrset = type('RRset', (), {'ttl': ttl})
+
+
+class FakeDnsResolver:
+    """Stands in for dns.resolver.Resolver: answers or raises per record type"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def resolve(self, host, record_type):
+        result = self.results[record_type]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_dnspython_resolver(results, fallback=None):
+    resolver = DnspythonResolver(fallback=fallback)
+    resolver.resolver = FakeDnsResolver(results)
+    return resolver
+
+
+def test_aaaa_timeout_keeps_a_records():
+    resolver = make_dnspython_resolver({
+        'A': FakeAnswer(['192.0.2.10'], ttl=120),
+        'AAAA': dns.exception.Timeout(),
+    })
+
+    assert resolver.resolve('shop.example') == ([(socket.AF_INET, '192.0.2.10')], 120.0)
+
+
+def test_timeout_on_every_record_type_is_a_temporary_failure():
+    resolver = make_dnspython_resolver({'A': dns.exception.Timeout(), 'AAAA': dns.exception.Timeout()})
+
+    try:
+        resolver.resolve('slow.example')
+        assert False, 'expected gaierror'
+    except socket.gaierror as e:
+        assert e.errno == socket.EAI_AGAIN
+
+
+def test_names_unknown_to_dns_fall_back_to_the_system_resolver():
+    fallback = StubResolver({'intranet': [(socket.AF_INET, '10.0.0.5')]})
+    resolver = make_dnspython_resolver({'A': dns.resolver.NXDOMAIN(), 'AAAA': dns.resolver.NXDOMAIN()},
+                                       fallback=fallback)
+
+    assert resolver.resolve('intranet') == ([(socket.AF_INET, '10.0.0.5')], None)
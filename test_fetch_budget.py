@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the per-job fetch budget: deadline, retry allowance and context propagation
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fetch_budget as fetch_budget_module
+from fetch_budget import BudgetExhausted, FetchBudget, allow_retry, current_budget, fetch_budget
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fetch_budget_module.time, 'monotonic', clock)
+    return clock
+
+
+def test_requests_refused_after_deadline(clock):
+    budget = FetchBudget(deadline_seconds=60)
+
+    budget.start_request('https://a.example/')
+    clock.now += 61
+
+    with pytest.raises(BudgetExhausted):
+        budget.start_request('https://b.example/')
+    assert isinstance(BudgetExhausted(), TimeoutError)
+    assert budget.stats()['requests'] == 1
+    assert budget.stats()['refused'] == 1
+
+
+def test_timeouts_clamped_to_time_left(clock):
+    budget = FetchBudget(deadline_seconds=60)
+    clock.now += 55
+
+    assert budget.clamp(30) == 5
+    assert budget.clamp((10, 3)) == (5, 3)
+    clock.now += 10
+    assert budget.clamp(30) == 0.1
+
+
+def test_retry_allowance_grows_with_requests(clock):
+    budget = FetchBudget(deadline_seconds=60, retry_ratio=0.5, min_retries=1)
+
+    assert budget.allow_retry()
+    assert not budget.allow_retry()
+
+    for _ in range(4):
+        budget.start_request('https://a.example/')
+    assert budget.allow_retry()
+    assert budget.allow_retry()
+    assert not budget.allow_retry()
+    assert budget.stats()['retries'] == 3
+
+
+def test_retry_refused_when_its_delay_outlives_the_deadline(clock):
+    budget = FetchBudget(deadline_seconds=60)
+    clock.now += 50
+
+    assert not budget.allow_retry(delay=15)
+    assert budget.allow_retry(delay=5)
+
+
+def test_budget_bound_to_context():
+    assert current_budget() is None
+    assert allow_retry()  # unlimited outside a job
+
+    with fetch_budget(min_retries=0, retry_ratio=0) as budget:
+        assert current_budget() is budget
+        assert not allow_retry()
+
+    assert current_budget() is None
+
+
+def test_budget_follows_job_into_threads_and_tasks():
+    async def in_task():
+        return current_budget()
+
+    with fetch_budget() as budget:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(contextvars.copy_context().run, current_budget).result() is budget
+        assert asyncio.run(in_task()) is budget
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test the per-host circuit breaker and its persistent dead-host cache
+"""
+
+import httpx
+import pytest
+import requests
+
+import host_breaker as host_breaker_module
+from host_breaker import HostCircuitBreaker, HostUnavailableError
+
+URL = 'https://dead.example/contact'
+ERROR = requests.exceptions.ConnectionError('Name or service not known')
+
+
+class Clock:
+    """Controllable stand-in for time.time"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(host_breaker_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'dead_hosts.db')
+
+
+def open_circuit(breaker, url=URL):
+    for _ in range(breaker.failure_threshold):
+        breaker.check(url)
+        breaker.record_failure(url, ERROR)
+
+
+def test_opens_after_consecutive_failures(db_path, clock):
+    breaker = HostCircuitBreaker(db_path=db_path, failure_threshold=3, cooldown_seconds=60)
+
+    for _ in range(2):
+        breaker.check(URL)
+        breaker.record_failure(URL, ERROR)
+    breaker.check(URL)  # still closed below the threshold
+    breaker.record_failure(URL, ERROR)
+
+    with pytest.raises(HostUnavailableError) as excinfo:
+        breaker.check('http://www.dead.example/')
+    assert excinfo.value.host == 'dead.example'
+    assert 'ConnectionError' in excinfo.value.last_error
+    breaker.check('https://alive.example/')  # other hosts are unaffected
+    assert breaker.stats()['short_circuited'] == 1
+    assert breaker.stats()['dead_hosts'] == 1
+
+
+def test_success_resets_failure_count(db_path, clock):
+    breaker = HostCircuitBreaker(db_path=db_path, failure_threshold=2)
+
+    breaker.record_failure(URL, ERROR)
+    breaker.record_success(URL)
+    breaker.record_failure(URL, ERROR)
+
+    breaker.check(URL)
+
+
+def test_half_open_probe_closes_or_reopens_with_longer_cooldown(db_path, clock):
+    breaker = HostCircuitBreaker(db_path=db_path, failure_threshold=1, cooldown_seconds=60)
+    open_circuit(breaker)
+
+    clock.now += 61
+    breaker.check(URL)  # the probe goes through
+    with pytest.raises(HostUnavailableError):
+        breaker.check(URL)  # everyone else waits for it
+
+    breaker.record_failure(URL, ERROR)
+    clock.now += 61
+    with pytest.raises(HostUnavailableError):
+        breaker.check(URL)  # re-opened for 120s
+
+    clock.now += 60
+    breaker.check(URL)
+    breaker.record_success(URL)
+    breaker.check(URL)
+    breaker.check(URL)
+    assert breaker.stats()['closed'] == 1
+    assert breaker.stats()['dead_hosts'] == 0
+
+
+def test_open_circuit_is_shared_through_sqlite(db_path, clock):
+    open_circuit(HostCircuitBreaker(db_path=db_path, failure_threshold=1))
+
+    with pytest.raises(HostUnavailableError):
+        HostCircuitBreaker(db_path=db_path).check(URL)
+
+
+def test_evicted_circuit_is_reloaded_from_sqlite(db_path, clock, monkeypatch):
+    monkeypatch.setattr(HostCircuitBreaker, 'MAX_TRACKED_HOSTS', 2)
+    breaker = HostCircuitBreaker(db_path=db_path, failure_threshold=1)
+    open_circuit(breaker)
+
+    breaker.check('https://a.example/')
+    breaker.check('https://b.example/')
+    assert 'dead.example' not in breaker._circuits
+    assert breaker.stats()['tracked_hosts'] == 2
+
+    with pytest.raises(HostUnavailableError):
+        breaker.check(URL)
+
+
+def test_only_connection_errors_count(db_path):
+    breaker = HostCircuitBreaker(db_path=db_path)
+
+    assert breaker.is_failure(ERROR)
+    assert breaker.is_failure(requests.exceptions.ReadTimeout())
+    assert breaker.is_failure(httpx.ConnectError('refused'))
+    assert not breaker.is_failure(requests.exceptions.HTTPError('404'))
+    assert not breaker.is_failure(ValueError())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test per-host pacing: token buckets, Retry-After throttling and retries
+"""
+
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import host_limiter as host_limiter_module
+from fetch_budget import fetch_budget
+from host_breaker import HostCircuitBreaker
+from host_limiter import HostLimiter, interleave_by_host, parse_retry_after
+
+
+class FakeSession:
+    """requests.Session stand-in answering from a list of statuses (or exceptions)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        status, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return SimpleNamespace(status_code=status, headers=headers)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(host_limiter_module.time, 'sleep', slept.append)
+    return slept
+
+
+@pytest.fixture
+def breaker(monkeypatch, tmp_path):
+    breaker = HostCircuitBreaker(db_path=str(tmp_path / 'dead_hosts.db'))
+    monkeypatch.setattr(host_limiter_module, 'host_breaker', breaker)
+    return breaker
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(formatdate(0, usegmt=True)) == 0.0
+
+
+def test_interleave_by_host_round_robins_and_keeps_host_order():
+    urls = ['https://a.example/1', 'https://www.a.example/2', 'https://a.example/3',
+            'https://b.example/1', 'https://c.example/1', 'https://b.example/2']
+
+    assert interleave_by_host(urls, lambda url: url) == [
+        'https://a.example/1', 'https://b.example/1', 'https://c.example/1',
+        'https://www.a.example/2', 'https://b.example/2', 'https://a.example/3'
+    ]
+
+
+def test_burst_then_paced_per_host():
+    limiter = HostLimiter(rate=2, burst=2)
+
+    assert limiter.reserve('https://a.example/') == 0
+    assert limiter.reserve('https://a.example/x') == 0
+    assert limiter.reserve('https://a.example/y') == pytest.approx(0.5, abs=0.05)
+    assert limiter.reserve('https://b.example/') == 0  # other hosts are unaffected
+    assert limiter.stats()['delayed'] == 1
+
+
+def test_throttle_blocks_host_and_halves_rate():
+    limiter = HostLimiter(rate=2, burst=4)
+
+    assert limiter.observe('https://a.example/', 429, {'retry-after': '5'}) == 5
+    assert limiter.reserve('https://a.example/') == pytest.approx(5, abs=0.1)
+    assert limiter._hosts['a.example'].rate == 1
+    assert limiter.stats()['blocked_hosts'] == 1
+
+    # Too long to wait inline, and a 503 without Retry-After is not retried
+    assert limiter.observe('https://b.example/', 429, {'retry-after': '3600'}) is None
+    assert limiter.observe('https://c.example/', 503, {}) is None
+
+    limiter.observe('https://a.example/', 200, {})
+    assert limiter._hosts['a.example'].rate == pytest.approx(1.2)
+
+
+def test_retry_delay_backs_off_and_stops_after_max_retries():
+    limiter = HostLimiter()
+
+    assert limiter.retry_delay('https://a.example/', 0) == limiter.RETRY_BACKOFF_SECONDS
+    assert limiter.retry_delay('https://a.example/', 1, 502, {}) == limiter.RETRY_BACKOFF_SECONDS * 2
+    assert limiter.retry_delay('https://a.example/', limiter.MAX_RETRIES) is None
+    assert limiter.retry_delay('https://a.example/', 0, 404, {}) is None
+
+
+def test_retries_are_drawn_from_the_job_budget():
+    limiter = HostLimiter()
+
+    with fetch_budget(min_retries=1, retry_ratio=0) as budget:
+        assert limiter.retry_delay('https://a.example/', 0) is not None
+        assert limiter.retry_delay('https://b.example/', 0) is None
+        assert budget.stats()['retries_denied'] == 1
+
+
+def test_get_retries_server_errors_then_returns(sleeps, breaker):
+    limiter = HostLimiter(rate=100, burst=100)
+    session = FakeSession([502, 200])
+
+    response = limiter.get(session, 'https://retry-ok.example/')
+
+    assert response.status_code == 200
+    assert len(session.requested) == 2
+    assert sleeps == [limiter.RETRY_BACKOFF_SECONDS]
+
+
+def test_get_raises_connection_error_once_retries_run_out(sleeps, breaker):
+    limiter = HostLimiter(rate=100, burst=100)
+    error = requests.exceptions.ConnectionError('refused')
+    session = FakeSession([error] * (limiter.MAX_RETRIES + 1))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        limiter.get(session, 'https://retry-refused.example/')
+    assert len(session.requested) == limiter.MAX_RETRIES + 1
+    assert breaker._circuits['retry-refused.example'].failures == 1  # one failure per request
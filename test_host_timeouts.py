@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test per-host timeouts learned from observed latency
+"""
+
+from host_timeouts import HostTimeouts, percentile
+
+
+def test_percentile():
+    assert percentile([5, 1, 3], 0.5) == 3
+    assert percentile(range(1, 101), 0.95) == 95
+    assert percentile([2.0], 0.95) == 2.0
+
+
+def test_default_timeouts_until_enough_samples():
+    timeouts = HostTimeouts(multiplier=3)
+
+    assert timeouts.timeouts('https://a.example/', default=30) == (timeouts.CONNECT_TIMEOUT_SECONDS, 30)
+    for _ in range(timeouts.MIN_SAMPLES - 1):
+        timeouts.observe('https://a.example/', connect_seconds=0.1, ttfb_seconds=0.5)
+
+    assert timeouts.timeouts('https://a.example/', default=30) == (timeouts.CONNECT_TIMEOUT_SECONDS, 30)
+    assert timeouts.stats()['default'] == 2
+
+
+def test_fast_host_gets_tight_bounded_timeouts():
+    timeouts = HostTimeouts(multiplier=3)
+    for _ in range(timeouts.MIN_SAMPLES):
+        timeouts.observe('https://a.example/', connect_seconds=0.1, ttfb_seconds=0.5)
+
+    # p95 * 3 falls below the floors
+    assert timeouts.timeouts('https://www.a.example/page', default=30) == (
+        timeouts.MIN_CONNECT_TIMEOUT_SECONDS, timeouts.MIN_READ_TIMEOUT_SECONDS
+    )
+    assert timeouts.stats()['adapted'] == 1
+
+
+def test_slow_host_gets_more_time_than_the_default():
+    timeouts = HostTimeouts(multiplier=3)
+    for _ in range(timeouts.MIN_SAMPLES):
+        timeouts.observe('https://slow.example/', ttfb_seconds=15)
+
+    connect, read = timeouts.timeouts('https://slow.example/', default=30)
+    assert connect == timeouts.CONNECT_TIMEOUT_SECONDS  # no connect samples yet
+    assert read == 45
+
+
+def test_read_timeouts_lengthen_the_next_window():
+    timeouts = HostTimeouts(multiplier=3)
+    for _ in range(timeouts.MIN_SAMPLES):
+        timeouts.observe_timeout('https://slow.example/', read_timeout=40)
+
+    assert timeouts.timeouts('https://slow.example/', default=30)[1] == timeouts.MAX_READ_TIMEOUT_SECONDS
+    assert timeouts.latency('https://slow.example/')['timeouts'] == timeouts.MIN_SAMPLES
+    assert timeouts.latency('https://unknown.example/') == {}
+
+
+def test_tracked_hosts_are_bounded(monkeypatch):
+    monkeypatch.setattr(HostTimeouts, 'MAX_TRACKED_HOSTS', 2)
+    timeouts = HostTimeouts()
+
+    for host in ('a', 'b', 'c'):
+        timeouts.observe(f'https://{host}.example/', ttfb_seconds=1)
+
+    assert timeouts.stats()['tracked_hosts'] == 2
+    assert timeouts.latency('https://a.example/') == {}
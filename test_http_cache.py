@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk HTTP cache with a fake session (no network)
+"""
+
+import requests
+
+from business_cache import BusinessResultCache
+from http_cache import HTTPCache, normalize_url, revalidating
+
+
+class FakeSession:
+    """Serves one page with an ETag; answers 304 when the client sends it back"""
+
+    def __init__(self, cache_control='max-age=3600'):
+        self.cache_control = cache_control
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.requests.append(dict(headers or {}))
+        response = requests.Response()
+        response.url = url
+        response.headers['etag'] = '"v1"'
+        response.headers['cache-control'] = self.cache_control
+        response.headers['content-type'] = 'text/html'
+        if headers and headers.get('If-None-Match') == '"v1"':
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = b'<html>cached page</html>'
+        return response
+
+
+def make_cache(tmp_path):
+    return HTTPCache(db_path=str(tmp_path / 'http.db'), enabled=True)
+
+
+def test_normalize_url():
+    assert normalize_url('HTTPS://Shop.Example:443?b=2&a=1#top') == 'https://shop.example/?a=1&b=2'
+
+
+def test_fresh_entries_skip_the_network(tmp_path):
+    cache, session = make_cache(tmp_path), FakeSession()
+
+    cache.get(session, 'https://fresh.http-cache.test/')
+    response = cache.get(session, 'https://fresh.http-cache.test/')
+
+    assert response.content == b'<html>cached page</html>'
+    assert len(session.requests) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_stale_entries_are_revalidated(tmp_path):
+    cache, session = make_cache(tmp_path), FakeSession(cache_control='no-cache')
+
+    cache.get(session, 'https://stale.http-cache.test/')
+    response = cache.get(session, 'https://stale.http-cache.test/')
+
+    assert response.status_code == 200
+    assert response.content == b'<html>cached page</html>'
+    assert session.requests[1].get('If-None-Match') == '"v1"'
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_forced_refresh_revalidates_fresh_entries(tmp_path):
+    cache, session = make_cache(tmp_path), FakeSession()
+    cache.get(session, 'https://forced.http-cache.test/')
+
+    with revalidating():
+        response = cache.get(session, 'https://forced.http-cache.test/')
+
+    assert len(session.requests) == 2
+    assert session.requests[1].get('If-None-Match') == '"v1"'
+    assert response.content == b'<html>cached page</html>'
+
+
+def test_business_cache_force_refresh_revalidates_pages(tmp_path):
+    http, session = make_cache(tmp_path), FakeSession()
+    results = BusinessResultCache(db_path=str(tmp_path / 'results.db'))
+    url = 'https://refresh.http-cache.test/'
+
+    def scrape(url):
+        http.get(session, url)
+        return {'url': url, 'status': 'success'}
+
+    results.get_or_scrape(url, scrape)
+    results.get_or_scrape(url, scrape, force_refresh=True)
+
+    assert len(session.requests) == 2
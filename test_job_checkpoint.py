@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test directory job checkpoints: snapshot round-trip and the completed log
+"""
+
+import os
+
+from job_checkpoint import JobCheckpoint, job_output_path
+
+
+def test_snapshot_round_trip(tmp_path):
+    checkpoint = JobCheckpoint('job-1', metadata={'user_id': 'u1'}, directory=str(tmp_path))
+    assert not checkpoint.exists()
+    assert checkpoint.load_snapshot() is None
+
+    businesses = [{'name': 'A', 'website': 'https://a.example/'}]
+    checkpoint.save_snapshot({'directory_url': 'https://dir.example/'}, businesses, total_found=7)
+
+    snapshot = JobCheckpoint('job-1', directory=str(tmp_path)).load_snapshot()
+    assert snapshot['user_id'] == 'u1'
+    assert snapshot['params'] == {'directory_url': 'https://dir.example/'}
+    assert snapshot['businesses'] == businesses
+    assert snapshot['total_found'] == 7
+    assert not os.path.exists(checkpoint.snapshot_path + '.tmp')
+
+
+def test_corrupt_snapshot_reads_as_missing(tmp_path):
+    checkpoint = JobCheckpoint('job-1', directory=str(tmp_path))
+    with open(checkpoint.snapshot_path, 'w') as f:
+        f.write('{"job_id": ')
+
+    assert checkpoint.load_snapshot() is None
+
+
+def test_completed_log_survives_torn_last_line(tmp_path):
+    checkpoint = JobCheckpoint('job-1', directory=str(tmp_path))
+    assert checkpoint.load_completed() == {}
+
+    checkpoint.mark_completed([('https://a.example/', True), ('https://b.example/', False), (None, True)])
+    checkpoint.mark_completed([])
+    with open(checkpoint.log_path, 'a') as f:
+        f.write('{"website": "https://c.exa')
+
+    assert JobCheckpoint('job-1', directory=str(tmp_path)).load_completed() == {
+        'https://a.example/': True,
+        'https://b.example/': False,
+    }
+
+
+def test_job_output_path_is_per_job():
+    assert job_output_path('abc').endswith('job_abc_results.jsonl')
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite job queue: claims, lease ownership, expiry and retry limits
+"""
+
+import pytest
+
+from job_queue import SQLiteJobQueue, create_job_queue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / 'jobs.db'))
+
+
+def test_claim_oldest_queued_job(queue):
+    queue.enqueue('job-1', 'scrape', {'url': 'https://a.example/'}, user_id='u1')
+    queue.enqueue('job-2', 'scrape', {'url': 'https://b.example/'}, user_id='u1')
+
+    job = queue.claim('worker-a', lease_seconds=60)
+    assert job['job_id'] == 'job-1'
+    assert job['status'] == 'running'
+    assert job['worker_id'] == 'worker-a'
+    assert job['attempts'] == 1
+    assert job['params'] == {'url': 'https://a.example/'}
+
+    assert queue.claim('worker-b', lease_seconds=60)['job_id'] == 'job-2'
+    assert queue.claim('worker-c', lease_seconds=60) is None
+    assert queue.count_active(user_id='u1') == 2
+
+
+def test_duplicate_enqueue_rejected_until_finished(queue):
+    queue.enqueue('job-1', 'scrape', {})
+    with pytest.raises(ValueError):
+        queue.enqueue('job-1', 'scrape', {})
+
+    queue.claim('worker-a', lease_seconds=60)
+    queue.complete('job-1', 'worker-a', {'status': 'completed', 'result': {'ok': True}})
+
+    requeued = queue.enqueue('job-1', 'scrape', {'resume': True})
+    assert requeued['status'] == 'queued'
+    assert requeued['attempts'] == 0
+    assert requeued['result'] is None
+
+
+def test_only_the_owner_can_heartbeat_complete_or_release(queue):
+    queue.enqueue('job-1', 'scrape', {})
+    queue.claim('worker-a', lease_seconds=60)
+
+    assert not queue.heartbeat('job-1', 'worker-b', 60)
+    assert not queue.complete('job-1', 'worker-b', {'status': 'completed'})
+    assert not queue.release('job-1', 'worker-b')
+
+    assert queue.heartbeat('job-1', 'worker-a', 60)
+    assert queue.complete('job-1', 'worker-a', {'status': 'failed', 'error': 'boom'})
+
+    job = queue.get('job-1')
+    assert job['status'] == 'failed'
+    assert job['error'] == 'boom'
+    assert job['result'] == {'status': 'failed', 'error': 'boom'}
+    assert not queue.heartbeat('job-1', 'worker-a', 60)
+
+
+def test_release_puts_job_back(queue):
+    queue.enqueue('job-1', 'scrape', {})
+    queue.claim('worker-a', lease_seconds=60)
+
+    assert queue.release('job-1', 'worker-a')
+    job = queue.claim('worker-b', lease_seconds=60)
+    assert job['worker_id'] == 'worker-b'
+    assert job['attempts'] == 2
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(queue):
+    queue.enqueue('job-1', 'scrape', {})
+    queue.claim('worker-a', lease_seconds=-1)  # worker died: lease already expired
+
+    job = queue.claim('worker-b', lease_seconds=60)
+    assert job['job_id'] == 'job-1'
+    assert job['worker_id'] == 'worker-b'
+    assert job['attempts'] == 2
+
+    # The dead worker has lost the job
+    assert not queue.heartbeat('job-1', 'worker-a', 60)
+    assert not queue.complete('job-1', 'worker-a', {'status': 'completed'})
+
+
+def test_expired_lease_fails_job_after_max_attempts(queue):
+    queue.enqueue('job-1', 'scrape', {}, max_attempts=2)
+    queue.claim('worker-a', lease_seconds=-1)
+    queue.claim('worker-b', lease_seconds=-1)
+
+    assert queue.claim('worker-c', lease_seconds=60) is None
+    job = queue.get('job-1')
+    assert job['status'] == 'failed'
+    assert job['attempts'] == 2
+    assert 'retries exhausted' in job['error']
+    assert queue.count_active() == 0
+
+
+def test_get_many_batches_lookups(queue):
+    queue.enqueue('job-1', 'scrape', {}, user_id='u1')
+    queue.enqueue('job-2', 'analysis', {}, user_id='u2')
+
+    jobs = queue.get_many(['job-1', 'job-2', 'missing'])
+    assert set(jobs) == {'job-1', 'job-2'}
+    assert jobs['job-2']['job_type'] == 'analysis'
+    assert queue.get_many([]) == {}
+    assert queue.count_active(job_type='analysis') == 1
+
+
+def test_create_job_queue_from_url(tmp_path):
+    assert isinstance(create_job_queue(f"sqlite:///{tmp_path / 'jobs.db'}"), SQLiteJobQueue)
+    with pytest.raises(ValueError):
+        create_job_queue('postgres://localhost/jobs')
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the job store: hot tier eviction, SQLite persistence and restart handling
+"""
+
+import threading
+
+from job_store import JobStore
+
+
+def make_store(tmp_path, **kwargs):
+    return JobStore(db_path=str(tmp_path / 'jobs.db'), **kwargs)
+
+
+def test_records_survive_eviction_and_restart(tmp_path):
+    store = make_store(tmp_path, max_hot=2)
+    for i in range(5):
+        store.put(f'job_{i}', {'type': 'scrape', 'status': 'processing'})
+
+    assert store.stats()['hot_jobs'] == 2
+    assert store.get('job_0')['status'] == 'processing'
+
+    reopened = make_store(tmp_path)
+    assert reopened.get('job_4')['id'] == 'job_4'
+    assert reopened.count() == 5
+    assert [job['id'] for job in reopened.list(limit=2)] == ['job_3', 'job_4']
+
+
+def test_update_merges_and_returns_copies(tmp_path):
+    store = make_store(tmp_path)
+    store.put('job_1', {'type': 'scrape', 'status': 'processing', 'result': None})
+
+    updated = store.update('job_1', {'status': 'completed', 'result': {'phone': ['555']}})
+    updated['status'] = 'tampered'
+
+    assert store.get('job_1')['status'] == 'completed'
+    assert make_store(tmp_path).get('job_1')['result'] == {'phone': ['555']}
+    assert store.update('missing', {'status': 'failed'}) is None
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    store = make_store(tmp_path)
+    store.put('job_1', {'type': 'bulk_scrape', 'status': 'processing'})
+
+    def update(i):
+        store.update('job_1', {f'field_{i}': i})
+
+    threads = [threading.Thread(target=update, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    job = make_store(tmp_path).get('job_1')
+    assert all(job[f'field_{i}'] == i for i in range(20))
+
+
+def test_mark_interrupted(tmp_path):
+    store = make_store(tmp_path)
+    store.put('job_1', {'type': 'directory_scrape', 'status': 'processing'})
+    store.put('job_2', {'type': 'scrape', 'status': 'completed'})
+
+    assert store.mark_interrupted() == 1
+    assert store.get('job_1')['status'] == 'interrupted'
+    assert store.get('job_2')['status'] == 'completed'
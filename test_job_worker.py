@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test that a queue worker stops a job and drops its result once the lease is lost
+"""
+
+import time
+
+import job_handlers
+from job_worker import JobWorker
+
+
+class FakeQueue:
+    """Records what the worker does with a job; heartbeats report whether the lease is still held"""
+
+    def __init__(self, lease_held=True):
+        self.lease_held = lease_held
+        self.completed = []
+        self.released = []
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        return self.lease_held
+
+    def complete(self, job_id, worker_id, updates):
+        self.completed.append(job_id)
+        return True
+
+    def release(self, job_id, worker_id):
+        self.released.append(job_id)
+        return True
+
+
+def install_slow_handler(monkeypatch, stopped):
+    """Register a 'slow' job type that runs until it is cancelled"""
+    def slow_handler(job_id):
+        deadline = time.time() + 10
+        while not job_handlers.is_cancelled(job_id) and time.time() < deadline:
+            time.sleep(0.01)
+        stopped.append(job_handlers.is_cancelled(job_id))
+        return {'status': 'completed'}
+
+    monkeypatch.setitem(job_handlers.JOB_HANDLERS, 'slow', slow_handler)
+
+
+def test_lost_lease_stops_job_and_drops_result(monkeypatch):
+    stopped = []
+    install_slow_handler(monkeypatch, stopped)
+    queue = FakeQueue(lease_held=False)
+    worker = JobWorker(queue, worker_id='test-worker', lease_seconds=0.3)
+
+    worker._run_claimed({'job_id': 'job-1', 'job_type': 'slow', 'params': {}, 'attempts': 1})
+
+    assert stopped == [True]
+    assert queue.completed == []
+    assert not job_handlers.is_cancelled('job-1')
+
+
+def test_shutdown_stops_job_before_releasing_it(monkeypatch):
+    stopped = []
+    install_slow_handler(monkeypatch, stopped)
+    queue = FakeQueue()
+    worker = JobWorker(queue, worker_id='test-worker', lease_seconds=0.3)
+    worker.stop()
+
+    worker._run_claimed({'job_id': 'job-2', 'job_type': 'slow', 'params': {}, 'attempts': 1})
+
+    # The handler had already stopped when the job went back to the queue
+    assert stopped == [True]
+    assert queue.released == ['job-2']
+    assert queue.completed == []
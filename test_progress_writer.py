@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test the coalescing progress writer (writes go to a list instead of the database)
+"""
+
+from progress_writer import ProgressWriter
+
+
+def make_writer(**kwargs):
+    writes = []
+    writer = ProgressWriter(write_fn=lambda job_id, updates: writes.append((job_id, updates)), **kwargs)
+    return writer, writes
+
+
+def test_reports_are_coalesced_until_close():
+    writer, writes = make_writer(flush_interval=60, flush_every=1000)
+
+    for count in range(1, 11):
+        writer.report('job-1', {'processed_count': count})
+    writer.close('job-1')
+
+    # One write carrying only the latest counts
+    assert writes == [('job-1', {'processed_count': 10})]
+    assert writer.stats()['tracked_jobs'] == 0
+
+
+def test_close_with_discard_drops_pending_progress():
+    writer, writes = make_writer(flush_interval=60, flush_every=1000)
+
+    writer.report('job-1', {'processed_count': 3})
+    writer.close('job-1', discard=True)
+
+    assert writes == []
+    assert writer.stats()['tracked_jobs'] == 0
+
+
+def test_write_failures_are_logged_not_raised():
+    def failing_write(job_id, updates):
+        raise RuntimeError('database down')
+
+    writer = ProgressWriter(write_fn=failing_write, flush_interval=60, flush_every=1000)
+    writer.report('job-1', {'processed_count': 1})
+    writer.close('job-1')
+
+    assert writer.stats()['writes'] == 0
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test the JSONL result spool, including resume after a crash mid-append
+"""
+
+from result_spool import ResultSpool, iter_results
+
+
+def test_append_and_read_back(tmp_path):
+    spool = ResultSpool(str(tmp_path / 'results.jsonl'))
+    spool.start({'directory_url': 'https://dir.example/'})
+
+    assert spool.append([{'url': 'https://a.example/'}, {'url': 'https://b.example/'}]) == 2
+    spool.write_summary({'status': 'completed', 'successful': 2})
+
+    assert [record['url'] for record in spool] == ['https://a.example/', 'https://b.example/']
+    assert spool.read_summary()['status'] == 'completed'
+
+
+def test_resume_drops_torn_last_line(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    spool = ResultSpool(path)
+    spool.start({'started_at': 'first'})
+    spool.append([{'url': 'https://a.example/'}])
+
+    # Crash in the middle of writing the next record
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://b.exa')
+
+    resumed = ResultSpool(path)
+    resumed.start({'started_at': 'second'}, resume=True)
+    resumed.append([{'url': 'https://b.example/'}, {'url': 'https://c.example/'}])
+
+    assert [record['url'] for record in iter_results(path)] == [
+        'https://a.example/', 'https://b.example/', 'https://c.example/'
+    ]
+    assert resumed.read_summary()['started_at'] == 'first'
+
+
+def test_resume_of_file_with_only_a_torn_line(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"url": ')
+
+    spool = ResultSpool(path)
+    spool.start({}, resume=True)
+    spool.append([{'url': 'https://a.example/'}])
+
+    assert [record['url'] for record in spool] == ['https://a.example/']
+
+
+def test_start_without_resume_truncates(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    spool = ResultSpool(path)
+    spool.start({})
+    spool.append([{'url': 'https://a.example/'}])
+
+    ResultSpool(path).start({})
+
+    assert list(iter_results(path)) == []
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test single-flight coalescing for threads and coroutines
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def scrape(url):
+        calls.append(url)
+        started.set()
+        release.wait(5)
+        return {'url': url, 'emails': ['info@a.example']}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, 'a.example', scrape, 'https://a.example/')
+        started.wait(5)
+        waiters = [pool.submit(flight.do, 'a.example', scrape, 'https://a.example/') for _ in range(3)]
+        while flight.stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result(5)] + [waiter.result(5) for waiter in waiters]
+
+    assert calls == ['https://a.example/']
+    assert all(result == results[0] for result in results)
+    # Waiters get copies, so one caller mutating its result cannot affect another
+    assert len({id(result) for result in results}) == 4
+    assert flight.stats() == {'in_flight': 0, 'executed': 1, 'coalesced': 3}
+
+
+def test_nothing_is_cached_after_the_call():
+    flight = SingleFlight()
+    calls = []
+
+    flight.do('a.example', calls.append, 1)
+    flight.do('a.example', calls.append, 2)
+
+    assert calls == [1, 2]
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ConnectionError('refused')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, 'a.example', fail)
+        started.wait(5)
+        waiter = pool.submit(flight.do, 'a.example', fail)
+        while flight.stats()['coalesced'] < 1:
+            time.sleep(0.01)
+        release.set()
+
+        for future in (leader, waiter):
+            with pytest.raises(ConnectionError):
+                future.result(5)
+
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_concurrent_coroutines_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def scrape(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return {'url': url}
+
+    async def main():
+        results = await asyncio.gather(*[flight.do_async('a.example', scrape, 'https://a.example/')
+                                         for _ in range(3)])
+        again = await flight.do_async('a.example', scrape, 'https://a.example/')
+        return results, again
+
+    results, again = asyncio.run(main())
+
+    assert calls == ['https://a.example/', 'https://a.example/']
+    assert results == [{'url': 'https://a.example/'}] * 3
+    assert again == {'url': 'https://a.example/'}
+    assert flight.stats()['coalesced'] == 2
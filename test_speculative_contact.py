@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Test speculative contact page fetches in UniversalBusinessScraper
+(pages are served by a fake fetcher, so no network is needed)
+"""
+
+from universal_scraper import UniversalBusinessScraper
+
+GUESSES = ['https://joes.example/contact', 'https://joes.example/contact-us']
+
+
+def test_guesses_start_once_the_homepage_answers(fake_fetcher):
+    fetcher = fake_fetcher()
+    scraper = UniversalBusinessScraper(fetcher=fetcher, speculative_contact=True)
+
+    result = scraper.scrape_business('https://joes.example/')
+
+    assert result['status'] == 'success'
+    assert fetcher.requests[0] == 'https://joes.example/'
+    # The homepage has no contact link, so the first guess is used; the other
+    # is cancelled if it has not started by then
+    assert GUESSES[0] in fetcher.requests
+    assert set(fetcher.requests[1:]) <= set(GUESSES)
+
+
+def test_no_guesses_for_a_host_that_fails(fake_fetcher):
+    fetcher = fake_fetcher({'https://down.example/': 503})
+    scraper = UniversalBusinessScraper(fetcher=fetcher, speculative_contact=True)
+
+    result = scraper.scrape_business('https://down.example/')
+
+    assert result['status'] == 'error'
+    assert fetcher.requests == ['https://down.example/']
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test bulk business saves against a fake Supabase table (no database needed)
+"""
+
+import supabase_manager
+from supabase_manager import SupabaseManager
+
+
+class FlakyTable:
+    """
+    Fake scraped_businesses table keyed like the unique index on (job_id, website)
+
+    The first request commits and then times out, like a response lost on the way back.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.requests = 0
+        self._pending = None
+
+    def table(self, name):
+        return self
+
+    def upsert(self, records, on_conflict=None):
+        assert on_conflict == 'job_id,website'
+        self._pending = records
+        return self
+
+    def execute(self):
+        self.requests += 1
+        keys = [(record['job_id'], record['website']) for record in self._pending]
+        assert len(keys) == len(set(keys)), 'one upsert touched a key twice'
+        for key, record in zip(keys, self._pending):
+            self.rows[key] = record
+        if self.requests == 1:
+            raise TimeoutError('read timed out')
+        return self
+
+
+def make_manager(client):
+    manager = SupabaseManager.__new__(SupabaseManager)
+    manager.client = client
+    return manager
+
+
+def test_retried_chunk_is_not_duplicated(monkeypatch):
+    monkeypatch.setattr(supabase_manager.time, 'sleep', lambda seconds: None)
+    table = FlakyTable()
+    businesses = [{'url': f'https://b{i}.example/', 'business_name': f'B{i}'} for i in range(3)]
+
+    result = make_manager(table).save_businesses_bulk('job-1', 'user-1', businesses)
+
+    assert result['status'] == 'success'
+    assert result['saved'] == 3
+    assert table.requests == 2
+    assert len(table.rows) == 3
+
+
+def test_duplicate_websites_in_a_chunk_are_merged(monkeypatch):
+    monkeypatch.setattr(supabase_manager.time, 'sleep', lambda seconds: None)
+    table = FlakyTable()
+    businesses = [{'url': 'https://b.example/', 'business_name': 'Old'},
+                  {'url': 'https://b.example/', 'business_name': 'New'},
+                  {'business_name': 'No website'}]
+
+    make_manager(table).save_businesses_bulk('job-1', 'user-1', businesses)
+
+    assert table.rows[('job-1', 'https://b.example/')]['business_name'] == 'New'
+    assert table.rows[('job-1', None)]['business_name'] == 'No website'
+
+
+def test_unbuildable_rows_fail_only_their_chunk():
+    table = FlakyTable()
+    table.requests = 1  # no simulated timeout
+    businesses = [{'url': 'https://a.example/', 'owner_info': 'not a dict'},
+                  {'url': 'https://b.example/', 'owner_info': None, 'directory_listing': None}]
+
+    result = make_manager(table).save_businesses_bulk('job-1', 'user-1', businesses, chunk_size=1)
+
+    assert result['status'] == 'partial'
+    assert (result['saved'], result['failed']) == (1, 1)
+    assert table.rows[('job-1', 'https://b.example/')]['owner_names'] == []
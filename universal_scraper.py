@@ -2,28 +2,59 @@
 Working Business Scraper - Actually Extracts Data
 """
 
+import asyncio
+import contextvars
+import os
 import requests
 from bs4 import BeautifulSoup
 import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
-from dns_fix import configure_dns_session
+from async_fetcher import AsyncFetchEngine, async_fetch_engine
+from fetch_service import FetchService, fetch_service
+from business_cache import cache_key
+from single_flight import SingleFlight
 from smart_phone_extractor import extract_smart_phones
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Shared by every scraper instance so concurrent jobs scraping the same site
+# (or a double-submitted request) run the scrape once
+_scrape_flights = SingleFlight('scrape_business')
+
+# Fetches guessed contact pages while the homepage body downloads (shared by all instances)
+_speculative_pool = ThreadPoolExecutor(max_workers=int(os.getenv('SCRAPEX_SPECULATIVE_WORKERS', '16')),
+                                       thread_name_prefix='speculative-contact')
+
 
 class UniversalBusinessScraper:
     """
     Scraper that actually extracts data from websites
+    
+    In speculative mode the usual contact page paths are requested as soon as
+    the homepage's host answers, while its body downloads and is parsed; when
+    the homepage links to one of them (or has no contact link at all) the
+    contact page is already downloaded, saving a round trip. Guesses never
+    start for a host that did not answer, so a dead site costs no extra
+    breaker failures or retries, and guesses still queued when the scrape
+    ends are cancelled.
     """
     
-    def __init__(self):
-        self.session = configure_dns_session()
+    # Contact page paths guessed before the homepage has been parsed
+    CONTACT_PATHS = ('/contact', '/contact-us')
+    SPECULATIVE_CONTACT = os.getenv('SCRAPEX_SPECULATIVE_CONTACT', 'true').lower() == 'true'
+    
+    def __init__(self, fetch_engine: AsyncFetchEngine = None, fetcher: FetchService = None,
+                 speculative_contact: bool = None):
+        self.fetcher = fetcher or fetch_service
+        # Read timeout until the host has latency history (see host_timeouts)
         self.timeout = 30
+        self.fetch_engine = fetch_engine or async_fetch_engine
+        self.speculative_contact = self.SPECULATIVE_CONTACT if speculative_contact is None else speculative_contact
         
     def _find_contact_page(self, soup: BeautifulSoup, base_url: str) -> str:
         """Find the contact page URL from homepage"""
@@ -45,91 +76,295 @@ class UniversalBusinessScraper:
         
         logger.warning(f"No contact page found on {base_url}")
         return None
+    
+    def _contact_candidates(self, url: str) -> List[str]:
+        """Guessed contact page URLs for a site (empty unless speculative mode is on)"""
+        if not self.speculative_contact:
+            return []
+        parsed = urlparse(url)
+        return [f"{parsed.scheme}://{parsed.netloc}{path}" for path in self.CONTACT_PATHS
+                if parsed.path.rstrip('/') != path]
+    
+    def _matching_candidate(self, contact_url: str, candidates) -> Optional[str]:
+        """The speculatively fetched URL that is the same page as contact_url, if any"""
+        def page(link: str):
+            parsed = urlparse(link)
+            return parsed.netloc.lower().replace('www.', '', 1), parsed.path.rstrip('/').lower(), parsed.query
+        
+        target = page(contact_url)
+        return next((candidate for candidate in candidates if page(candidate) == target), None)
+    
+    def _is_contact_response(self, response) -> bool:
+        """Whether a guessed URL really served a contact page (not e.g. a redirect to the homepage)"""
+        return response is not None and 'contact' in urlparse(str(response.url)).path.lower()
+    
+    def _fetch_candidate(self, candidate_url: str) -> Optional[requests.Response]:
+        """Fetch a guessed contact page; None if it does not exist"""
+        try:
+            response = self.fetcher.get(candidate_url, scraper='universal_speculative', timeout=self.timeout)
+            response.raise_for_status()
+            return response
+        except Exception as e:
+            logger.debug(f"Speculative fetch of {candidate_url} failed: {e}")
+            return None
+    
+    def _fetch_contact(self, url: str, contact_url: Optional[str],
+                       speculative: Dict[str, Future]) -> Optional[requests.Response]:
+        """Contact page response, reusing a speculative fetch when it covers the page"""
+        if contact_url is None:
+            # No contact link on the homepage: use a guessed page that exists
+            for future in speculative.values():
+                response = future.result()
+                if self._is_contact_response(response):
+                    logger.info(f"Using speculative contact page: {response.url}")
+                    return response
+            return None
+        if contact_url == url:
+            return None
+        
+        candidate = self._matching_candidate(contact_url, speculative)
+        if candidate is not None:
+            logger.info(f"Contact page {contact_url} already fetched speculatively")
+            return speculative[candidate].result()
+        
+        logger.info(f"Scraping contact page: {contact_url}")
+        response = self.fetcher.get(contact_url, scraper='universal', timeout=self.timeout)
+        response.raise_for_status()
+        return response
+    
+    async def _fetch_candidate_async(self, candidate_url: str):
+        """Fetch a guessed contact page with the async engine; None if it does not exist"""
+        try:
+            return await self.fetch_engine.fetch(candidate_url, timeout=self.timeout, scraper='universal_speculative')
+        except Exception as e:
+            logger.debug(f"Speculative fetch of {candidate_url} failed: {e}")
+            return None
+    
+    async def _fetch_contact_async(self, url: str, contact_url: Optional[str], speculative: Dict[str, asyncio.Task]):
+        """Contact page response for the async path (see _fetch_contact)"""
+        if contact_url is None:
+            for task in speculative.values():
+                response = await task
+                if self._is_contact_response(response):
+                    logger.info(f"Using speculative contact page: {response.url}")
+                    return response
+            return None
+        if contact_url == url:
+            return None
+        
+        candidate = self._matching_candidate(contact_url, speculative)
+        if candidate is not None:
+            logger.info(f"Contact page {contact_url} already fetched speculatively")
+            return await speculative[candidate]
+        
+        logger.info(f"Scraping contact page: {contact_url}")
+        return await self.fetch_engine.fetch(contact_url, timeout=self.timeout, scraper='universal_async')
         
     def scrape_business(self, url: str, business_type: str = None) -> Dict:
         """
         Scrape business data from website
+        
+        Concurrent calls for the same canonical URL share one scrape.
         """
+        return _scrape_flights.do(cache_key(url), self._scrape_business, url, business_type)
+    
+    def _scrape_business(self, url: str, business_type: str = None) -> Dict:
+        """Fetch and extract a business website (see scrape_business)"""
         logger.info(f"Scraping: {url}")
         
-        result = {
-            'url': url,
-            'scraped_at': datetime.now().isoformat(),
-            'business_name': None,
-            'phone': [],
-            'email': [],
-            'social_media': {},
-            'address': [],
-            'description': None,
-            'business_owner_name': None,
-            'key_decision_makers': [],
-            'services': [],
-            'data_completeness_score': 0,
-            'analysis_insights': []
-        }
+        result = self._empty_result(url)
+        
+        candidates = self._contact_candidates(url)
+        speculative: Dict[str, Future] = {}
+        
+        def start_guesses():
+            # Once the host has answered, request likely contact pages (in a
+            # copy of this context so the job's fetch budget applies)
+            if candidates and not speculative:
+                speculative.update({
+                    candidate: _speculative_pool.submit(contextvars.copy_context().run,
+                                                        self._fetch_candidate, candidate)
+                    for candidate in candidates
+                })
         
         try:
             # Get page content
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.fetcher.get(url, scraper='universal', timeout=self.timeout, on_headers=start_guesses)
             response.raise_for_status()
+            start_guesses()  # homepage came from the cache
             soup = BeautifulSoup(response.content, 'html.parser')
             
-            # Extract business name
-            result['business_name'] = self._extract_business_name(soup, url)
-            
             # Try to find and scrape contact page for better phone numbers
+            contact_soup, contact_text = None, None
             contact_url = self._find_contact_page(soup, url)
-            if contact_url and contact_url != url:
-                try:
-                    logger.info(f"Scraping contact page: {contact_url}")
-                    contact_response = self.session.get(contact_url, timeout=self.timeout)
-                    contact_response.raise_for_status()
+            try:
+                contact_response = self._fetch_contact(url, contact_url, speculative)
+                if contact_response is not None:
                     contact_soup = BeautifulSoup(contact_response.content, 'html.parser')
-                    
-                    # Extract phone numbers from contact page (prioritized)
-                    contact_phones = extract_smart_phones(contact_soup, contact_response.text, is_contact_page=True)
-                    if contact_phones:
-                        logger.info(f"Found {len(contact_phones)} phones on contact page (prioritized)")
-                        logger.info(f"Primary phone: {contact_phones[0]}")
-                        result['phone'] = contact_phones
-                    else:
-                        # Fallback to homepage phones
-                        result['phone'] = extract_smart_phones(soup, response.text, is_contact_page=False)
-                except Exception as e:
-                    logger.warning(f"Could not scrape contact page: {e}")
-                    # Fallback to homepage phones
-                    result['phone'] = extract_smart_phones(soup, response.text, is_contact_page=False)
-            else:
-                # No contact page found, use homepage
-                result['phone'] = extract_smart_phones(soup, response.text, is_contact_page=False)
-            
-            # Extract emails
-            result['email'] = self._extract_emails(soup, response.text)
-            
-            # Extract social media
-            result['social_media'] = self._extract_social_media(soup)
+                    contact_text = contact_response.text
+            except Exception as e:
+                logger.warning(f"Could not scrape contact page: {e}")
             
-            # Extract address
-            result['address'] = self._extract_addresses(soup, response.text)
+            self._populate_result(result, url, soup, response.text, contact_soup, contact_text)
             
-            # Extract description
-            result['description'] = self._extract_description(soup)
+        except Exception as e:
+            logger.error(f"Scraping error: {e}")
+            result['error'] = str(e)
+        finally:
+            # Guesses the homepage made unnecessary (or that never got a worker)
+            for future in speculative.values():
+                future.cancel()
             
-            # Calculate completeness
-            result['data_completeness_score'] = self._calculate_completeness(result)
+        return result
+    
+    async def scrape_business_async(self, url: str, business_type: str = None) -> Dict:
+        """
+        Scrape business data from website using the shared async fetch engine
+        
+        Same extraction as scrape_business, but fetches are awaited on the
+        event loop and HTML parsing runs in a worker thread, so many sites can
+        be in flight at once without a thread per site. Concurrent calls for
+        the same canonical URL on one event loop share one scrape.
+        """
+        return await _scrape_flights.do_async(cache_key(url), self._scrape_business_async, url, business_type)
+    
+    async def _scrape_business_async(self, url: str, business_type: str = None) -> Dict:
+        """Fetch and extract a business website asynchronously (see scrape_business_async)"""
+        logger.info(f"Scraping (async): {url}")
+        
+        result = self._empty_result(url)
+        
+        candidates = self._contact_candidates(url)
+        speculative: Dict[str, asyncio.Task] = {}
+        
+        def start_guesses():
+            # Once the host has answered, request likely contact pages
+            if candidates and not speculative:
+                speculative.update({
+                    candidate: asyncio.create_task(self._fetch_candidate_async(candidate))
+                    for candidate in candidates
+                })
+        
+        try:
+            response = await self.fetch_engine.fetch(url, timeout=self.timeout, scraper='universal_async',
+                                                     on_headers=start_guesses)
+            start_guesses()  # homepage came from the cache
+            soup = await asyncio.to_thread(BeautifulSoup, response.content, 'html.parser')
             
-            # Generate analysis insights
-            result['analysis_insights'] = self._generate_insights(result)
+            contact_soup, contact_text = None, None
+            contact_url = self._find_contact_page(soup, url)
+            try:
+                contact_response = await self._fetch_contact_async(url, contact_url, speculative)
+                if contact_response is not None:
+                    contact_soup = await asyncio.to_thread(BeautifulSoup, contact_response.content, 'html.parser')
+                    contact_text = contact_response.text
+            except Exception as e:
+                logger.warning(f"Could not scrape contact page: {e}")
             
-            logger.info(f"Extraction complete: {result['data_completeness_score']}% complete")
-            logger.info(f"Found: {len(result['phone'])} phones, {len(result['email'])} emails")
+            await asyncio.to_thread(
+                self._populate_result, result, url, soup, response.text, contact_soup, contact_text
+            )
             
         except Exception as e:
             logger.error(f"Scraping error: {e}")
             result['error'] = str(e)
-            
+        finally:
+            # Guesses the homepage made unnecessary
+            for task in speculative.values():
+                task.cancel()
+        
         return result
     
+    async def scrape_businesses_async(self, urls: List[str], business_type: str = None) -> List[Dict]:
+        """
+        Scrape many businesses concurrently
+        
+        Concurrency is bounded by the fetch engine's global and per-host limits.
+        Results are returned in the same order as urls.
+        """
+        return await asyncio.gather(*(self.scrape_business_async(url, business_type) for url in urls))
+    
+    def scrape_multiple_businesses(self, urls: List[str], business_type: str = None) -> List[Dict]:
+        """
+        Synchronous wrapper around scrape_businesses_async
+        
+        Must not be called from a running event loop; await
+        scrape_businesses_async there instead.
+        """
+        async def run():
+            try:
+                return await self.scrape_businesses_async(urls, business_type)
+            finally:
+                await self.fetch_engine.aclose()
+        
+        return asyncio.run(run())
+    
+    def coalescing_stats(self) -> Dict:
+        """Get counters for scrapes shared between concurrent callers"""
+        return _scrape_flights.stats()
+    
+    def _empty_result(self, url: str) -> Dict:
+        """
+        Result skeleton returned for every scrape
+        
+        'status' stays 'error' unless extraction completes (see _populate_result);
+        the result cache and pipelines only keep 'success' results.
+        """
+        return {
+            'url': url,
+            'status': 'error',
+            'scraped_at': datetime.now().isoformat(),
+            'business_name': None,
+            'phone': [],
+            'email': [],
+            'social_media': {},
+            'address': [],
+            'description': None,
+            'business_owner_name': None,
+            'key_decision_makers': [],
+            'services': [],
+            'data_completeness_score': 0,
+            'analysis_insights': []
+        }
+    
+    def _populate_result(self, result: Dict, url: str, soup: BeautifulSoup, text: str,
+                         contact_soup: BeautifulSoup = None, contact_text: str = None):
+        """Fill result from the parsed homepage and (optional) contact page"""
+        # Extract business name
+        result['business_name'] = self._extract_business_name(soup, url)
+        
+        # Contact page phone numbers are prioritized over the homepage
+        if contact_soup is not None:
+            contact_phones = extract_smart_phones(contact_soup, contact_text, is_contact_page=True)
+            if contact_phones:
+                logger.info(f"Found {len(contact_phones)} phones on contact page (prioritized)")
+                logger.info(f"Primary phone: {contact_phones[0]}")
+                result['phone'] = contact_phones
+        if not result['phone']:
+            result['phone'] = extract_smart_phones(soup, text, is_contact_page=False)
+        
+        # Extract emails
+        result['email'] = self._extract_emails(soup, text)
+        
+        # Extract social media
+        result['social_media'] = self._extract_social_media(soup)
+        
+        # Extract address
+        result['address'] = self._extract_addresses(soup, text)
+        
+        # Extract description
+        result['description'] = self._extract_description(soup)
+        
+        # Calculate completeness
+        result['data_completeness_score'] = self._calculate_completeness(result)
+        
+        # Generate analysis insights
+        result['analysis_insights'] = self._generate_insights(result)
+        
+        logger.info(f"Extraction complete: {result['data_completeness_score']}% complete")
+        logger.info(f"Found: {len(result['phone'])} phones, {len(result['email'])} emails")
+        result['status'] = 'success'
+    
     def _extract_business_name(self, soup: BeautifulSoup, url: str) -> str:
         """Extract business name"""
         # Try title tag
@@ -369,7 +604,8 @@ class UniversalBusinessScraper:
             reasons = []
             
             # Check if website uses contact forms instead
-            if 'contact' in result.get('description', '').lower() or 'form' in result.get('description', '').lower():
+            description = (result.get('description') or '').lower()
+            if 'contact' in description or 'form' in description:
                 reasons.append("Website appears to use contact forms instead of displaying phone numbers")
             
             # Check if emails are present (suggests intentional phone hiding)